@@ -4,12 +4,24 @@ Passos 9 e 10: Busca avançada, Relatórios, Backup e Gestão de Clientes
 """
 
 import tkinter as tk
-from tkinter import ttk, messagebox, filedialog
+from tkinter import ttk, messagebox, filedialog, simpledialog
 import sqlite3
 from datetime import datetime, timedelta
-import shutil
+import json
 import os
+import time
 
+from sistema_juridico import backup, datas, exportacao, importacao, lembretes, manutencao, prazos, restauracao
+from sistema_juridico.autocompletar import CampoAutocompletar
+from sistema_juridico.backup_incremental import RepositorioBackup
+from sistema_juridico.executor import ExecutorConsultas
+from sistema_juridico.instrumentacao import INSTRUMENTACAO
+from sistema_juridico.linha_tempo import LinhaTempo
+from sistema_juridico.lista_virtual import ListaVirtual
+from sistema_juridico.repositorio import CANDIDATOS_BUSCA, BancoDados
+
+# Telas e cargas medidas pela instrumentação (quando ligada no painel de diagnóstico)
+@INSTRUMENTACAO.medir_metodos("mostrar_", "carregar_", "realizar_busca")
 class SistemaJuridico:
     def __init__(self, root):
         self.root = root
@@ -25,81 +37,125 @@ class SistemaJuridico:
         
         self.root.configure(bg=self.cor_fundo)
         
+        # O fim de uma tela medida é quando o Tk termina de desenhá-la
+        INSTRUMENTACAO.ligar_tk(self.root)
+        
         # Tela atual
         self.tela_atual = "dashboard"
         
-        # Inicializar banco de dados
-        self.inicializar_banco()
+        # Telas já montadas (escondidas e mostradas nas trocas) e as que precisam recarregar os dados
+        self.telas = {}
+        self.telas_desatualizadas = set()
         
-        # Criar layout principal
+        # Instantes (time.time) das etapas da partida, para o benchmark de partida
+        self.marcos_partida = {}
+        
+        # Criar layout principal (menu e área de conteúdo; nada aqui toca no banco)
+        self.db = None
         self.criar_layout()
         
+        # A janela é pintada antes de abrir o banco, que pode estar num compartilhamento lento
+        self.conteudo_frame.bind("<Expose>", self.ao_pintar_janela)
+        self.root.after(self.ESPERA_MAXIMA_PINTURA, self.iniciar_dados)
+    
+    # Se a janela não for pintada (iniciada minimizada), o banco é aberto mesmo assim após este tempo (ms)
+    ESPERA_MAXIMA_PINTURA = 500
+    
+    def ao_pintar_janela(self, evento):
+        """Primeira pintura da janela: abre o banco logo em seguida"""
+        self.conteudo_frame.unbind("<Expose>")
+        self.registrar_marco("primeira_pintura")
+        # after_idle: depois de os widgets terminarem de se desenhar
+        self.root.after_idle(self.iniciar_dados)
+    
+    def iniciar_dados(self):
+        """Abre o banco e mostra a tela inicial (uma única vez)"""
+        if self.db is not None:
+            return
+        try:
+            self.inicializar_banco()
+        except Exception as e:
+            messagebox.showerror("Erro", f"Erro ao abrir o banco de dados: {str(e)}")
+            self.root.destroy()
+            return
+        self.lbl_abrindo.destroy()
+        # A tela escolhida no menu enquanto o banco abria, ou o dashboard
+        self.mostrar_tela(self.tela_atual)
+    
+    def registrar_marco(self, nome):
+        """Guarda o instante de uma etapa da partida (primeira_pintura, interativo)
+        
+        Com SISTEMA_JURIDICO_MEDIR_PARTIDA definida, imprime os marcos em JSON
+        e fecha o programa quando os dois forem registrados (benchmarks.py).
+        """
+        if nome in self.marcos_partida:
+            return
+        self.marcos_partida[nome] = time.time()
+        if os.environ.get("SISTEMA_JURIDICO_MEDIR_PARTIDA") and len(self.marcos_partida) == 2:
+            print(json.dumps(self.marcos_partida), flush=True)
+            self.root.after_idle(self.sair_aplicacao)
+        
     def inicializar_banco(self):
-        """Cria o banco de dados SQLite e as tabelas"""
-        self.conn = sqlite3.connect('sistema_juridico.db')
-        self.cursor = self.conn.cursor()
-        
-        # Criar tabela de processos
-        self.cursor.execute('''
-            CREATE TABLE IF NOT EXISTS processos (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                numero TEXT NOT NULL UNIQUE,
-                cliente TEXT NOT NULL,
-                tipo_acao TEXT NOT NULL,
-                vara TEXT NOT NULL,
-                status TEXT NOT NULL,
-                data_distribuicao TEXT NOT NULL,
-                valor_causa REAL,
-                observacoes TEXT,
-                data_cadastro TEXT NOT NULL
-            )
-        ''')
-        
-        # Criar tabela de andamentos
-        self.cursor.execute('''
-            CREATE TABLE IF NOT EXISTS andamentos (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                processo_id INTEGER NOT NULL,
-                data_andamento TEXT NOT NULL,
-                descricao TEXT NOT NULL,
-                data_cadastro TEXT NOT NULL,
-                FOREIGN KEY (processo_id) REFERENCES processos (id)
-            )
-        ''')
-        
-        # Criar tabela de tarefas
-        self.cursor.execute('''
-            CREATE TABLE IF NOT EXISTS tarefas (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                processo_id INTEGER,
-                titulo TEXT NOT NULL,
-                descricao TEXT,
-                tipo TEXT NOT NULL,
-                data_vencimento TEXT NOT NULL,
-                concluida INTEGER DEFAULT 0,
-                data_conclusao TEXT,
-                data_cadastro TEXT NOT NULL,
-                FOREIGN KEY (processo_id) REFERENCES processos (id)
-            )
-        ''')
-        
-        # Criar tabela de clientes
-        self.cursor.execute('''
-            CREATE TABLE IF NOT EXISTS clientes (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                nome TEXT NOT NULL,
-                cpf_cnpj TEXT UNIQUE,
-                telefone TEXT,
-                email TEXT,
-                endereco TEXT,
-                observacoes TEXT,
-                data_cadastro TEXT NOT NULL
-            )
-        ''')
+        """Abre o banco de dados SQLite e cria/atualiza as tabelas"""
+        # A camada de dados aplica o perfil de desempenho e as migrações pendentes
+        self.db = BancoDados('sistema_juridico.db')
+        
+        # Consultas das telas rodam numa thread com conexão própria
+        self.executor = ExecutorConsultas('sistema_juridico.db')
+        self.executor.ligar_tk(self.root)
+        
+        # Tarefas longas (backup) têm conexão própria e não atrasam as telas
+        self.executor_manutencao = ExecutorConsultas('sistema_juridico.db')
+        self.executor_manutencao.ligar_tk(self.root)
+        self.backup_em_andamento = False
+        
+        # Janela de feriados (uma só, aberta pela tela de tarefas) e alerta de lembretes
+        self.janela_feriados = None
+        self.janela_alerta = None
+        
+        # Snapshots incrementais e deduplicados (pasta backups/ ao lado do banco)
+        self.repositorio_backup = RepositorioBackup()
+        
+        # Migrações de dados em lotes, retomadas de onde pararam
+        self.executor_manutencao.executar(
+            lambda db: manutencao.executar_pendentes(db.conn),
+            ao_concluir=self.manutencao_concluida,
+            ao_falhar=self.erro_consulta
+        )
         
-        self.conn.commit()
-        print("✅ Banco de dados criado com sucesso!")
+        # Avisos de vencimento: um único timer para a próxima tarefa (carga depois da manutenção)
+        self.lembretes = lembretes.AgendaLembretes(
+            self.root,
+            self.executor_manutencao,
+            self.avisar_tarefas,
+            lembretes.antecedencias_configuradas(),
+            ao_falhar=self.erro_consulta
+        )
+        self.lembretes.carregar()
         
+        print("✅ Banco de dados criado com sucesso!")
+        if INSTRUMENTACAO.ativa:
+            print(f"🩺 Instrumentação ligada: consultas acima de {INSTRUMENTACAO.limite_ms:g} ms "
+                  f"em {os.path.abspath(INSTRUMENTACAO.arquivo_log)}")
+        
+    def manutencao_concluida(self, lotes):
+        """Tarefas de manutenção que gravaram algo desatualizam as telas abertas"""
+        if any(lotes.values()):
+            self.marcar_alteracao(*{tabela for tabela, _ in manutencao.TAREFAS.values()})
+        
+        # O que a migração não conseguiu interpretar é avisado uma vez aqui, não a cada exibição
+        self.executor_manutencao.executar(
+            lambda db: manutencao.relatorio_datas(db.conn),
+            ao_concluir=self.avisar_datas_invalidas,
+            ao_falhar=self.erro_consulta
+        )
+    
+    def avisar_datas_invalidas(self, problemas):
+        """Aviso único (no console) das datas fora do padrão depois da manutenção"""
+        if problemas:
+            print(f"⚠️ {len(problemas)} data(s) fora do formato padrão; "
+                  f"veja \"Verificar datas fora do padrão\" na tela de backup")
+    
     def criar_layout(self):
         """Cria o layout com menu lateral e área de conteúdo"""
         
@@ -134,6 +190,7 @@ class SistemaJuridico:
         self.criar_botao_menu("✅ Tarefas", "tarefas")
         self.criar_botao_menu("🔍 Busca Avançada", "busca")
         self.criar_botao_menu("💾 Backup", "backup")
+        self.criar_botao_menu("🩺 Diagnóstico", "diagnostico")
         
         # Botão de sair no final
         tk.Frame(self.menu_frame, bg=self.cor_menu).pack(expand=True)
@@ -159,8 +216,15 @@ class SistemaJuridico:
         )
         self.conteudo_frame.pack(side="right", fill="both", expand=True)
         
-        # Mostrar tela inicial
-        self.mostrar_tela("dashboard")
+        # A tela inicial é montada quando o banco estiver aberto (iniciar_dados)
+        self.lbl_abrindo = tk.Label(
+            self.conteudo_frame,
+            text="⏳ Abrindo banco de dados...",
+            font=("Arial", 14),
+            bg=self.cor_fundo,
+            fg="#6b7280"
+        )
+        self.lbl_abrindo.pack(expand=True)
         
     def criar_botao_menu(self, texto, tela):
         """Cria um botão no menu lateral"""
@@ -183,16 +247,47 @@ class SistemaJuridico:
         btn.bind("<Enter>", lambda e: btn.config(bg=self.cor_primaria))
         btn.bind("<Leave>", lambda e: btn.config(bg=self.cor_menu))
         
+    # Tabelas exibidas por cada tela: uma gravação nelas desatualiza a tela
+    TABELAS_POR_TELA = {
+        "dashboard": {"processos", "clientes", "tarefas"},
+        "processos": {"processos"},
+        "clientes": {"clientes", "processos"},
+        "tarefas": {"tarefas", "processos"},
+        "busca": {"processos", "clientes", "andamentos"},
+        "backup": set(),
+        "diagnostico": set(),
+    }
+    
     def mostrar_tela(self, tela):
-        """Alterna entre as diferentes telas"""
+        """Alterna entre as diferentes telas
+        
+        Cada tela é montada uma única vez e depois só escondida e mostrada de
+        novo; se uma gravação alterou o que ela exibe, os dados são recarregados
+        quando ela reaparece.
+        """
+        if self.db is None:
+            # Banco ainda abrindo: a tela escolhida é mostrada quando ele abrir
+            self.tela_atual = tela
+            return
+        
+        if self.tela_atual in self.telas:
+            self.telas[self.tela_atual].pack_forget()
         self.tela_atual = tela
         
-        # Limpar conteúdo anterior
-        for widget in self.conteudo_frame.winfo_children():
-            widget.destroy()
+        if tela in self.telas:
+            self.telas[tela].pack(fill="both", expand=True)
+            # O diagnóstico muda a cada consulta: recarregado sempre que aparece
+            if tela in self.telas_desatualizadas or tela == "diagnostico":
+                self.telas_desatualizadas.discard(tela)
+                self.atualizar_tela(tela)
+            return
+        
+        tela_frame = tk.Frame(self.conteudo_frame, bg=self.cor_fundo)
+        tela_frame.pack(fill="both", expand=True)
+        self.telas[tela] = tela_frame
         
         # Criar header
-        header = tk.Frame(self.conteudo_frame, bg="white", height=80)
+        header = tk.Frame(tela_frame, bg="white", height=80)
         header.pack(fill="x", padx=20, pady=20)
         header.pack_propagate(False)
         
@@ -203,7 +298,8 @@ class SistemaJuridico:
             "clientes": "👥 Clientes",
             "tarefas": "✅ Tarefas e Prazos",
             "busca": "🔍 Busca Avançada",
-            "backup": "💾 Backup e Restauração"
+            "backup": "💾 Backup e Restauração",
+            "diagnostico": "🩺 Diagnóstico de Desempenho"
         }
         
         titulo = tk.Label(
@@ -216,7 +312,7 @@ class SistemaJuridico:
         titulo.pack(side="left", padx=20, pady=20)
         
         # Área de conteúdo
-        conteudo = tk.Frame(self.conteudo_frame, bg=self.cor_fundo)
+        conteudo = tk.Frame(tela_frame, bg=self.cor_fundo)
         conteudo.pack(fill="both", expand=True, padx=20)
         
         # Mostrar conteúdo específico de cada tela
@@ -232,39 +328,54 @@ class SistemaJuridico:
             self.mostrar_busca(conteudo)
         elif tela == "backup":
             self.mostrar_backup(conteudo)
+        elif tela == "diagnostico":
+            self.mostrar_diagnostico(conteudo)
+    
+    def atualizar_tela(self, tela):
+        """Recarrega os dados de uma tela já montada"""
+        if tela == "dashboard":
+            self.carregar_dashboard()
+        elif tela == "processos":
+            self.carregar_processos()
+        elif tela == "clientes":
+            self.carregar_clientes()
+        elif tela == "tarefas":
+            self.carregar_tarefas()
+        elif tela == "busca":
+            if self.ultima_busca is not None:
+                self.realizar_busca()
+        elif tela == "diagnostico":
+            self.carregar_diagnostico()
+    
+    def marcar_alteracao(self, *tabelas):
+        """Marca como desatualizadas as telas montadas que exibem as tabelas gravadas
+        
+        A tela atual já mostra a gravação (as listas são atualizadas linha a linha).
+        """
+        for tela in self.telas:
+            if tela != self.tela_atual and self.TABELAS_POR_TELA[tela] & set(tabelas):
+                self.telas_desatualizadas.add(tela)
+    
+    def descartar_telas(self):
+        """Destrói todas as telas montadas (serão recriadas ao aparecer)"""
+        for tela_frame in self.telas.values():
+            tela_frame.destroy()
+        self.telas.clear()
+        self.telas_desatualizadas.clear()
     
     def mostrar_dashboard(self, frame):
         """Mostra o dashboard com estatísticas"""
-        # Buscar estatísticas do banco
-        self.cursor.execute("SELECT COUNT(*) FROM processos")
-        total_processos = self.cursor.fetchone()[0]
-        
-        self.cursor.execute("SELECT COUNT(*) FROM processos WHERE status='Ativo'")
-        processos_ativos = self.cursor.fetchone()[0]
-        
-        self.cursor.execute("SELECT COUNT(*) FROM clientes")
-        total_clientes = self.cursor.fetchone()[0]
-        
-        self.cursor.execute("SELECT COUNT(*) FROM tarefas WHERE concluida=0")
-        tarefas_pendentes = self.cursor.fetchone()[0]
-        
-        # Tarefas urgentes (próximos 7 dias)
-        data_limite = (datetime.now() + timedelta(days=7)).strftime("%Y-%m-%d")
-        self.cursor.execute('''
-            SELECT COUNT(*) FROM tarefas 
-            WHERE concluida=0 AND date(data_vencimento) <= ?
-        ''', (data_limite,))
-        tarefas_urgentes = self.cursor.fetchone()[0]
-        
         # Frame para os cards
         cards_frame = tk.Frame(frame, bg=self.cor_fundo)
         cards_frame.pack(pady=20)
         
-        # Cards - Linha 1
-        self.criar_card(cards_frame, "Processos Ativos", str(processos_ativos), "#3b82f6", 0, 0)
-        self.criar_card(cards_frame, "Total de Clientes", str(total_clientes), "#8b5cf6", 0, 1)
-        self.criar_card(cards_frame, "Tarefas Pendentes", str(tarefas_pendentes), "#10b981", 0, 2)
-        self.criar_card(cards_frame, "Tarefas Urgentes", str(tarefas_urgentes), "#ef4444", 0, 3)
+        # Cards - Linha 1 (valores preenchidos quando a consulta terminar)
+        self.cards_dashboard = {
+            "processos_ativos": self.criar_card(cards_frame, "Processos Ativos", "…", "#3b82f6", 0, 0),
+            "total_clientes": self.criar_card(cards_frame, "Total de Clientes", "…", "#8b5cf6", 0, 1),
+            "tarefas_pendentes": self.criar_card(cards_frame, "Tarefas Pendentes", "…", "#10b981", 0, 2),
+            "tarefas_urgentes": self.criar_card(cards_frame, "Tarefas Urgentes", "…", "#ef4444", 0, 3),
+        }
         
         # Tarefas próximas do vencimento
         tarefas_frame = tk.Frame(frame, bg="white", relief="solid", bd=1)
@@ -278,21 +389,63 @@ class SistemaJuridico:
             fg=self.cor_texto
         ).pack(pady=15)
         
-        # Buscar tarefas urgentes
-        self.cursor.execute('''
-            SELECT t.titulo, t.data_vencimento, t.tipo, p.numero
-            FROM tarefas t
-            LEFT JOIN processos p ON t.processo_id = p.id
-            WHERE t.concluida=0 AND date(t.data_vencimento) <= ?
-            ORDER BY t.data_vencimento ASC
-            LIMIT 10
-        ''', (data_limite,))
+        self.lista_urgentes_frame = tk.Frame(tarefas_frame, bg="white")
+        self.lista_urgentes_frame.pack(fill="both", expand=True, padx=20, pady=(0, 20))
         
-        tarefas_urgentes_lista = self.cursor.fetchall()
+        tk.Label(
+            self.lista_urgentes_frame,
+            text="⏳ Carregando...",
+            font=("Arial", 12),
+            bg="white",
+            fg="#6b7280"
+        ).pack(expand=True, pady=30)
+        
+        self.carregar_dashboard()
+    
+    def carregar_dashboard(self):
+        """Busca os números do dashboard em segundo plano"""
+        # Tarefas urgentes (próximos 7 dias): vencimento antes do início do 8º dia
+        vencimento_ate = (datetime.now() + timedelta(days=8)).strftime("%Y-%m-%d")
+        
+        self.executor.executar(
+            self.consultar_dashboard,
+            vencimento_ate,
+            chave="dashboard",
+            ao_concluir=lambda dados: self.preencher_dashboard(self.cards_dashboard, self.lista_urgentes_frame, dados),
+            ao_falhar=self.erro_consulta
+        )
+    
+    @staticmethod
+    def consultar_dashboard(db, vencimento_ate):
+        """Busca os números do dashboard (roda na thread do executor)"""
+        # Contadores mantidos por triggers: leitura de custo constante
+        estatisticas = db.estatisticas.todas()
+        return {
+            "processos_ativos": estatisticas.get('processos.status.Ativo', 0),
+            "total_clientes": estatisticas.get('clientes.total', 0),
+            "tarefas_pendentes": estatisticas.get('tarefas.pendentes', 0),
+            "tarefas_urgentes": db.tarefas.contar_urgentes(vencimento_ate),
+            "lista_urgentes": db.tarefas.urgentes(vencimento_ate, 10),
+        }
+    
+    def preencher_dashboard(self, cards, lista_frame, dados):
+        """Preenche os cards e a lista de tarefas urgentes"""
+        if not lista_frame.winfo_exists():
+            return
+        
+        for chave, lbl_valor in cards.items():
+            lbl_valor.config(text=str(dados[chave]))
+        
+        self.registrar_marco("interativo")
+        
+        for widget in lista_frame.winfo_children():
+            widget.destroy()
+        
+        tarefas_urgentes_lista = dados["lista_urgentes"]
         
         if not tarefas_urgentes_lista:
             tk.Label(
-                tarefas_frame,
+                lista_frame,
                 text="🎉 Nenhuma tarefa urgente!\n\nTodos os prazos estão em dia.",
                 font=("Arial", 12),
                 bg="white",
@@ -300,9 +453,6 @@ class SistemaJuridico:
                 justify="center"
             ).pack(expand=True, pady=30)
         else:
-            lista_frame = tk.Frame(tarefas_frame, bg="white")
-            lista_frame.pack(fill="both", expand=True, padx=20, pady=(0, 20))
-            
             for titulo, vencimento, tipo, numero_processo in tarefas_urgentes_lista:
                 try:
                     data_venc = datetime.strptime(vencimento, "%Y-%m-%d %H:%M")
@@ -381,6 +531,8 @@ class SistemaJuridico:
             fg="white"
         )
         lbl_titulo.pack(pady=(0, 10))
+        
+        return lbl_valor
     
     def mostrar_processos(self, frame):
         """Mostra a tela de processos"""
@@ -409,13 +561,13 @@ class SistemaJuridico:
         
         tk.Label(linha1, text="Cliente:", bg="white", font=("Arial", 10)).pack(side="left")
         
-        # Buscar clientes para o combobox
-        self.cursor.execute("SELECT nome FROM clientes ORDER BY nome")
-        clientes = self.cursor.fetchall()
-        clientes_lista = [c[0] for c in clientes]
-        
-        self.combo_cliente_processo = ttk.Combobox(linha1, font=("Arial", 10), width=28, values=clientes_lista)
-        self.combo_cliente_processo.pack(side="left", padx=10)
+        # Nome livre; as sugestões vêm do cadastro de clientes
+        self.entry_cliente_processo = tk.Entry(linha1, font=("Arial", 10), width=30)
+        self.entry_cliente_processo.pack(side="left", padx=10)
+        self.auto_cliente_processo = self.criar_autocompletar(
+            self.entry_cliente_processo,
+            lambda db, texto, limite: db.clientes.autocompletar(texto, limite)
+        )
         
         # Linha 2
         linha2 = tk.Frame(campos_frame, bg="white")
@@ -515,6 +667,16 @@ class SistemaJuridico:
         
         self.tree_processos.pack(fill="both", expand=True)
         
+        # Lista virtual: páginas carregadas conforme a rolagem
+        self.lista_processos = ListaVirtual(
+            self.tree_processos,
+            scrollbar,
+            self.executor,
+            lambda db, direcao, chave, limite: db.processos.pagina(direcao, chave, limite),
+            buscar_linha=lambda db, processo_id: db.processos.linha_lista(processo_id),
+            descendente=True
+        )
+        
         btn_frame = tk.Frame(lista_frame, bg="white")
         btn_frame.pack(pady=10)
         
@@ -663,6 +825,14 @@ class SistemaJuridico:
         
         self.tree_clientes.pack(fill="both", expand=True)
         
+        self.lista_clientes = ListaVirtual(
+            self.tree_clientes,
+            scrollbar,
+            self.executor,
+            lambda db, direcao, chave, limite: db.clientes.pagina(direcao, chave, limite),
+            buscar_linha=lambda db, cliente_id: db.clientes.linha_lista(cliente_id)
+        )
+        
         btn_frame = tk.Frame(lista_frame, bg="white")
         btn_frame.pack(pady=10)
         
@@ -733,20 +903,47 @@ class SistemaJuridico:
         
         tk.Label(linha2, text="Processo (opcional):", bg="white", font=("Arial", 10)).pack(side="left")
         
-        self.cursor.execute("SELECT numero FROM processos ORDER BY numero")
-        processos = self.cursor.fetchall()
-        processos_lista = ["Nenhum (tarefa geral)"] + [p[0] for p in processos]
-        
-        self.combo_processo_tarefa = ttk.Combobox(linha2, font=("Arial", 10), width=25, state="readonly")
-        self.combo_processo_tarefa['values'] = processos_lista
-        self.combo_processo_tarefa.current(0)
-        self.combo_processo_tarefa.pack(side="left", padx=(10, 30))
+        # Número ou cliente; em branco, tarefa geral
+        self.entry_processo_tarefa = tk.Entry(linha2, font=("Arial", 10), width=27)
+        self.entry_processo_tarefa.pack(side="left", padx=(10, 30))
+        self.auto_processo_tarefa = self.criar_autocompletar(
+            self.entry_processo_tarefa,
+            lambda db, texto, limite: db.processos.autocompletar(texto, limite),
+            exibir=lambda linha: f"{linha[1]} — {linha[2]}"
+        )
         
         tk.Label(linha2, text="Data/Hora:", bg="white", font=("Arial", 10)).pack(side="left")
         self.entry_data_tarefa = tk.Entry(linha2, font=("Arial", 10), width=15)
         self.entry_data_tarefa.insert(0, datetime.now().strftime("%d/%m/%Y %H:%M"))
         self.entry_data_tarefa.pack(side="left", padx=10)
         
+        # Linha 2b: prazo em dias úteis (preenche a data pelo calendário do tribunal)
+        linha_prazo = tk.Frame(campos_frame, bg="white")
+        linha_prazo.pack(fill="x", pady=5)
+        
+        tk.Label(linha_prazo, text="Prazo (opcional):", bg="white", font=("Arial", 10)).pack(side="left")
+        self.entry_dias_prazo = tk.Entry(linha_prazo, font=("Arial", 10), width=5)
+        self.entry_dias_prazo.pack(side="left", padx=(10, 5))
+        
+        tk.Label(linha_prazo, text="dias úteis a partir de", bg="white", font=("Arial", 10)).pack(side="left")
+        self.entry_inicio_prazo = tk.Entry(linha_prazo, font=("Arial", 10), width=12)
+        self.entry_inicio_prazo.insert(0, datetime.now().strftime("%d/%m/%Y"))
+        self.entry_inicio_prazo.pack(side="left", padx=(5, 10))
+        
+        tk.Button(
+            linha_prazo,
+            text="🧮 Calcular vencimento",
+            font=("Arial", 9),
+            bg="#e5e7eb",
+            bd=0,
+            padx=10,
+            cursor="hand2",
+            command=self.calcular_prazo_tarefa
+        ).pack(side="left")
+        
+        self.lbl_prazo_tarefa = tk.Label(linha_prazo, text="", bg="white", fg="#6b7280", font=("Arial", 9))
+        self.lbl_prazo_tarefa.pack(side="left", padx=10)
+        
         # Linha 3
         linha3 = tk.Frame(campos_frame, bg="white")
         linha3.pack(fill="x", pady=5)
@@ -792,6 +989,30 @@ class SistemaJuridico:
         self.combo_filtro_tarefa.bind('<<ComboboxSelected>>', lambda e: self.carregar_tarefas())
         self.combo_filtro_tarefa.pack(side="left")
         
+        tk.Button(
+            header_tarefas,
+            text="📅 Feriados e suspensões",
+            font=("Arial", 10),
+            bg="#e5e7eb",
+            bd=0,
+            padx=10,
+            pady=4,
+            cursor="hand2",
+            command=self.abrir_feriados
+        ).pack(side="right")
+        
+        tk.Button(
+            header_tarefas,
+            text="🔔 Lembretes",
+            font=("Arial", 10),
+            bg="#e5e7eb",
+            bd=0,
+            padx=10,
+            pady=4,
+            cursor="hand2",
+            command=self.configurar_lembretes
+        ).pack(side="right", padx=(0, 10))
+        
         tree_frame = tk.Frame(lista_frame, bg="white")
         tree_frame.pack(fill="both", expand=True, padx=20, pady=(0, 20))
         
@@ -820,8 +1041,17 @@ class SistemaJuridico:
         self.tree_tarefas.column("Vencimento", width=150)
         self.tree_tarefas.column("Processo", width=200)
         
+        self.tree_tarefas.tag_configure("data_invalida", background="#fee2e2")
         self.tree_tarefas.pack(fill="both", expand=True)
         
+        self.lista_tarefas = ListaVirtual(
+            self.tree_tarefas,
+            scrollbar,
+            self.executor,
+            None,
+            formatar=self.formatar_tarefa
+        )
+        
         btn_frame = tk.Frame(lista_frame, bg="white")
         btn_frame.pack(pady=10)
         
@@ -900,6 +1130,23 @@ class SistemaJuridico:
         self.combo_busca_status.current(0)
         self.combo_busca_status.pack(side="left", padx=10)
         
+        # Linha 3
+        linha3 = tk.Frame(campos_frame, bg="white")
+        linha3.pack(fill="x", pady=5)
+        
+        tk.Label(linha3, text="Texto livre (vara, observações, andamentos):", bg="white", font=("Arial", 10)).pack(side="left")
+        self.entry_busca_texto = tk.Entry(linha3, font=("Arial", 10), width=50)
+        self.entry_busca_texto.pack(side="left", padx=10)
+        
+        # Busca enquanto digita: cada tecla reagenda a busca; Enter busca na hora
+        self.busca_agendada = None
+        self.ultima_busca = None
+        for entry in (self.entry_busca_numero, self.entry_busca_cliente, self.entry_busca_texto):
+            entry.bind("<KeyRelease>", self.agendar_busca)
+            entry.bind("<Return>", lambda e: self.realizar_busca())
+        for combo in (self.combo_busca_tipo, self.combo_busca_status):
+            combo.bind("<<ComboboxSelected>>", self.agendar_busca)
+        
         # Botão de buscar
         btn_buscar = tk.Button(
             busca_frame,
@@ -913,7 +1160,33 @@ class SistemaJuridico:
             cursor="hand2",
             command=self.realizar_busca
         )
-        btn_buscar.pack(pady=(0, 15))
+        btn_buscar.pack(pady=(0, 5))
+        
+        self.btn_exportar_busca = tk.Button(
+            busca_frame,
+            text="📤 Exportar todos os resultados",
+            font=("Arial", 10),
+            bg="white",
+            fg=self.cor_texto,
+            bd=1,
+            padx=10,
+            pady=5,
+            cursor="hand2",
+            command=self.exportar_busca
+        )
+        self.btn_exportar_busca.pack(pady=(0, 5))
+        
+        self.progresso_exportacao = ttk.Progressbar(busca_frame, length=300, mode="indeterminate")
+        self.progresso_exportacao.pack()
+        
+        self.lbl_progresso_exportacao = tk.Label(
+            busca_frame,
+            text="",
+            font=("Arial", 10),
+            bg="white",
+            fg="#6b7280"
+        )
+        self.lbl_progresso_exportacao.pack(pady=(0, 10))
         
         # Resultados
         resultado_frame = tk.Frame(frame, bg="white", relief="solid", bd=1)
@@ -925,7 +1198,16 @@ class SistemaJuridico:
             font=("Arial", 16, "bold"),
             bg="white",
             fg=self.cor_texto
-        ).pack(pady=15)
+        ).pack(pady=(15, 0))
+        
+        self.lbl_resultado_busca = tk.Label(
+            resultado_frame,
+            text="Digite para buscar",
+            font=("Arial", 10),
+            bg="white",
+            fg="#6b7280"
+        )
+        self.lbl_resultado_busca.pack(pady=(0, 10))
         
         tree_frame = tk.Frame(resultado_frame, bg="white")
         tree_frame.pack(fill="both", expand=True, padx=20, pady=(0, 20))
@@ -933,7 +1215,7 @@ class SistemaJuridico:
         scrollbar = ttk.Scrollbar(tree_frame)
         scrollbar.pack(side="right", fill="y")
         
-        colunas = ("Número", "Cliente", "Tipo", "Status", "Vara", "Data")
+        colunas = ("Número", "Cliente", "Tipo", "Status", "Vara", "Data", "Trecho")
         self.tree_busca = ttk.Treeview(
             tree_frame,
             columns=colunas,
@@ -949,6 +1231,7 @@ class SistemaJuridico:
         self.tree_busca.heading("Status", text="Status")
         self.tree_busca.heading("Vara", text="Vara")
         self.tree_busca.heading("Data", text="Data Dist.")
+        self.tree_busca.heading("Trecho", text="Trecho encontrado")
         
         self.tree_busca.column("Número", width=180)
         self.tree_busca.column("Cliente", width=180)
@@ -956,6 +1239,7 @@ class SistemaJuridico:
         self.tree_busca.column("Status", width=100)
         self.tree_busca.column("Vara", width=200)
         self.tree_busca.column("Data", width=100)
+        self.tree_busca.column("Trecho", width=300)
         
         self.tree_busca.pack(fill="both", expand=True)
         
@@ -977,14 +1261,14 @@ class SistemaJuridico:
         
         tk.Label(
             backup_frame,
-            text="Faça backup regular dos seus dados para evitar perdas!\n\nO backup irá copiar o banco de dados completo para um local seguro.",
+            text="Faça backup regular dos seus dados para evitar perdas!\n\nCada backup guarda só as partes do banco que mudaram desde o anterior,\nem segundo plano; o sistema continua disponível.",
             font=("Arial", 11),
             bg="white",
             fg="#6b7280",
             justify="center"
         ).pack(pady=10)
         
-        btn_backup = tk.Button(
+        self.btn_backup = tk.Button(
             backup_frame,
             text="💾 Fazer Backup Agora",
             font=("Arial", 14, "bold"),
@@ -994,9 +1278,98 @@ class SistemaJuridico:
             padx=40,
             pady=15,
             cursor="hand2",
-            command=self.fazer_backup
+            command=self.fazer_backup,
+            state="disabled" if self.backup_em_andamento else "normal"
         )
-        btn_backup.pack(pady=20)
+        self.btn_backup.pack(pady=(20, 5))
+        
+        botoes_extra = tk.Frame(backup_frame, bg="white")
+        botoes_extra.pack(pady=(0, 15))
+        
+        tk.Button(
+            botoes_extra,
+            text="📤 Exportar cópia completa (.db)",
+            font=("Arial", 10),
+            bg="white",
+            fg=self.cor_texto,
+            bd=1,
+            padx=10,
+            pady=5,
+            cursor="hand2",
+            command=self.exportar_copia_banco
+        ).pack(side="left", padx=5)
+        
+        tk.Button(
+            botoes_extra,
+            text="🔎 Verificar backups",
+            font=("Arial", 10),
+            bg="white",
+            fg=self.cor_texto,
+            bd=1,
+            padx=10,
+            pady=5,
+            cursor="hand2",
+            command=self.verificar_backups
+        ).pack(side="left", padx=5)
+        
+        importacao_frame = tk.Frame(backup_frame, bg="white")
+        importacao_frame.pack(pady=(0, 15))
+        
+        tk.Label(
+            importacao_frame,
+            text="Planilha de:",
+            font=("Arial", 10),
+            bg="white",
+            fg=self.cor_texto
+        ).pack(side="left", padx=5)
+        
+        self.combo_tabela_importacao = ttk.Combobox(
+            importacao_frame,
+            values=list(importacao.IMPORTADORES),
+            state="readonly",
+            width=12
+        )
+        self.combo_tabela_importacao.set("clientes")
+        self.combo_tabela_importacao.pack(side="left", padx=5)
+        
+        tk.Button(
+            importacao_frame,
+            text="📥 Importar CSV/JSONL",
+            font=("Arial", 10),
+            bg="white",
+            fg=self.cor_texto,
+            bd=1,
+            padx=10,
+            pady=5,
+            cursor="hand2",
+            command=self.importar_dados
+        ).pack(side="left", padx=5)
+        
+        tk.Button(
+            importacao_frame,
+            text="📤 Exportar",
+            font=("Arial", 10),
+            bg="white",
+            fg=self.cor_texto,
+            bd=1,
+            padx=10,
+            pady=5,
+            cursor="hand2",
+            command=self.exportar_tabela
+        ).pack(side="left", padx=5)
+        
+        # Progresso do backup em andamento
+        self.progresso_backup = ttk.Progressbar(backup_frame, length=400, mode="determinate")
+        self.progresso_backup.pack()
+        
+        self.lbl_progresso_backup = tk.Label(
+            backup_frame,
+            text="",
+            font=("Arial", 10),
+            bg="white",
+            fg="#6b7280"
+        )
+        self.lbl_progresso_backup.pack(pady=(5, 0))
         
         # Card de restauração
         restaurar_frame = tk.Frame(frame, bg="white", relief="solid", bd=1)
@@ -1066,8 +1439,150 @@ class SistemaJuridico:
             font=("Arial", 10),
             bg="#f0f9ff",
             fg=self.cor_texto
+        ).pack(pady=(0, 5), padx=20, anchor="w")
+        
+        tk.Label(
+            info_frame,
+            text=f"🗂️ Repositório de backups: {os.path.abspath(self.repositorio_backup.raiz)}",
+            font=("Arial", 10),
+            bg="#f0f9ff",
+            fg=self.cor_texto
+        ).pack(pady=(0, 10), padx=20, anchor="w")
+        
+        tk.Button(
+            info_frame,
+            text="🧮 Verificar contadores do dashboard",
+            font=("Arial", 10),
+            bg="white",
+            fg=self.cor_texto,
+            bd=1,
+            padx=10,
+            pady=5,
+            cursor="hand2",
+            command=self.verificar_contadores
+        ).pack(pady=(0, 5), padx=20, anchor="w")
+        
+        tk.Button(
+            info_frame,
+            text="🔗 Verificar vínculos entre processos e clientes",
+            font=("Arial", 10),
+            bg="white",
+            fg=self.cor_texto,
+            bd=1,
+            padx=10,
+            pady=5,
+            cursor="hand2",
+            command=self.verificar_vinculos
+        ).pack(pady=(0, 5), padx=20, anchor="w")
+        
+        tk.Button(
+            info_frame,
+            text="📅 Verificar datas fora do padrão",
+            font=("Arial", 10),
+            bg="white",
+            fg=self.cor_texto,
+            bd=1,
+            padx=10,
+            pady=5,
+            cursor="hand2",
+            command=self.verificar_datas
         ).pack(pady=(0, 15), padx=20, anchor="w")
     
+    def mostrar_diagnostico(self, frame):
+        """Mostra os tempos das consultas e das telas medidos pela instrumentação"""
+        controles_frame = tk.Frame(frame, bg="white", relief="solid", bd=1)
+        controles_frame.pack(fill="x", pady=(0, 10))
+        
+        linha1 = tk.Frame(controles_frame, bg="white")
+        linha1.pack(fill="x", padx=20, pady=(15, 5))
+        
+        self.var_instrumentar = tk.BooleanVar(value=INSTRUMENTACAO.ativa)
+        tk.Checkbutton(
+            linha1,
+            text="Medir consultas e telas",
+            variable=self.var_instrumentar,
+            font=("Arial", 11, "bold"),
+            bg="white",
+            command=self.configurar_instrumentacao
+        ).pack(side="left")
+        
+        tk.Label(linha1, text="Registrar consultas acima de (ms):", font=("Arial", 10), bg="white").pack(side="left", padx=(30, 5))
+        self.spin_limite_lenta = tk.Spinbox(linha1, from_=1, to=60000, increment=10, width=7, font=("Arial", 10),
+                                            command=self.configurar_instrumentacao)
+        self.spin_limite_lenta.delete(0, tk.END)
+        self.spin_limite_lenta.insert(0, f"{INSTRUMENTACAO.limite_ms:g}")
+        self.spin_limite_lenta.bind("<FocusOut>", lambda e: self.configurar_instrumentacao())
+        self.spin_limite_lenta.bind("<Return>", lambda e: self.configurar_instrumentacao())
+        self.spin_limite_lenta.pack(side="left")
+        
+        self.var_capturar_planos = tk.BooleanVar(value=INSTRUMENTACAO.capturar_planos)
+        tk.Checkbutton(
+            linha1,
+            text="Capturar EXPLAIN QUERY PLAN das lentas",
+            variable=self.var_capturar_planos,
+            font=("Arial", 10),
+            bg="white",
+            command=self.configurar_instrumentacao
+        ).pack(side="left", padx=(30, 0))
+        
+        linha2 = tk.Frame(controles_frame, bg="white")
+        linha2.pack(fill="x", padx=20, pady=(0, 15))
+        
+        tk.Label(
+            linha2,
+            text=f"📄 Consultas lentas em: {os.path.abspath(INSTRUMENTACAO.arquivo_log)}",
+            font=("Arial", 9),
+            bg="white",
+            fg="#6b7280"
+        ).pack(side="left")
+        
+        for texto, comando in (("🧹 Limpar medidas", self.limpar_diagnostico), ("🔄 Atualizar", self.carregar_diagnostico)):
+            tk.Button(
+                linha2,
+                text=texto,
+                font=("Arial", 10),
+                bg="white",
+                fg=self.cor_texto,
+                bd=1,
+                padx=10,
+                pady=3,
+                cursor="hand2",
+                command=comando
+            ).pack(side="right", padx=5)
+        
+        # Medidas: o maior p95 primeiro
+        tree_frame = tk.Frame(frame, bg="white", relief="solid", bd=1)
+        tree_frame.pack(fill="both", expand=True)
+        
+        scrollbar = ttk.Scrollbar(tree_frame)
+        scrollbar.pack(side="right", fill="y")
+        
+        colunas = ("Tipo", "Nome", "Origem", "Chamadas", "Linhas", "p50", "p95", "p99", "Máx")
+        self.tree_diagnostico = ttk.Treeview(
+            tree_frame,
+            columns=colunas,
+            show="headings",
+            yscrollcommand=scrollbar.set,
+            height=12
+        )
+        scrollbar.config(command=self.tree_diagnostico.yview)
+        
+        larguras = {"Tipo": 70, "Nome": 260, "Origem": 160, "Chamadas": 70, "Linhas": 70,
+                    "p50": 70, "p95": 70, "p99": 70, "Máx": 70}
+        for coluna in colunas:
+            self.tree_diagnostico.heading(coluna, text=coluna + (" (ms)" if coluna in ("p50", "p95", "p99", "Máx") else ""))
+            self.tree_diagnostico.column(coluna, width=larguras[coluna], anchor="w" if coluna in ("Tipo", "Nome", "Origem") else "e")
+        
+        self.tree_diagnostico.tag_configure("lenta", foreground="#dc2626")
+        self.tree_diagnostico.pack(fill="both", expand=True)
+        self.tree_diagnostico.bind("<<TreeviewSelect>>", lambda e: self.mostrar_detalhes_diagnostico())
+        
+        # SQL e plano da consulta selecionada
+        self.text_diagnostico = tk.Text(frame, height=7, font=("Courier", 9), wrap="word", bg="#f8fafc")
+        self.text_diagnostico.pack(fill="x", pady=(10, 20))
+        
+        self.carregar_diagnostico()
+    
     # ========== FUNÇÕES DE OPERAÇÃO ==========
     
     def salvar_processo(self):
@@ -1076,7 +1591,7 @@ class SistemaJuridico:
             messagebox.showerror("Erro", "O número do processo é obrigatório!")
             return
         
-        if not self.combo_cliente_processo.get().strip():
+        if not self.entry_cliente_processo.get().strip():
             messagebox.showerror("Erro", "O nome do cliente é obrigatório!")
             return
         
@@ -1090,34 +1605,35 @@ class SistemaJuridico:
             messagebox.showerror("Erro", "Valor da causa inválido!")
             return
         
+        # Gravada no formato canônico (AAAA-MM-DD)
+        data_distribuicao = datas.normalizar(self.entry_data.get(), datas.DATA)
+        if data_distribuicao is None:
+            messagebox.showerror("Erro", "Data de distribuição inválida! Use: DD/MM/AAAA")
+            return
+        
         numero = self.entry_numero.get().strip()
-        cliente = self.combo_cliente_processo.get().strip()
+        cliente = self.entry_cliente_processo.get().strip()
         tipo_acao = self.combo_tipo.get()
         vara = self.entry_vara.get().strip()
         status = self.combo_status.get()
-        data_distribuicao = self.entry_data.get()
         observacoes = self.text_obs.get("1.0", "end-1c")
         data_cadastro = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         
         try:
-            self.cursor.execute('''
-                INSERT INTO processos 
-                (numero, cliente, tipo_acao, vara, status, data_distribuicao, valor_causa, observacoes, data_cadastro)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (numero, cliente, tipo_acao, vara, status, data_distribuicao, valor_causa, observacoes, data_cadastro))
-            
-            self.conn.commit()
+            processo_id = self.db.processos.inserir(numero, cliente, tipo_acao, vara, status, data_distribuicao, valor_causa, observacoes, data_cadastro)
             
             messagebox.showinfo("Sucesso", "Processo cadastrado com sucesso!")
             
             self.entry_numero.delete(0, tk.END)
-            self.combo_cliente_processo.set('')
+            self.auto_cliente_processo.limpar()
             self.entry_vara.delete(0, tk.END)
             self.entry_valor.delete(0, tk.END)
             self.entry_valor.insert(0, "0.00")
             self.text_obs.delete("1.0", tk.END)
             
-            self.carregar_processos()
+            # Só a linha gravada entra na lista, sem recarregar as demais
+            self.lista_processos.atualizar(processo_id)
+            self.marcar_alteracao("processos")
             
         except sqlite3.IntegrityError:
             messagebox.showerror("Erro", "Já existe um processo com este número!")
@@ -1139,13 +1655,7 @@ class SistemaJuridico:
         data_cadastro = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         
         try:
-            self.cursor.execute('''
-                INSERT INTO clientes
-                (nome, cpf_cnpj, telefone, email, endereco, observacoes, data_cadastro)
-                VALUES (?, ?, ?, ?, ?, ?, ?)
-            ''', (nome, cpf_cnpj, telefone, email, endereco, observacoes, data_cadastro))
-            
-            self.conn.commit()
+            cliente_id = self.db.clientes.inserir(nome, cpf_cnpj, telefone, email, endereco, observacoes, data_cadastro)
             
             messagebox.showinfo("Sucesso", "Cliente cadastrado com sucesso!")
             
@@ -1156,7 +1666,8 @@ class SistemaJuridico:
             self.entry_end_cliente.delete(0, tk.END)
             self.text_obs_cliente.delete("1.0", tk.END)
             
-            self.carregar_clientes()
+            self.lista_clientes.atualizar(cliente_id)
+            self.marcar_alteracao("clientes")
             
         except sqlite3.IntegrityError:
             messagebox.showerror("Erro", "Já existe um cliente com este CPF/CNPJ!")
@@ -1180,163 +1691,310 @@ class SistemaJuridico:
             messagebox.showerror("Erro", "Data/hora inválida! Use: DD/MM/AAAA HH:MM")
             return
         
-        processo_selecionado = self.combo_processo_tarefa.get()
-        processo_id = None
+        # O processo escolhido nas sugestões já traz o id; em branco, tarefa geral
+        processo_id = self.auto_processo_tarefa.selecionado()
+        if processo_id is None and self.entry_processo_tarefa.get().strip():
+            messagebox.showerror("Erro", "Escolha o processo na lista de sugestões (ou deixe em branco para uma tarefa geral)!")
+            return
         
-        if processo_selecionado != "Nenhum (tarefa geral)":
-            self.cursor.execute("SELECT id FROM processos WHERE numero = ?", (processo_selecionado,))
-            resultado = self.cursor.fetchone()
-            if resultado:
-                processo_id = resultado[0]
+        # Com prazo em dias úteis, a data é a calculada (com a hora digitada) e
+        # acompanha as mudanças nos feriados
+        prazo_inicio = prazo_dias = tribunal = None
+        try:
+            prazo = self.ler_prazo_tarefa()
+            if prazo is not None:
+                inicio, prazo_dias, tribunal = prazo
+                prazo_inicio = inicio.strftime(datas.DATA)
+                vencimento = self.db.prazos.vencimento(inicio, prazo_dias, tribunal)
+                data_vencimento = f"{vencimento:%Y-%m-%d} {data_vencimento[11:]}"
+        except ValueError as e:
+            messagebox.showerror("Erro", str(e))
+            return
         
         data_cadastro = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         
         try:
-            self.cursor.execute('''
-                INSERT INTO tarefas
-                (processo_id, titulo, descricao, tipo, data_vencimento, data_cadastro)
-                VALUES (?, ?, ?, ?, ?, ?)
-            ''', (processo_id, titulo, descricao, tipo, data_vencimento, data_cadastro))
-            
-            self.conn.commit()
+            tarefa_id = self.db.tarefas.inserir(
+                processo_id, titulo, descricao, tipo, data_vencimento, data_cadastro,
+                prazo_inicio, prazo_dias, tribunal
+            )
             
             messagebox.showinfo("Sucesso", "Tarefa cadastrada com sucesso!")
             
             self.entry_titulo_tarefa.delete(0, tk.END)
             self.text_desc_tarefa.delete("1.0", tk.END)
-            self.combo_processo_tarefa.current(0)
+            self.auto_processo_tarefa.limpar()
             self.entry_data_tarefa.delete(0, tk.END)
             self.entry_data_tarefa.insert(0, datetime.now().strftime("%d/%m/%Y %H:%M"))
+            self.entry_dias_prazo.delete(0, tk.END)
+            self.lbl_prazo_tarefa.config(text="")
             
-            self.carregar_tarefas()
+            self.lembretes.adicionar(tarefa_id, data_vencimento)
+            self.lista_tarefas.atualizar(tarefa_id)
+            self.marcar_alteracao("tarefas")
             
         except Exception as e:
             messagebox.showerror("Erro", f"Erro ao salvar tarefa: {str(e)}")
     
-    def carregar_processos(self):
-        """Carrega os processos"""
-        for item in self.tree_processos.get_children():
-            self.tree_processos.delete(item)
-        
-        self.cursor.execute('''
-            SELECT numero, cliente, tipo_acao, status, data_distribuicao 
-            FROM processos 
-            ORDER BY data_cadastro DESC
-        ''')
-        
-        processos = self.cursor.fetchall()
+    def ler_prazo_tarefa(self):
+        """(início, dias úteis, tribunal) do formulário de tarefas, ou None sem prazo
+        
+        O tribunal é o do processo escolhido (número CNJ); sem processo, vale
+        o calendário comum a todos. Levanta ValueError com a mensagem do erro.
+        """
+        texto_dias = self.entry_dias_prazo.get().strip()
+        if not texto_dias:
+            return None
+        if not texto_dias.isdigit() or int(texto_dias) < 1:
+            raise ValueError("O prazo deve ser um número inteiro de dias úteis!")
+        
+        inicio = prazos.data_inicio(self.entry_inicio_prazo.get())
+        if inicio is None:
+            raise ValueError("Data de início do prazo inválida! Use: DD/MM/AAAA")
+        
+        tribunal = prazos.TODOS
+        if self.auto_processo_tarefa.selecionado() is not None:
+            # Texto da sugestão escolhida: "número — cliente"
+            tribunal = prazos.tribunal_do_numero(self.entry_processo_tarefa.get().split(" — ")[0])
+        return inicio, int(texto_dias), tribunal
+    
+    def calcular_prazo_tarefa(self):
+        """Preenche a data/hora da tarefa com o vencimento do prazo em dias úteis"""
+        try:
+            prazo = self.ler_prazo_tarefa()
+            if prazo is None:
+                raise ValueError("Informe o prazo em dias úteis!")
+            inicio, dias, tribunal = prazo
+            vencimento = self.db.prazos.vencimento(inicio, dias, tribunal)
+        except ValueError as e:
+            messagebox.showerror("Erro", str(e))
+            return
         
-        for processo in processos:
-            self.tree_processos.insert("", "end", values=processo)
+        self.entry_data_tarefa.delete(0, tk.END)
+        self.entry_data_tarefa.insert(0, f"{vencimento:%d/%m/%Y} {prazos.HORA_VENCIMENTO}")
+        calendario = f"calendário do tribunal {tribunal}" if tribunal else "calendário nacional"
+        self.lbl_prazo_tarefa.config(text=f"Vence em {vencimento:%d/%m/%Y} ({calendario})")
+    
+    def carregar_processos(self):
+        """Carrega os processos (primeira página da lista virtual)"""
+        self.lista_processos.recarregar()
     
     def carregar_clientes(self):
-        """Carrega os clientes"""
-        for item in self.tree_clientes.get_children():
-            self.tree_clientes.delete(item)
-        
-        self.cursor.execute('''
-            SELECT c.nome, c.cpf_cnpj, c.telefone, c.email, 
-                   (SELECT COUNT(*) FROM processos p WHERE p.cliente = c.nome) as num_processos
-            FROM clientes c
-            ORDER BY c.nome
-        ''')
-        
-        clientes = self.cursor.fetchall()
-        
-        for cliente in clientes:
-            self.tree_clientes.insert("", "end", values=cliente)
+        """Carrega os clientes (primeira página da lista virtual)"""
+        self.lista_clientes.recarregar()
     
     def carregar_tarefas(self):
-        """Carrega as tarefas"""
-        for item in self.tree_tarefas.get_children():
-            self.tree_tarefas.delete(item)
-        
+        """Carrega as tarefas (primeira página da lista virtual)"""
+        # O filtro e o horário de referência valem para todas as páginas desta carga
         filtro = self.combo_filtro_tarefa.get()
+        agora = datetime.now().strftime("%Y-%m-%d %H:%M")
+        self.lista_tarefas.recarregar(
+            lambda db, direcao, chave, limite: db.tarefas.pagina(filtro, agora, direcao, chave, limite),
+            lambda db, tarefa_id: db.tarefas.linha_lista(filtro, agora, tarefa_id)
+        )
+    
+    def criar_autocompletar(self, entry, buscar, exibir=None):
+        """Liga ao Entry uma lista de sugestões buscadas a cada pausa na digitação"""
+        lista = tk.Listbox(
+            self.root,
+            font=("Arial", 10),
+            bg="white",
+            fg=self.cor_texto,
+            selectbackground=self.cor_primaria,
+            relief="solid",
+            bd=1,
+            activestyle="none",
+            exportselection=False
+        )
+        return CampoAutocompletar(entry, lista, self.executor, buscar, exibir)
+    
+    def erro_consulta(self, erro):
+        """Erro de uma consulta em segundo plano"""
+        messagebox.showerror("Erro", f"Erro ao consultar o banco de dados: {str(erro)}")
+    
+    def formatar_tarefa(self, linha):
+        """Valores de uma tarefa para o Treeview (situação e data já vêm formatadas do banco)"""
+        tarefa_id, vencimento, status, titulo, tipo, venc_formatado, processo_texto, data_valida = linha
         
-        if filtro == "Pendentes":
-            where_clause = "WHERE t.concluida=0"
-        elif filtro == "Concluídas":
-            where_clause = "WHERE t.concluida=1"
-        elif filtro == "Atrasadas":
-            agora = datetime.now().strftime("%Y-%m-%d %H:%M")
-            where_clause = f"WHERE t.concluida=0 AND t.data_vencimento < '{agora}'"
-        else:
-            where_clause = ""
-        
-        self.cursor.execute(f'''
-            SELECT t.id, t.titulo, t.tipo, t.data_vencimento, t.concluida, p.numero
-            FROM tarefas t
-            LEFT JOIN processos p ON t.processo_id = p.id
-            {where_clause}
-            ORDER BY t.data_vencimento ASC
-        ''')
-        
-        tarefas = self.cursor.fetchall()
+        if not data_valida:
+            # Exibida e destacada em vez de descartada, para que possa ser corrigida
+            # (o aviso no console sai uma vez, em avisar_datas_invalidas)
+            return ("❗", titulo, tipo, f"{vencimento} (data inválida)", processo_texto), ("data_invalida",)
         
-        for tarefa_id, titulo, tipo, vencimento, concluida, numero_processo in tarefas:
-            try:
-                data_venc = datetime.strptime(vencimento, "%Y-%m-%d %H:%M")
-                venc_formatado = data_venc.strftime("%d/%m/%Y %H:%M")
-                
-                if concluida:
-                    status = "✓"
-                else:
-                    if data_venc < datetime.now():
-                        status = "⚠️"
-                    else:
-                        status = "⏳"
-                
-                processo_texto = numero_processo if numero_processo else "-"
-                
-                self.tree_tarefas.insert("", "end", values=(status, titulo, tipo, venc_formatado, processo_texto), tags=(tarefa_id,))
-            except:
-                pass
-    
-    def realizar_busca(self):
-        """Realiza busca avançada de processos"""
-        for item in self.tree_busca.get_children():
-            self.tree_busca.delete(item)
-        
-        numero = self.entry_busca_numero.get().strip()
-        cliente = self.entry_busca_cliente.get().strip()
+        return (status, titulo, tipo, venc_formatado, processo_texto), ()
+    
+    # Pausa na digitação (ms) que dispara a busca
+    ESPERA_BUSCA = 150
+    
+    # Resultados trazidos por busca, os mais relevantes; a exportação traz todos
+    PAGINA_BUSCA = 100
+    
+    # Tamanho mínimo de um campo de texto para a busca enquanto digita
+    MINIMO_CARACTERES_BUSCA = 2
+    
+    def agendar_busca(self, evento=None):
+        """Busca quando o usuário parar de digitar (cada tecla reinicia a espera)"""
+        if self.busca_agendada is not None:
+            self.root.after_cancel(self.busca_agendada)
+        self.busca_agendada = self.root.after(self.ESPERA_BUSCA, self.buscar_se_mudou)
+    
+    def buscar_se_mudou(self):
+        """Busca agendada: só se os critérios mudaram (setas, Tab etc. não buscam de novo)"""
+        self.busca_agendada = None
+        if not self.tree_busca.winfo_exists():
+            return
+        filtros = self.filtros_busca()
+        if filtros == self.ultima_busca:
+            return
+        # Um único caractere casa quase tudo; espera o próximo (Enter busca assim mesmo)
+        if any(0 < len(campo) < self.MINIMO_CARACTERES_BUSCA for campo in filtros[:3]):
+            self.lbl_resultado_busca.config(text=f"Digite ao menos {self.MINIMO_CARACTERES_BUSCA} caracteres")
+            return
+        # Enquanto digita, a relevância é calculada só entre as ocorrências mais recentes
+        self.realizar_busca(CANDIDATOS_BUSCA)
+    
+    def realizar_busca(self, candidatas=-1):
+        """Busca a primeira página de processos com os critérios do formulário
+        
+        A busca anterior que ainda estiver rodando é interrompida
+        (Connection.interrupt() pela chave "busca" do executor) e seu
+        resultado, descartado; a lista atual fica na tela até a nova chegar.
+        Com candidatas, só as ocorrências mais recentes são ordenadas (veja
+        RepositorioBusca.processos); Enter e o botão ordenam todas.
+        """
+        if self.busca_agendada is not None:
+            self.root.after_cancel(self.busca_agendada)
+            self.busca_agendada = None
+        
+        filtros = self.filtros_busca()
+        self.ultima_busca = filtros
+        self.lbl_resultado_busca.config(text="⏳ Buscando...")
+        # Com tipo ou status (ou sem texto para buscar) o limite não se aplica
+        parcial = candidatas >= 0 and any(filtros[:3]) and filtros[3] is None and filtros[4] is None
+        
+        # Índice textual: ignora acentos, casa por prefixo e ordena por relevância
+        self.executor.executar(
+            lambda db: db.busca.processos(*filtros, limite=self.PAGINA_BUSCA, candidatas=candidatas),
+            chave="busca",
+            ao_concluir=lambda resultados: self.mostrar_resultados_busca(resultados, parcial),
+            ao_falhar=self.erro_consulta
+        )
+    
+    def filtros_busca(self):
+        """Critérios do formulário de busca: (numero, cliente, texto, tipo, status)"""
         tipo = self.combo_busca_tipo.get()
         status = self.combo_busca_status.get()
+        return (
+            self.entry_busca_numero.get().strip(),
+            self.entry_busca_cliente.get().strip(),
+            self.entry_busca_texto.get().strip(),
+            tipo if tipo != "Todos" else None,
+            status if status != "Todos" else None
+        )
+    
+    def exportar_busca(self):
+        """Exporta todos os processos que atendem aos critérios da busca"""
+        # Na fila atrás de uma restauração, a exportação travaria a troca do banco
+        # (suspender() espera o executor de manutenção esvaziar)
+        if self.backup_em_andamento:
+            messagebox.showwarning("Aviso", "Aguarde o término do backup ou da restauração em andamento.")
+            return
         
-        # Construir query
-        query = "SELECT numero, cliente, tipo_acao, status, vara, data_distribuicao FROM processos WHERE 1=1"
-        params = []
+        arquivo = self.pedir_arquivo_exportacao("resultados_busca")
+        if not arquivo:
+            return
         
-        if numero:
-            query += " AND numero LIKE ?"
-            params.append(f"%{numero}%")
+        filtros = self.filtros_busca()
+        self.exportacao_em_andamento(True)
         
-        if cliente:
-            query += " AND cliente LIKE ?"
-            params.append(f"%{cliente}%")
+        def progresso(linhas, total):
+            # Chamado na thread do executor
+            self.executor_manutencao.notificar(self.atualizar_progresso_exportacao, linhas)
         
-        if tipo != "Todos":
-            query += " AND tipo_acao = ?"
-            params.append(tipo)
+        def concluido(linhas):
+            self.exportacao_em_andamento(False)
+            messagebox.showinfo("Exportação", f"✅ {linhas} processo(s) exportado(s) para:\n{arquivo}")
         
-        if status != "Todos":
-            query += " AND status = ?"
-            params.append(status)
+        def falhou(erro):
+            self.exportacao_em_andamento(False)
+            messagebox.showerror("Erro", f"Erro ao exportar: {str(erro)}")
         
-        query += " ORDER BY data_cadastro DESC"
+        self.executor_manutencao.executar(
+            lambda db: exportacao.exportar_busca(db, arquivo, *filtros, progresso=progresso),
+            ao_concluir=concluido,
+            ao_falhar=falhou
+        )
+    
+    def exportacao_em_andamento(self, ativa):
+        """Liga/desliga o botão e a barra de progresso da exportação da busca"""
+        if "busca" not in self.telas or not self.progresso_exportacao.winfo_exists():
+            return
+        self.btn_exportar_busca.config(state="disabled" if ativa else "normal")
+        self.progresso_exportacao.config(value=0)
+        self.lbl_progresso_exportacao.config(text="Exportando..." if ativa else "")
+    
+    def atualizar_progresso_exportacao(self, linhas):
+        """Avança a barra da exportação da busca (o total só se conhece ao final)"""
+        if "busca" not in self.telas or not self.progresso_exportacao.winfo_exists():
+            return
+        self.progresso_exportacao.step(5)
+        self.lbl_progresso_exportacao.config(text=f"Exportando... {linhas} processo(s)")
+    
+    def pedir_arquivo_exportacao(self, nome):
+        """Pergunta onde salvar a exportação; o formato vem da extensão escolhida"""
+        return filedialog.asksaveasfilename(
+            title="Exportar",
+            defaultextension=".xlsx",
+            filetypes=[("Planilha do Excel", "*.xlsx"), ("CSV", "*.csv"), ("JSON Lines", "*.jsonl")],
+            initialfile=f"{nome}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
+        )
+    
+    def mostrar_resultados_busca(self, resultados, parcial=False):
+        """Exibe os resultados da busca avançada e a quantidade encontrada
+        
+        parcial: a relevância foi calculada só entre as ocorrências mais recentes.
+        """
+        if not self.tree_busca.winfo_exists():
+            return
         
-        self.cursor.execute(query, params)
-        resultados = self.cursor.fetchall()
+        self.tree_busca.delete(*self.tree_busca.get_children())
+        
+        for resultado in resultados:
+            self.tree_busca.insert("", "end", iid=str(resultado[0]), values=resultado[1:])
         
         if not resultados:
-            messagebox.showinfo("Busca", "Nenhum processo encontrado com os critérios informados.")
+            texto = "Nenhum processo encontrado com os critérios informados."
+        elif parcial:
+            texto = (f"{len(resultados)} processo(s) entre as ocorrências mais recentes. "
+                     "Tecle Enter para ordenar todas por relevância.")
+        elif len(resultados) == self.PAGINA_BUSCA:
+            texto = (f"Os {len(resultados)} processos mais relevantes. "
+                     "Refine a busca ou exporte para ver todos.")
         else:
-            for resultado in resultados:
-                self.tree_busca.insert("", "end", values=resultado)
-            
-            messagebox.showinfo("Busca", f"{len(resultados)} processo(s) encontrado(s)!")
+            texto = f"{len(resultados)} processo(s) encontrado(s)"
+        self.lbl_resultado_busca.config(text=texto)
     
     def fazer_backup(self):
-        """Faz backup do banco de dados"""
+        """Cria um snapshot incremental no repositório de backups"""
+        def concluido(manifesto):
+            gravados_kb = manifesto["bytes_gravados"] / 1024
+            messagebox.showinfo(
+                "Sucesso",
+                f"Backup realizado com sucesso!\n\n"
+                f"Snapshot: {manifesto['nome']}\n"
+                f"Blocos novos: {manifesto['blocos_novos']} de {len(manifesto['blocos'])} "
+                f"({gravados_kb:.1f} KB gravados)\n\n"
+                f"Repositório: {os.path.abspath(self.repositorio_backup.raiz)}"
+            )
+        
+        # Nenhuma conexão é fechada: o retrato do banco vem da API de backup
+        self.tarefa_backup(
+            lambda db, progresso: self.repositorio_backup.criar(db.conn, progresso=progresso),
+            concluido
+        )
+    
+    def exportar_copia_banco(self):
+        """Exporta uma cópia completa do banco para um arquivo .db"""
         try:
             arquivo_destino = filedialog.asksaveasfilename(
                 title="Salvar backup",
@@ -1346,21 +2004,142 @@ class SistemaJuridico:
             )
             
             if arquivo_destino:
-                # Fechar conexão temporariamente
-                self.conn.close()
-                
-                # Copiar arquivo
-                shutil.copy2('sistema_juridico.db', arquivo_destino)
-                
-                # Reabrir conexão
-                self.conn = sqlite3.connect('sistema_juridico.db')
-                self.cursor = self.conn.cursor()
-                
-                messagebox.showinfo("Sucesso", f"Backup realizado com sucesso!\n\nArquivo salvo em:\n{arquivo_destino}")
+                # Backup online: nenhuma conexão é fechada, a cópia roda em segundo plano
+                self.tarefa_backup(
+                    lambda db, progresso: backup.copiar_online(db.conn, arquivo_destino, progresso=progresso),
+                    lambda paginas: messagebox.showinfo(
+                        "Sucesso",
+                        f"Backup realizado com sucesso!\n\nArquivo salvo em:\n{arquivo_destino}"
+                    )
+                )
         
         except Exception as e:
             messagebox.showerror("Erro", f"Erro ao fazer backup: {str(e)}")
     
+    def verificar_backups(self):
+        """Confere todos os blocos do repositório de backups"""
+        def concluido(problemas):
+            if not problemas:
+                messagebox.showinfo("Backups", "✅ Todos os backups estão íntegros.")
+                return
+            linhas = [f"{nome}: {problema}" for nome, problema in problemas[:15]]
+            messagebox.showerror(
+                "Backups",
+                f"❌ {len(problemas)} problema(s) encontrado(s):\n\n" + "\n".join(linhas)
+            )
+        
+        self.tarefa_backup(
+            lambda db, progresso: self.repositorio_backup.verificar(progresso=progresso),
+            concluido
+        )
+    
+    def importar_dados(self):
+        """Importa clientes, processos, tarefas ou andamentos de um arquivo CSV/JSONL"""
+        tabela = self.combo_tabela_importacao.get()
+        arquivo = filedialog.askopenfilename(
+            title=f"Importar {tabela}",
+            filetypes=[("CSV ou JSONL", "*.csv *.jsonl *.json"), ("Todos os arquivos", "*.*")]
+        )
+        if not arquivo:
+            return
+        
+        def importar(db, progresso):
+            return importacao.importar_arquivo(
+                db.conn, tabela, arquivo,
+                progresso=lambda lidos, total, resumo: progresso(lidos, total, f"Importando {tabela}")
+            )
+        
+        def concluido(resumo):
+            if resumo["inseridas"]:
+                self.marcar_alteracao(tabela)
+                if tabela == "tarefas":
+                    self.lembretes.carregar()
+            mensagem = importacao.descrever(resumo)
+            if resumo["relatorio"]:
+                messagebox.showwarning(
+                    "Importação",
+                    f"{mensagem}\n\nRegistros rejeitados em:\n{resumo['relatorio']}"
+                )
+            else:
+                messagebox.showinfo("Importação", f"✅ {mensagem}")
+        
+        self.tarefa_backup(importar, concluido, "Erro ao importar")
+    
+    def exportar_tabela(self):
+        """Exporta a tabela escolhida inteira para .xlsx, .csv ou .jsonl"""
+        tabela = self.combo_tabela_importacao.get()
+        arquivo = self.pedir_arquivo_exportacao(tabela)
+        if not arquivo:
+            return
+        
+        self.tarefa_backup(
+            lambda db, progresso: exportacao.exportar_tabela(
+                db, tabela, arquivo,
+                progresso=lambda linhas, total: progresso(linhas, total, f"Exportando {tabela}")
+            ),
+            lambda linhas: messagebox.showinfo(
+                "Exportação",
+                f"✅ {linhas} registro(s) de {tabela} exportado(s) para:\n{arquivo}"
+            ),
+            "Erro ao exportar"
+        )
+    
+    def tarefa_backup(self, funcao, ao_concluir, mensagem_erro="Erro ao fazer backup"):
+        """Roda funcao(db, progresso) no executor de manutenção, com barra de progresso"""
+        if self.backup_em_andamento:
+            messagebox.showwarning("Aviso", "Aguarde o término do backup em andamento.")
+            return
+        
+        self.backup_em_andamento = True
+        self.atualizar_progresso_backup(0, 0)
+        
+        def progresso(feito, total, etapa="Processando"):
+            # Chamado na thread do executor
+            self.executor_manutencao.notificar(self.atualizar_progresso_backup, feito, total, etapa)
+        
+        self.executor_manutencao.executar(
+            funcao,
+            progresso,
+            ao_concluir=lambda resultado: self.backup_concluido(ao_concluir, resultado),
+            ao_falhar=lambda erro: self.backup_falhou(erro, mensagem_erro)
+        )
+    
+    def atualizar_progresso_backup(self, feito, total, etapa="Processando"):
+        """Mostra o progresso do backup (se a tela de backup estiver aberta)
+
+        total 0 indica uma etapa sem estimativa: a barra apenas avança.
+        """
+        # A tela de backup continua montada quando escondida: o progresso segue atualizado
+        if "backup" not in self.telas or not self.progresso_backup.winfo_exists():
+            return
+        
+        if not self.backup_em_andamento:
+            self.btn_backup.config(state="normal")
+            self.progresso_backup.config(mode="determinate", value=0)
+            texto = ""
+        elif total:
+            self.btn_backup.config(state="disabled")
+            self.progresso_backup.config(mode="determinate", maximum=total, value=feito)
+            texto = f"{etapa}... {100 * feito // total}%"
+        else:
+            self.btn_backup.config(state="disabled")
+            self.progresso_backup.config(mode="indeterminate")
+            self.progresso_backup.step(5)
+            texto = f"{etapa}..." if feito else "Iniciando..."
+        self.lbl_progresso_backup.config(text=texto)
+    
+    def backup_concluido(self, ao_concluir, resultado):
+        """Fim de uma tarefa de backup em segundo plano"""
+        self.backup_em_andamento = False
+        self.atualizar_progresso_backup(0, 0)
+        ao_concluir(resultado)
+    
+    def backup_falhou(self, erro, mensagem_erro):
+        """Erro numa tarefa de backup em segundo plano"""
+        self.backup_em_andamento = False
+        self.atualizar_progresso_backup(0, 0)
+        messagebox.showerror("Erro", f"{mensagem_erro}: {str(erro)}")
+    
     def restaurar_backup(self):
         """Restaura um backup do banco de dados"""
         resposta = messagebox.askyesno(
@@ -1371,38 +2150,174 @@ class SistemaJuridico:
         if not resposta:
             return
         
+        if self.backup_em_andamento:
+            messagebox.showwarning("Aviso", "Aguarde o término do backup em andamento.")
+            return
+        
         try:
             arquivo_origem = filedialog.askopenfilename(
                 title="Selecionar backup",
-                filetypes=[("Banco de Dados", "*.db"), ("Todos os arquivos", "*.*")]
+                initialdir=self.repositorio_backup.dir_snapshots if os.path.isdir(self.repositorio_backup.dir_snapshots) else None,
+                filetypes=[
+                    ("Backups", "*.json *.db"),
+                    ("Snapshot incremental", "*.json"),
+                    ("Banco de Dados", "*.db"),
+                    ("Todos os arquivos", "*.*")
+                ]
             )
             
             if arquivo_origem:
-                # Fechar conexão
-                self.conn.close()
-                
-                # Fazer backup do arquivo atual antes de substituir
-                backup_atual = f"sistema_juridico_antes_restauracao_{datetime.now().strftime('%Y%m%d_%H%M%S')}.db"
-                shutil.copy2('sistema_juridico.db', backup_atual)
-                
-                # Substituir pelo backup
-                shutil.copy2(arquivo_origem, 'sistema_juridico.db')
-                
-                # Reabrir conexão
-                self.conn = sqlite3.connect('sistema_juridico.db')
-                self.cursor = self.conn.cursor()
-                
-                messagebox.showinfo(
-                    "Sucesso",
-                    f"Backup restaurado com sucesso!\n\nUm backup dos dados anteriores foi salvo em:\n{backup_atual}\n\nO sistema será reiniciado."
+                # Verificação e cópia em segundo plano; o banco atual segue em uso até a troca
+                self.tarefa_backup(
+                    lambda db, progresso: self.preparar_restauracao(db, arquivo_origem, progresso),
+                    self.concluir_restauracao,
+                    "Erro ao restaurar backup"
                 )
-                
-                # Recarregar tela
-                self.mostrar_tela("dashboard")
         
         except Exception as e:
             messagebox.showerror("Erro", f"Erro ao restaurar backup: {str(e)}")
     
+    def preparar_restauracao(self, db, arquivo_origem, progresso):
+        """Verifica/copia o backup e salva os dados atuais (thread do executor de manutenção)
+        
+        O snapshot dos dados atuais só é criado depois de o backup passar na
+        verificação: um arquivo inválido é recusado sem deixar snapshot.
+        """
+        if arquivo_origem.endswith(".json"):
+            # Manifesto em <repositório>/snapshots/<nome>.json
+            raiz = os.path.dirname(os.path.dirname(arquivo_origem))
+            nome = os.path.splitext(os.path.basename(arquivo_origem))[0]
+            temporario = restauracao.preparar_snapshot(
+                RepositorioBackup(raiz), nome, 'sistema_juridico.db', progresso=progresso
+            )
+        else:
+            temporario = restauracao.preparar(arquivo_origem, 'sistema_juridico.db', progresso=progresso)
+        
+        try:
+            # Snapshot dos dados atuais antes de substituir (só as partes que mudaram)
+            backup_atual = self.repositorio_backup.criar(
+                db.conn,
+                rotulo="antes da restauração",
+                progresso=lambda feito, total: progresso(feito, total, "Salvando os dados atuais")
+            )["nome"]
+        except BaseException:
+            restauracao.descartar(temporario)
+            raise
+        
+        return backup_atual, temporario
+    
+    def concluir_restauracao(self, preparado):
+        """Troca o banco pelo arquivo verificado e reabre as conexões"""
+        backup_atual, temporario = preparado
+        
+        try:
+            # Única etapa com as conexões fechadas: uma renomeação atômica
+            self.executor.suspender()
+            self.executor_manutencao.suspender()
+            self.db.fechar()
+            
+            try:
+                restauracao.substituir(temporario, 'sistema_juridico.db')
+            finally:
+                # Conexões novas: comandos preparados e páginas em cache do banco anterior são descartados
+                self.db.abrir()
+                self.executor.retomar()
+                self.executor_manutencao.retomar()
+        
+        except Exception as e:
+            restauracao.descartar(temporario)
+            messagebox.showerror("Erro", f"Erro ao restaurar backup: {str(e)}")
+            return
+        
+        messagebox.showinfo(
+            "Sucesso",
+            f"Backup restaurado com sucesso!\n\nUm snapshot dos dados anteriores foi salvo no repositório de backups:\n{backup_atual}\n\nO sistema será reiniciado."
+        )
+        
+        # Um backup antigo pode ter linhas que as migrações em lotes ainda não converteram
+        self.executor_manutencao.executar(
+            lambda db: manutencao.executar_pendentes(db.conn),
+            ao_concluir=self.manutencao_concluida,
+            ao_falhar=self.erro_consulta
+        )
+        
+        # Recarregar tela (listas e telas são recriadas sobre as novas conexões)
+        self.lembretes.carregar()
+        self.descartar_telas()
+        self.mostrar_tela("dashboard")
+    
+    def verificar_contadores(self):
+        """Recalcula os contadores do dashboard e corrige divergências, no executor de manutenção"""
+        # Recontagem de todas as tabelas (e talvez uma gravação): fora da thread do Tk
+        self.executor_manutencao.executar(
+            lambda db: db.estatisticas.verificar(corrigir=True),
+            ao_concluir=self.mostrar_contadores,
+            ao_falhar=lambda erro: messagebox.showerror("Erro", f"Erro ao verificar contadores: {str(erro)}")
+        )
+    
+    def mostrar_contadores(self, divergencias):
+        """Informa as divergências encontradas (e já corrigidas) nos contadores"""
+        if not divergencias:
+            messagebox.showinfo("Contadores", "✅ Todos os contadores estão corretos.")
+            return
+        
+        linhas = [f"{chave}: {armazenado} → {real}" for chave, armazenado, real in divergencias]
+        messagebox.showwarning(
+            "Contadores",
+            "Foram encontradas e corrigidas divergências:\n\n" + "\n".join(linhas)
+        )
+    
+    def verificar_vinculos(self):
+        """Informa os processos cujo cliente não pôde ser identificado pelo nome"""
+        self.executor.executar(
+            lambda db: db.processos.sem_cliente(),
+            chave="vinculos",
+            ao_concluir=self.mostrar_vinculos,
+            ao_falhar=self.erro_consulta
+        )
+    
+    def mostrar_vinculos(self, pendentes):
+        """Mostra o relatório de vínculos processo-cliente"""
+        if not pendentes:
+            messagebox.showinfo("Vínculos", "✅ Todos os processos estão vinculados a um cliente.")
+            return
+        
+        sem_cadastro = [p for p in pendentes if p[3] == 0]
+        ambiguos = [p for p in pendentes if p[3] > 1]
+        
+        linhas = [f"• {numero} — \"{cliente}\" ({candidatos} clientes com esse nome)"
+                  for _, numero, cliente, candidatos in ambiguos[:10]]
+        linhas += [f"• {numero} — \"{cliente}\" (cliente não cadastrado)"
+                   for _, numero, cliente, _ in sem_cadastro[:10]]
+        
+        messagebox.showwarning(
+            "Vínculos",
+            f"{len(ambiguos)} processo(s) com nome de cliente ambíguo e "
+            f"{len(sem_cadastro)} com cliente não cadastrado:\n\n" + "\n".join(linhas)
+        )
+    
+    def verificar_datas(self):
+        """Informa as datas antigas que não puderam ser convertidas para o formato padrão"""
+        self.executor.executar(
+            lambda db: manutencao.relatorio_datas(db.conn),
+            chave="datas",
+            ao_concluir=self.mostrar_datas,
+            ao_falhar=self.erro_consulta
+        )
+    
+    def mostrar_datas(self, problemas):
+        """Mostra o relatório de datas fora do padrão"""
+        if not problemas:
+            messagebox.showinfo("Datas", "✅ Todas as datas estão no formato padrão.")
+            return
+        
+        linhas = [f"• {tabela}.{coluna} #{linha_id}: \"{valor}\""
+                  for tabela, coluna, linha_id, valor in problemas[:20]]
+        messagebox.showwarning(
+            "Datas",
+            f"{len(problemas)} data(s) fora do formato padrão (corrija-as manualmente):\n\n" + "\n".join(linhas)
+        )
+    
     def concluir_tarefa(self):
         """Marca tarefa como concluída"""
         selecao = self.tree_tarefas.selection()
@@ -1410,20 +2325,18 @@ class SistemaJuridico:
             messagebox.showwarning("Aviso", "Selecione uma tarefa!")
             return
         
-        tarefa_id = self.tree_tarefas.item(selecao[0])['tags'][0]
+        # O iid do item é o id da tarefa
+        tarefa_id = int(selecao[0])
         data_conclusao = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         
         try:
-            self.cursor.execute('''
-                UPDATE tarefas 
-                SET concluida=1, data_conclusao=?
-                WHERE id=?
-            ''', (data_conclusao, tarefa_id))
-            
-            self.conn.commit()
+            self.db.tarefas.concluir(tarefa_id, data_conclusao)
             
+            self.lembretes.remover(tarefa_id)
             messagebox.showinfo("Sucesso", "Tarefa marcada como concluída!")
-            self.carregar_tarefas()
+            # Atualiza a situação ou tira a tarefa do filtro, mantendo a posição da lista
+            self.lista_tarefas.atualizar(tarefa_id)
+            self.marcar_alteracao("tarefas")
             
         except Exception as e:
             messagebox.showerror("Erro", f"Erro: {str(e)}")
@@ -1438,18 +2351,252 @@ class SistemaJuridico:
         if not messagebox.askyesno("Confirmar", "Tem certeza que deseja excluir esta tarefa?"):
             return
         
-        tarefa_id = self.tree_tarefas.item(selecao[0])['tags'][0]
+        tarefa_id = int(selecao[0])
         
         try:
-            self.cursor.execute("DELETE FROM tarefas WHERE id=?", (tarefa_id,))
-            self.conn.commit()
+            self.db.tarefas.excluir(tarefa_id)
+            self.lembretes.remover(tarefa_id)
             
             messagebox.showinfo("Sucesso", "Tarefa excluída!")
-            self.carregar_tarefas()
+            self.lista_tarefas.remover(tarefa_id)
+            self.marcar_alteracao("tarefas")
             
         except Exception as e:
             messagebox.showerror("Erro", f"Erro: {str(e)}")
     
+    # Alertas abertos ao mesmo tempo (os demais são resumidos) e tempo na tela (ms)
+    LIMITE_ALERTAS = 5
+    DURACAO_ALERTA = 20000
+    
+    def avisar_tarefas(self, avisos):
+        """Alerta de área de trabalho para as tarefas cujo aviso chegou (AgendaLembretes)"""
+        linhas = []
+        for tarefa_id, _, minutos in avisos:
+            # Concluída ou excluída fora desta janela (outra conexão, exclusão do processo)
+            tarefa = self.db.tarefas.lembrete(tarefa_id)
+            if tarefa is None:
+                continue
+            titulo, vencimento, tipo, numero = tarefa
+            linha = f"⏰ {titulo} ({tipo}): {lembretes.descrever_antecedencia(minutos)}, {datas.exibir(vencimento, datas.DATA_HORA)}"
+            if numero:
+                linha += f"\n      Processo {numero}"
+            linhas.append(linha)
+        
+        if not linhas:
+            return
+        if len(linhas) > self.LIMITE_ALERTAS:
+            restantes = len(linhas) - self.LIMITE_ALERTAS
+            linhas = linhas[:self.LIMITE_ALERTAS] + [f"... e mais {restantes} tarefa(s)"]
+        
+        self.mostrar_alerta("🔔 Lembrete de prazos", "\n".join(linhas))
+    
+    def mostrar_alerta(self, titulo, texto):
+        """Janela pequena, sempre por cima, no canto da tela; um clique abre as tarefas"""
+        if self.janela_alerta is not None and self.janela_alerta.winfo_exists():
+            self.janela_alerta.destroy()
+        
+        alerta = self.janela_alerta = tk.Toplevel(self.root)
+        alerta.overrideredirect(True)
+        alerta.attributes("-topmost", True)
+        alerta.configure(bg=self.cor_primaria)
+        
+        corpo = tk.Frame(alerta, bg="white")
+        corpo.pack(fill="both", expand=True, padx=2, pady=2)
+        tk.Label(corpo, text=titulo, font=("Arial", 11, "bold"), bg="white", fg=self.cor_texto).pack(anchor="w", padx=12, pady=(10, 4))
+        tk.Label(corpo, text=texto, font=("Arial", 10), bg="white", fg=self.cor_texto, justify="left").pack(anchor="w", padx=12, pady=(0, 10))
+        
+        def abrir_tarefas(evento=None):
+            alerta.destroy()
+            self.root.deiconify()
+            self.root.lift()
+            self.mostrar_tela("tarefas")
+        
+        for widget in (alerta, corpo, *corpo.winfo_children()):
+            widget.bind("<Button-1>", abrir_tarefas)
+        
+        alerta.update_idletasks()
+        x = alerta.winfo_screenwidth() - alerta.winfo_reqwidth() - 20
+        y = alerta.winfo_screenheight() - alerta.winfo_reqheight() - 60
+        alerta.geometry(f"+{x}+{y}")
+        alerta.after(self.DURACAO_ALERTA, alerta.destroy)
+        self.root.bell()
+    
+    def configurar_lembretes(self):
+        """Antecedências dos avisos de vencimento (nesta sessão; padrão em SISTEMA_JURIDICO_LEMBRETES)"""
+        texto = simpledialog.askstring(
+            "Lembretes",
+            "Avisar quanto tempo antes do vencimento?\n(ex.: 1d, 2h, 30min, 0 = no vencimento)",
+            initialvalue=lembretes.formatar_antecedencias(self.lembretes.antecedencias),
+            parent=self.root
+        )
+        if texto is None:
+            return
+        try:
+            self.lembretes.definir_antecedencias(lembretes.interpretar_antecedencias(texto))
+        except ValueError as e:
+            messagebox.showerror("Erro", str(e))
+    
+    def abrir_feriados(self):
+        """Janela de feriados e suspensões de prazo (nacionais ou de um tribunal)"""
+        if self.janela_feriados is not None and self.janela_feriados.winfo_exists():
+            self.janela_feriados.lift()
+            return
+        
+        janela = self.janela_feriados = tk.Toplevel(self.root)
+        janela.title("Feriados e suspensões de prazo")
+        janela.geometry("640x480")
+        janela.configure(bg="white")
+        
+        tk.Label(
+            janela,
+            text="Dias sem contagem de prazo, além dos fins de semana, feriados nacionais e do recesso (20/12 a 20/01).\n"
+                 "Tribunal: J.TR do número CNJ (ex.: 8.26 = TJSP, 5.02 = TRT-2); em branco, vale para todos.",
+            bg="white",
+            fg="#6b7280",
+            font=("Arial", 9),
+            justify="left"
+        ).pack(anchor="w", padx=15, pady=(15, 10))
+        
+        form = tk.Frame(janela, bg="white")
+        form.pack(fill="x", padx=15)
+        
+        tk.Label(form, text="Data:", bg="white", font=("Arial", 10)).pack(side="left")
+        self.entry_data_feriado = tk.Entry(form, font=("Arial", 10), width=12)
+        self.entry_data_feriado.pack(side="left", padx=(5, 15))
+        
+        tk.Label(form, text="Tribunal:", bg="white", font=("Arial", 10)).pack(side="left")
+        self.entry_tribunal_feriado = tk.Entry(form, font=("Arial", 10), width=6)
+        self.entry_tribunal_feriado.pack(side="left", padx=(5, 15))
+        
+        tk.Label(form, text="Descrição:", bg="white", font=("Arial", 10)).pack(side="left")
+        self.entry_desc_feriado = tk.Entry(form, font=("Arial", 10), width=22)
+        self.entry_desc_feriado.pack(side="left", padx=5)
+        
+        tree_frame = tk.Frame(janela, bg="white")
+        tree_frame.pack(fill="both", expand=True, padx=15, pady=10)
+        
+        scrollbar = ttk.Scrollbar(tree_frame)
+        scrollbar.pack(side="right", fill="y")
+        
+        self.tree_feriados = ttk.Treeview(
+            tree_frame,
+            columns=("Data", "Tribunal", "Descrição"),
+            show="headings",
+            yscrollcommand=scrollbar.set
+        )
+        scrollbar.config(command=self.tree_feriados.yview)
+        
+        self.tree_feriados.heading("Data", text="Data")
+        self.tree_feriados.heading("Tribunal", text="Tribunal")
+        self.tree_feriados.heading("Descrição", text="Descrição")
+        self.tree_feriados.column("Data", width=100)
+        self.tree_feriados.column("Tribunal", width=90)
+        self.tree_feriados.column("Descrição", width=380)
+        self.tree_feriados.pack(fill="both", expand=True)
+        
+        btn_frame = tk.Frame(janela, bg="white")
+        btn_frame.pack(pady=(0, 10))
+        
+        tk.Button(
+            btn_frame,
+            text="➕ Incluir",
+            font=("Arial", 10, "bold"),
+            bg=self.cor_primaria,
+            fg="white",
+            bd=0,
+            padx=15,
+            pady=6,
+            cursor="hand2",
+            command=self.incluir_feriado
+        ).pack(side="left", padx=5)
+        
+        tk.Button(
+            btn_frame,
+            text="🗑️ Excluir",
+            font=("Arial", 10, "bold"),
+            bg="#ef4444",
+            fg="white",
+            bd=0,
+            padx=15,
+            pady=6,
+            cursor="hand2",
+            command=self.excluir_feriado
+        ).pack(side="left", padx=5)
+        
+        self.lbl_recalculo_prazos = tk.Label(janela, text="", bg="white", fg="#6b7280", font=("Arial", 9))
+        self.lbl_recalculo_prazos.pack(pady=(0, 10))
+        
+        self.carregar_feriados()
+    
+    def carregar_feriados(self):
+        """Lista os feriados cadastrados (tabela pequena, lida de uma vez)"""
+        self.tree_feriados.delete(*self.tree_feriados.get_children())
+        for feriado_id, data, tribunal, descricao in self.db.prazos.feriados():
+            self.tree_feriados.insert(
+                "", "end", iid=str(feriado_id),
+                values=(datas.exibir(data, datas.DATA), tribunal or "Todos", descricao)
+            )
+    
+    def incluir_feriado(self):
+        """Grava o feriado e recalcula os prazos afetados"""
+        data = datas.normalizar(self.entry_data_feriado.get(), datas.DATA)
+        if data is None:
+            messagebox.showerror("Erro", "Data inválida! Use: DD/MM/AAAA", parent=self.janela_feriados)
+            return
+        
+        tribunal = self.entry_tribunal_feriado.get().strip()
+        descricao = self.entry_desc_feriado.get().strip()
+        
+        try:
+            self.db.prazos.incluir_feriado(data, tribunal, descricao)
+        except sqlite3.IntegrityError:
+            messagebox.showerror("Erro", "Esta data já está cadastrada para este tribunal!", parent=self.janela_feriados)
+            return
+        except Exception as e:
+            messagebox.showerror("Erro", f"Erro ao salvar feriado: {str(e)}", parent=self.janela_feriados)
+            return
+        
+        self.entry_data_feriado.delete(0, tk.END)
+        self.entry_desc_feriado.delete(0, tk.END)
+        self.carregar_feriados()
+        self.recalcular_prazos(tribunal)
+    
+    def excluir_feriado(self):
+        """Exclui o feriado selecionado e recalcula os prazos afetados"""
+        selecao = self.tree_feriados.selection()
+        if not selecao:
+            messagebox.showwarning("Aviso", "Selecione um feriado!", parent=self.janela_feriados)
+            return
+        
+        try:
+            tribunal = self.db.prazos.excluir_feriado(int(selecao[0]))
+        except Exception as e:
+            messagebox.showerror("Erro", f"Erro: {str(e)}", parent=self.janela_feriados)
+            return
+        
+        self.carregar_feriados()
+        if tribunal is not None:
+            self.recalcular_prazos(tribunal)
+    
+    def recalcular_prazos(self, tribunal):
+        """Recalcula em segundo plano o vencimento das tarefas abertas com prazo em dias úteis"""
+        self.lbl_recalculo_prazos.config(text="Recalculando prazos...")
+    
+        def concluido(alteradas):
+            if self.lbl_recalculo_prazos.winfo_exists():
+                self.lbl_recalculo_prazos.config(text=f"✅ {alteradas} prazo(s) com novo vencimento")
+            if alteradas:
+                self.lembretes.carregar()
+                self.marcar_alteracao("tarefas")
+                if self.tela_atual == "tarefas":
+                    self.carregar_tarefas()
+        
+        self.executor_manutencao.executar(
+            lambda db: db.prazos.recalcular(tribunal),
+            ao_concluir=concluido,
+            ao_falhar=self.erro_consulta
+        )
+    
     def excluir_processo(self):
         """Exclui um processo"""
         selecao = self.tree_processos.selection()
@@ -1460,21 +2607,16 @@ class SistemaJuridico:
         if not messagebox.askyesno("Confirmar", "Tem certeza? Todos os andamentos e tarefas vinculadas também serão excluídos!"):
             return
         
-        item = self.tree_processos.item(selecao[0])
-        numero_processo = item['values'][0]
+        # O iid do item é o id do processo
+        processo_id = int(selecao[0])
         
         try:
-            self.cursor.execute("SELECT id FROM processos WHERE numero = ?", (numero_processo,))
-            processo_id = self.cursor.fetchone()[0]
-            
-            self.cursor.execute("DELETE FROM andamentos WHERE processo_id = ?", (processo_id,))
-            self.cursor.execute("DELETE FROM tarefas WHERE processo_id = ?", (processo_id,))
-            self.cursor.execute("DELETE FROM processos WHERE id = ?", (processo_id,))
-            
-            self.conn.commit()
+            # Andamentos, tarefas e processo são excluídos na mesma transação
+            self.db.processos.excluir(processo_id)
             
             messagebox.showinfo("Sucesso", "Processo excluído!")
-            self.carregar_processos()
+            self.lista_processos.remover(processo_id)
+            self.marcar_alteracao("processos", "andamentos", "tarefas")
             
         except Exception as e:
             messagebox.showerror("Erro", f"Erro: {str(e)}")
@@ -1486,23 +2628,35 @@ class SistemaJuridico:
             messagebox.showwarning("Aviso", "Selecione um cliente!")
             return
         
-        item = self.tree_clientes.item(selecao[0])
-        nome_cliente = item['values'][0]
-        num_processos = item['values'][4]
+        # O iid do item é o id do cliente
+        cliente_id = int(selecao[0])
+        
+        try:
+            # Do banco, não da lista: processos sem vínculo também contam pelo nome
+            num_processos, sem_vinculo = self.db.clientes.processos(cliente_id)
+        except Exception as e:
+            messagebox.showerror("Erro", f"Erro: {str(e)}")
+            return
         
         if num_processos > 0:
             messagebox.showerror("Erro", f"Este cliente possui {num_processos} processo(s) cadastrado(s).\n\nExclua os processos antes de excluir o cliente!")
             return
         
-        if not messagebox.askyesno("Confirmar", "Tem certeza que deseja excluir este cliente?"):
+        if sem_vinculo > 0:
+            pergunta = (f"{sem_vinculo} processo(s) sem cliente vinculado têm o nome deste cliente "
+                        f"e ficarão sem cadastro (veja \"Verificar vínculos entre processos e clientes\").\n\n"
+                        f"Excluir o cliente mesmo assim?")
+        else:
+            pergunta = "Tem certeza que deseja excluir este cliente?"
+        if not messagebox.askyesno("Confirmar", pergunta):
             return
         
         try:
-            self.cursor.execute("DELETE FROM clientes WHERE nome = ?", (nome_cliente,))
-            self.conn.commit()
+            self.db.clientes.excluir(cliente_id)
             
             messagebox.showinfo("Sucesso", "Cliente excluído!")
-            self.carregar_clientes()
+            self.lista_clientes.remover(cliente_id)
+            self.marcar_alteracao("clientes")
             
         except Exception as e:
             messagebox.showerror("Erro", f"Erro: {str(e)}")
@@ -1533,14 +2687,7 @@ class SistemaJuridico:
         item = self.tree_processos.item(selecao[0])
         numero_processo = item['values'][0]
         
-        self.cursor.execute('''
-            SELECT id, numero, cliente, tipo_acao, vara, status, 
-                   data_distribuicao, valor_causa, observacoes
-            FROM processos 
-            WHERE numero = ?
-        ''', (numero_processo,))
-        
-        processo = self.cursor.fetchone()
+        processo = self.db.processos.por_numero(numero_processo)
         if not processo:
             messagebox.showerror("Erro", "Processo não encontrado!")
             return
@@ -1665,7 +2812,7 @@ class SistemaJuridico:
             padx=15,
             pady=5,
             cursor="hand2",
-            command=lambda: self.adicionar_andamento(processo[0], text_novo_and, lista_and_frame)
+            command=lambda: self.adicionar_andamento(processo[0], text_novo_and, linha_tempo)
         )
         btn_add_and.pack(pady=10)
         
@@ -1673,21 +2820,21 @@ class SistemaJuridico:
         lista_and_frame.pack(fill="both", expand=True, padx=20, pady=(0, 20))
         
         canvas = tk.Canvas(lista_and_frame, bg="white", highlightthickness=0)
-        scrollbar_and = ttk.Scrollbar(lista_and_frame, orient="vertical", command=canvas.yview)
-        scrollable_frame = tk.Frame(canvas, bg="white")
-        
-        scrollable_frame.bind(
-            "<Configure>",
-            lambda e: canvas.configure(scrollregion=canvas.bbox("all"))
-        )
-        
-        canvas.create_window((0, 0), window=scrollable_frame, anchor="nw")
-        canvas.configure(yscrollcommand=scrollbar_and.set)
+        scrollbar_and = ttk.Scrollbar(lista_and_frame, orient="vertical")
         
         canvas.pack(side="left", fill="both", expand=True)
         scrollbar_and.pack(side="right", fill="y")
         
-        self.carregar_andamentos(processo[0], scrollable_frame)
+        # Só os andamentos visíveis são desenhados; os mais antigos chegam em páginas conforme a rolagem
+        linha_tempo = LinhaTempo(
+            canvas,
+            scrollbar_and,
+            self.executor,
+            lambda db, direcao, chave, limite: db.andamentos.pagina(processo[0], direcao, chave, limite),
+            cor_texto=self.cor_texto,
+            cor_data=self.cor_primaria
+        )
+        linha_tempo.recarregar()
     
     def abrir_detalhes_busca(self):
         """Abre detalhes de processo pela busca"""
@@ -1699,21 +2846,14 @@ class SistemaJuridico:
         numero_processo = item['values'][0]
         
         # Mesmo código do abrir_detalhes_processo mas usando numero_processo
-        self.cursor.execute('''
-            SELECT id, numero, cliente, tipo_acao, vara, status, 
-                   data_distribuicao, valor_causa, observacoes
-            FROM processos 
-            WHERE numero = ?
-        ''', (numero_processo,))
-        
-        processo = self.cursor.fetchone()
+        processo = self.db.processos.por_numero(numero_processo)
         if not processo:
             return
         
         # [restante do código igual ao abrir_detalhes_processo]
         messagebox.showinfo("Detalhes", f"Processo: {numero_processo}\n\nClique em 'Ver Detalhes' na tela de Processos para ver todos os andamentos.")
     
-    def adicionar_andamento(self, processo_id, text_widget, lista_frame):
+    def adicionar_andamento(self, processo_id, text_widget, linha_tempo):
         """Adiciona andamento"""
         descricao = text_widget.get("1.0", "end-1c").strip()
         
@@ -1721,73 +2861,85 @@ class SistemaJuridico:
             messagebox.showwarning("Aviso", "Digite a descrição!")
             return
         
-        data_andamento = datetime.now().strftime("%d/%m/%Y %H:%M")
+        data_andamento = datetime.now().strftime(datas.DATA_HORA)
         data_cadastro = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         
         try:
-            self.cursor.execute('''
-                INSERT INTO andamentos (processo_id, data_andamento, descricao, data_cadastro)
-                VALUES (?, ?, ?, ?)
-            ''', (processo_id, data_andamento, descricao, data_cadastro))
-            
-            self.conn.commit()
+            andamento_id = self.db.andamentos.inserir(processo_id, data_andamento, descricao, data_cadastro)
             
             messagebox.showinfo("Sucesso", "Andamento adicionado!")
             
             text_widget.delete("1.0", tk.END)
-            self.carregar_andamentos(processo_id, lista_frame)
+            # O mais recente vai para o topo da linha do tempo, sem recarregar os demais
+            linha_tempo.inserir_no_topo(
+                (andamento_id, data_andamento, datas.exibir(data_andamento, datas.DATA_HORA), descricao)
+            )
+            self.marcar_alteracao("andamentos")
             
         except Exception as e:
             messagebox.showerror("Erro", f"Erro: {str(e)}")
     
-    def carregar_andamentos(self, processo_id, frame):
-        """Carrega andamentos"""
-        for widget in frame.winfo_children():
-            widget.destroy()
-        
-        self.cursor.execute('''
-            SELECT data_andamento, descricao
-            FROM andamentos
-            WHERE processo_id = ?
-            ORDER BY data_cadastro DESC
-        ''', (processo_id,))
+    def configurar_instrumentacao(self):
+        """Aplica as opções do painel de diagnóstico"""
+        INSTRUMENTACAO.ativa = self.var_instrumentar.get()
+        INSTRUMENTACAO.capturar_planos = self.var_capturar_planos.get()
+        try:
+            INSTRUMENTACAO.limite_ms = max(1.0, float(self.spin_limite_lenta.get().replace(",", ".")))
+        except ValueError:
+            self.spin_limite_lenta.delete(0, tk.END)
+            self.spin_limite_lenta.insert(0, f"{INSTRUMENTACAO.limite_ms:g}")
+    
+    def carregar_diagnostico(self):
+        """Preenche o painel com o resumo das medidas (em memória, sem consultar o banco)"""
+        self.medidas_diagnostico = {}
+        for item in self.tree_diagnostico.get_children():
+            self.tree_diagnostico.delete(item)
+        
+        for categoria, nome, medida in INSTRUMENTACAO.resumo():
+            iid = self.tree_diagnostico.insert("", "end", values=(
+                categoria,
+                nome,
+                medida["origem"],
+                medida["chamadas"],
+                f"{medida['linhas_media']:.0f}" if categoria == "consulta" else "",
+                *(f"{medida[chave]:.1f}" if categoria != "sql" else "" for chave in ("p50_ms", "p95_ms", "p99_ms", "maximo_ms"))
+            ), tags=("lenta",) if categoria == "consulta" and medida["p95_ms"] >= INSTRUMENTACAO.limite_ms else ())
+            self.medidas_diagnostico[iid] = medida
+        
+        if not self.medidas_diagnostico:
+            texto = ("Nenhuma medida ainda. Ligue \"Medir consultas e telas\" e use o sistema normalmente."
+                     if not INSTRUMENTACAO.ativa else "Nenhuma medida ainda: use as outras telas e volte aqui.")
+            self.text_diagnostico.delete("1.0", tk.END)
+            self.text_diagnostico.insert("1.0", texto)
+    
+    def mostrar_detalhes_diagnostico(self):
+        """SQL e plano (se capturado) da medida selecionada"""
+        selecao = self.tree_diagnostico.selection()
+        if not selecao:
+            return
+        medida = self.medidas_diagnostico[selecao[0]]
         
-        andamentos = self.cursor.fetchall()
+        texto = " ".join((medida["sql"] or "").split())
+        if medida["plano"]:
+            texto += "\n\nEXPLAIN QUERY PLAN:\n" + "\n".join(medida["plano"])
+        elif medida["sql"] and not INSTRUMENTACAO.capturar_planos:
+            texto += "\n\n(ligue a captura do EXPLAIN QUERY PLAN para ver o plano das consultas lentas)"
         
-        if not andamentos:
-            tk.Label(
-                frame,
-                text="📭 Nenhum andamento registrado",
-                font=("Arial", 11),
-                bg="white",
-                fg="#6b7280"
-            ).pack(pady=30)
-        else:
-            for data, descricao in andamentos:
-                and_card = tk.Frame(frame, bg="#f0f9ff", relief="solid", bd=1)
-                and_card.pack(fill="x", pady=5)
-                
-                tk.Label(
-                    and_card,
-                    text=f"📅 {data}",
-                    font=("Arial", 9, "bold"),
-                    bg="#f0f9ff",
-                    fg=self.cor_primaria
-                ).pack(anchor="w", padx=15, pady=(10, 5))
-                
-                tk.Label(
-                    and_card,
-                    text=descricao,
-                    font=("Arial", 10),
-                    bg="#f0f9ff",
-                    fg=self.cor_texto,
-                    wraplength=700,
-                    justify="left"
-                ).pack(anchor="w", padx=15, pady=(0, 10))
+        self.text_diagnostico.delete("1.0", tk.END)
+        self.text_diagnostico.insert("1.0", texto)
+    
+    def limpar_diagnostico(self):
+        """Descarta as medidas coletadas até agora"""
+        INSTRUMENTACAO.limpar()
+        self.carregar_diagnostico()
     
     def sair_aplicacao(self):
         """Sai da aplicação"""
-        self.conn.close()
+        if self.db is not None:
+            self.lembretes.parar()
+            self.executor.fechar()
+            self.executor_manutencao.fechar()
+            self.db.fechar()
         print("👋 Encerrando...")
         self.root.quit()
 
@@ -0,0 +1,6 @@
+"""
+Sistema de Gerenciamento Jurídico - camada de dados
+Módulos independentes do Tkinter, usados pela interface (main.py)
+"""
+
+ARQUIVO_BANCO = 'sistema_juridico.db'
@@ -0,0 +1,8 @@
+"""python -m sistema_juridico: linha de comando sem interface gráfica (veja cli.py)"""
+
+import sys
+
+from sistema_juridico.cli import main
+
+
+sys.exit(main())
@@ -0,0 +1,154 @@
+"""
+Campo com sugestões (autocompletar) para tk.Entry
+
+Substitui os Combobox que recebiam a tabela inteira: a cada pausa na
+digitação, as primeiras sugestões para o texto são buscadas no banco pelo
+ExecutorConsultas (consultas por prefixo em índice) e mostradas numa
+Listbox logo abaixo do campo. Uma busca nova substitui a anterior, então
+só a do texto atual chega à tela.
+
+Teclado: ↓ entra nas sugestões, Enter (ou clique) escolhe, Esc fecha.
+"""
+
+from itertools import count
+
+
+_contador = count()
+
+# Teclas que não alteram o texto
+NAVEGACAO = {"Up", "Down", "Left", "Right", "Return", "KP_Enter", "Escape", "Tab",
+             "Shift_L", "Shift_R", "Control_L", "Control_R", "Alt_L", "Alt_R", "Home", "End"}
+
+
+class CampoAutocompletar:
+    """Sugestões para um Entry, exibidas em lista (uma Listbox filha da janela)
+
+    buscar(db, texto, limite) roda na thread do executor e retorna linhas
+    que começam pelo id; exibir(linha) é o texto da sugestão e do campo
+    depois de escolhida (padrão: a segunda coluna). selecionado() devolve o
+    id da sugestão escolhida enquanto o texto não for alterado.
+    """
+
+    # Pausa na digitação (ms) antes de buscar
+    ESPERA = 120
+
+    def __init__(self, entry, lista, executor, buscar, exibir=None, limite=10, ao_escolher=None):
+        self.entry = entry
+        self.lista = lista
+        self.executor = executor
+        self.buscar = buscar
+        self.exibir = exibir or (lambda linha: linha[1])
+        self.limite = limite
+        self.ao_escolher = ao_escolher
+
+        self.linhas = []
+        self.escolhida = None  # (id, texto do campo quando foi escolhida)
+        self._agendado = None
+        self._ultimo_texto = entry.get()
+        self.chave_executor = f"autocompletar-{next(_contador)}"
+
+        entry.bind("<KeyRelease>", self._ao_digitar, add="+")
+        entry.bind("<Down>", self._entrar_na_lista, add="+")
+        entry.bind("<Escape>", lambda e: self.ocultar(), add="+")
+        entry.bind("<FocusOut>", self._ao_sair, add="+")
+        entry.bind("<Destroy>", lambda e: self.lista.destroy(), add="+")
+
+        self.lista.bind("<ButtonRelease-1>", lambda e: self._escolher_selecionada())
+        self.lista.bind("<Return>", lambda e: self._escolher_selecionada())
+        self.lista.bind("<Escape>", lambda e: self._voltar_ao_campo())
+        self.lista.bind("<FocusOut>", self._ao_sair)
+
+    # ========== API ==========
+
+    def selecionado(self):
+        """Id da sugestão escolhida, ou None se nada foi escolhido ou o texto mudou depois"""
+        if self.escolhida is not None and self.escolhida[1] == self.entry.get():
+            return self.escolhida[0]
+        return None
+
+    def definir(self, item_id, texto):
+        """Preenche o campo como se a sugestão tivesse sido escolhida"""
+        self.entry.delete(0, "end")
+        self.entry.insert(0, texto)
+        self._ultimo_texto = texto
+        self.escolhida = (item_id, texto) if item_id is not None else None
+
+    def limpar(self):
+        self.definir(None, "")
+        self.ocultar()
+
+    def ocultar(self):
+        self.lista.place_forget()
+
+    # ========== INTERNO ==========
+
+    def _ao_digitar(self, evento):
+        if evento.keysym in NAVEGACAO:
+            return
+        texto = self.entry.get()
+        if texto == self._ultimo_texto:
+            return
+        self._ultimo_texto = texto
+
+        if self._agendado is not None:
+            self.entry.after_cancel(self._agendado)
+        self._agendado = self.entry.after(self.ESPERA, self._buscar)
+
+    def _buscar(self):
+        self._agendado = None
+        texto = self.entry.get().strip()
+        if not texto:
+            self.executor.cancelar(self.chave_executor)
+            self.ocultar()
+            return
+        self.executor.executar(
+            self.buscar, texto, self.limite,
+            chave=self.chave_executor,
+            ao_concluir=self._mostrar,
+            ao_falhar=lambda erro: self.ocultar()
+        )
+
+    def _mostrar(self, linhas):
+        if not self.entry.winfo_exists():
+            return
+        self.linhas = linhas
+        self.lista.delete(0, "end")
+        if not linhas or self.entry.focus_get() not in (self.entry, self.lista):
+            self.ocultar()
+            return
+        for linha in linhas:
+            self.lista.insert("end", self.exibir(linha))
+        self.lista.configure(height=len(linhas))
+        self.lista.place(in_=self.entry, x=0, rely=1.0, relwidth=1.0)
+        self.lista.lift()
+
+    def _entrar_na_lista(self, evento):
+        if self.linhas and self.lista.winfo_ismapped():
+            self.lista.focus_set()
+            self.lista.selection_clear(0, "end")
+            self.lista.selection_set(0)
+            self.lista.activate(0)
+            return "break"
+
+    def _voltar_ao_campo(self):
+        self.ocultar()
+        self.entry.focus_set()
+
+    def _escolher_selecionada(self):
+        selecao = self.lista.curselection()
+        if not selecao:
+            return
+        linha = self.linhas[selecao[0]]
+        self.definir(linha[0], self.exibir(linha))
+        self._voltar_ao_campo()
+        self.entry.icursor("end")
+        if self.ao_escolher:
+            self.ao_escolher(linha)
+
+    def _ao_sair(self, evento):
+        # O foco pode estar só passando do campo para a lista (clique numa sugestão)
+        self.entry.after(150, self._ocultar_sem_foco)
+
+    def _ocultar_sem_foco(self):
+        if self.entry.winfo_exists() and self.entry.focus_get() not in (self.entry, self.lista):
+            self.ocultar()
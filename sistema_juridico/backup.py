@@ -0,0 +1,138 @@
+"""
+Backup online do banco de dados
+
+Usa a API de backup do SQLite (Connection.backup) a partir de uma conexão
+aberta: nada é fechado e o programa continua usável durante a cópia. A
+cópia é feita em passos de N páginas; entre os passos a conexão de origem
+mantém uma transação de leitura, o que garante um retrato consistente do
+banco mesmo com gravações simultâneas (no modo WAL elas não são bloqueadas).
+
+Para medir o efeito do tamanho do passo sobre o tempo do backup e a
+latência das consultas em primeiro plano:
+
+    python -m sistema_juridico.backup sistema_juridico.db 64 256 1024 -1
+"""
+
+import os
+import sqlite3
+import sys
+import threading
+import time
+
+from sistema_juridico import ARQUIVO_BANCO
+
+
+# Páginas copiadas por passo (-1 copia tudo num único passo)
+PAGINAS_POR_PASSO = 1024
+
+# Pausa (s) entre os passos, para ceder disco e CPU às telas
+PAUSA_ENTRE_PASSOS = 0.0
+
+
+def copiar_online(conn, destino, paginas=PAGINAS_POR_PASSO, pausa=PAUSA_ENTRE_PASSOS, progresso=None):
+    """Copia o banco da conexão conn para o arquivo destino
+
+    progresso(copiadas, total) é chamado após cada passo, na thread que
+    executa o backup. A cópia é gravada num arquivo temporário no mesmo
+    diretório e só substitui destino quando estiver completa.
+    Retorna o número de páginas copiadas.
+    """
+    temporario = destino + ".parcial"
+    if os.path.exists(temporario):
+        os.remove(temporario)
+
+    paginas_copiadas = [0]
+
+    def _passo(status, restantes, total):
+        paginas_copiadas[0] = total
+        if progresso:
+            progresso(total - restantes, total)
+        if pausa and restantes:
+            time.sleep(pausa)
+
+    alvo = sqlite3.connect(temporario)
+    try:
+        # Transação de leitura: todos os passos enxergam o mesmo retrato do banco,
+        # e gravações de outras conexões não reiniciam a cópia
+        conn.execute("BEGIN")
+        try:
+            conn.execute("SELECT 1 FROM sqlite_master LIMIT 1").fetchall()
+            conn.backup(alvo, pages=paginas, progress=_passo)
+        finally:
+            conn.rollback()
+
+        # O arquivo de backup fica autocontido (sem -wal ao lado)
+        alvo.execute("PRAGMA journal_mode=DELETE")
+        alvo.close()
+    except BaseException:
+        alvo.close()
+        if os.path.exists(temporario):
+            os.remove(temporario)
+        raise
+
+    os.replace(temporario, destino)
+    return paginas_copiadas[0]
+
+
+def medir(caminho, paginas, pausa=PAUSA_ENTRE_PASSOS, consulta="SELECT id FROM processos ORDER BY data_cadastro DESC, id DESC LIMIT 200"):
+    """Faz um backup com o passo informado enquanto mede a latência de uma consulta
+
+    Retorna (segundos do backup, [latências em ms da consulta durante o backup]).
+    """
+    from sistema_juridico.repositorio import BancoDados
+
+    destino = caminho + f".medicao-{paginas}"
+    tela = BancoDados(caminho, migrar=False)
+    latencias = []
+    terminou = threading.Event()
+
+    def _backup():
+        # Conexão de origem própria, como a do executor de manutenção
+        origem = BancoDados(caminho, migrar=False)
+        try:
+            copiar_online(origem.conn, destino, paginas, pausa)
+        finally:
+            origem.fechar()
+            terminou.set()
+
+    try:
+        inicio = time.perf_counter()
+        thread = threading.Thread(target=_backup)
+        thread.start()
+        while not terminou.is_set():
+            t = time.perf_counter()
+            tela.conn.execute(consulta).fetchall()
+            latencias.append((time.perf_counter() - t) * 1000)
+            time.sleep(0.005)
+        thread.join()
+        duracao = time.perf_counter() - inicio
+    finally:
+        tela.fechar()
+        if os.path.exists(destino):
+            os.remove(destino)
+
+    return duracao, latencias
+
+
+def main(argv=None):
+    """Mede tempo de backup e latência em primeiro plano para cada tamanho de passo"""
+    argv = sys.argv[1:] if argv is None else argv
+    caminho = argv[0] if argv else ARQUIVO_BANCO
+    passos = [int(p) for p in argv[1:]] or [64, 256, PAGINAS_POR_PASSO, -1]
+
+    if not os.path.exists(caminho):
+        print(f"❌ Banco não encontrado: {caminho}")
+        return 1
+
+    print(f"{'páginas/passo':>14} {'backup (s)':>11} {'consultas':>10} {'p50 (ms)':>9} {'máx (ms)':>9}")
+    for paginas in passos:
+        duracao, latencias = medir(caminho, paginas)
+        latencias.sort()
+        p50 = latencias[len(latencias) // 2] if latencias else 0.0
+        maximo = latencias[-1] if latencias else 0.0
+        print(f"{paginas:>14} {duracao:>11.2f} {len(latencias):>10} {p50:>9.2f} {maximo:>9.2f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
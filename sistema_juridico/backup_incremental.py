@@ -0,0 +1,310 @@
+"""
+Repositório de backups incrementais com deduplicação
+
+O banco é dividido em blocos de tamanho fixo (um número inteiro de páginas
+do SQLite). Cada bloco é gravado comprimido (zlib) num arquivo cujo nome é
+o hash SHA-256 do conteúdo, de modo que blocos iguais são guardados uma
+única vez. Um snapshot é apenas um manifesto JSON com a lista de hashes:
+um backup diário custa só as páginas que mudaram desde o anterior.
+
+Estrutura do repositório:
+
+    <raiz>/blocos/ab/abcdef...   blocos comprimidos
+    <raiz>/snapshots/<nome>.json manifestos
+
+Uso pela linha de comando:
+
+    python -m sistema_juridico.backup_incremental criar <banco> <repositório> [rótulo]
+    python -m sistema_juridico.backup_incremental listar <repositório>
+    python -m sistema_juridico.backup_incremental restaurar <repositório> <snapshot> <destino>
+    python -m sistema_juridico.backup_incremental verificar <repositório> [snapshot]
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import sys
+import zlib
+from datetime import datetime
+
+from sistema_juridico.backup import copiar_online
+
+
+# Diretório padrão do repositório, ao lado do banco
+DIRETORIO_PADRAO = "backups"
+
+# Páginas do SQLite por bloco (blocos menores deduplicam melhor, mas geram mais arquivos)
+PAGINAS_POR_BLOCO = 8
+
+NIVEL_COMPRESSAO = 6
+
+
+class ErroBackup(Exception):
+    """Snapshot inexistente, bloco ausente ou corrompido"""
+
+
+class RepositorioBackup:
+    """Snapshots deduplicados de um banco SQLite"""
+
+    def __init__(self, raiz=DIRETORIO_PADRAO):
+        self.raiz = raiz
+        self.dir_blocos = os.path.join(raiz, "blocos")
+        self.dir_snapshots = os.path.join(raiz, "snapshots")
+        self.dir_temporario = os.path.join(raiz, "tmp")
+
+    def _preparar(self):
+        for diretorio in (self.dir_blocos, self.dir_snapshots, self.dir_temporario):
+            os.makedirs(diretorio, exist_ok=True)
+
+    def caminho_bloco(self, hash_bloco):
+        return os.path.join(self.dir_blocos, hash_bloco[:2], hash_bloco)
+
+    def caminho_snapshot(self, nome):
+        return os.path.join(self.dir_snapshots, nome + ".json")
+
+    # ========== CRIAÇÃO ==========
+
+    def criar(self, conn, rotulo="", progresso=None):
+        """Cria um snapshot do banco da conexão conn e retorna o manifesto
+
+        O retrato consistente do banco é obtido com a API de backup (sem
+        fechar a conexão) num arquivo temporário, que é então dividido em blocos.
+        progresso(bytes_lidos, total) é chamado a cada bloco.
+        """
+        self._preparar()
+        nome = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+        temporario = os.path.join(self.dir_temporario, nome + ".db")
+
+        try:
+            copiar_online(conn, temporario)
+            manifesto = self._gravar_blocos(temporario, progresso)
+        finally:
+            if os.path.exists(temporario):
+                os.remove(temporario)
+
+        manifesto.update({
+            "nome": nome,
+            "rotulo": rotulo,
+            "criado_em": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        })
+        self._gravar_atomico(
+            self.caminho_snapshot(nome),
+            json.dumps(manifesto, ensure_ascii=False, indent=1).encode("utf-8")
+        )
+        return manifesto
+
+    def _gravar_blocos(self, arquivo, progresso=None):
+        """Divide o arquivo em blocos e grava os que ainda não existem"""
+        tamanho_pagina = _tamanho_pagina(arquivo)
+        tamanho_bloco = tamanho_pagina * PAGINAS_POR_BLOCO
+        total = os.path.getsize(arquivo)
+
+        blocos = []
+        novos = 0
+        bytes_gravados = 0
+        lidos = 0
+
+        with open(arquivo, "rb") as f:
+            while True:
+                dados = f.read(tamanho_bloco)
+                if not dados:
+                    break
+                lidos += len(dados)
+
+                hash_bloco = hashlib.sha256(dados).hexdigest()
+                blocos.append(hash_bloco)
+
+                caminho = self.caminho_bloco(hash_bloco)
+                if not os.path.exists(caminho):
+                    os.makedirs(os.path.dirname(caminho), exist_ok=True)
+                    comprimido = zlib.compress(dados, NIVEL_COMPRESSAO)
+                    self._gravar_atomico(caminho, comprimido)
+                    novos += 1
+                    bytes_gravados += len(comprimido)
+
+                if progresso:
+                    progresso(lidos, total)
+
+        return {
+            "tamanho": total,
+            "tamanho_pagina": tamanho_pagina,
+            "tamanho_bloco": tamanho_bloco,
+            "blocos": blocos,
+            "blocos_novos": novos,
+            "bytes_gravados": bytes_gravados,
+        }
+
+    @staticmethod
+    def _gravar_atomico(caminho, dados):
+        parcial = caminho + ".parcial"
+        with open(parcial, "wb") as f:
+            f.write(dados)
+        os.replace(parcial, caminho)
+
+    # ========== LEITURA ==========
+
+    def snapshots(self):
+        """Manifestos de todos os snapshots, do mais recente para o mais antigo"""
+        if not os.path.isdir(self.dir_snapshots):
+            return []
+        nomes = sorted(
+            (arquivo[:-5] for arquivo in os.listdir(self.dir_snapshots) if arquivo.endswith(".json")),
+            reverse=True
+        )
+        return [self.manifesto(nome) for nome in nomes]
+
+    def manifesto(self, nome):
+        """Lê o manifesto de um snapshot"""
+        try:
+            with open(self.caminho_snapshot(nome), encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            raise ErroBackup(f"Snapshot não encontrado: {nome}")
+
+    def ler_bloco(self, hash_bloco):
+        """Lê, descomprime e confere um bloco"""
+        try:
+            with open(self.caminho_bloco(hash_bloco), "rb") as f:
+                dados = zlib.decompress(f.read())
+        except FileNotFoundError:
+            raise ErroBackup(f"Bloco ausente: {hash_bloco}")
+        except zlib.error:
+            raise ErroBackup(f"Bloco corrompido: {hash_bloco}")
+
+        if hashlib.sha256(dados).hexdigest() != hash_bloco:
+            raise ErroBackup(f"Bloco corrompido: {hash_bloco}")
+        return dados
+
+    # ========== RESTAURAÇÃO E VERIFICAÇÃO ==========
+
+    def restaurar(self, nome, destino, progresso=None):
+        """Reconstrói o snapshot no arquivo destino, bloco a bloco
+
+        Os blocos são gravados num arquivo temporário no diretório de destino,
+        que só substitui destino quando estiver completo.
+        """
+        manifesto = self.manifesto(nome)
+        blocos = manifesto["blocos"]
+        parcial = destino + ".parcial"
+
+        try:
+            with open(parcial, "wb") as f:
+                for i, hash_bloco in enumerate(blocos, 1):
+                    f.write(self.ler_bloco(hash_bloco))
+                    if progresso:
+                        progresso(i, len(blocos))
+                f.flush()
+                os.fsync(f.fileno())
+
+            if os.path.getsize(parcial) != manifesto["tamanho"]:
+                raise ErroBackup(f"Tamanho restaurado difere do snapshot {nome}")
+        except BaseException:
+            if os.path.exists(parcial):
+                os.remove(parcial)
+            raise
+
+        os.replace(parcial, destino)
+        return manifesto
+
+    def verificar(self, nome=None, progresso=None):
+        """Confere os blocos de um snapshot (ou de todos)
+
+        Retorna [(snapshot, problema)]; vazio se tudo estiver íntegro.
+        Cada bloco compartilhado é lido uma única vez.
+        """
+        manifestos = [self.manifesto(nome)] if nome else self.snapshots()
+
+        problemas = []
+        conferidos = {}
+        total = sum(len(m["blocos"]) for m in manifestos)
+        feitos = 0
+
+        for manifesto in manifestos:
+            for hash_bloco in manifesto["blocos"]:
+                if hash_bloco not in conferidos:
+                    try:
+                        self.ler_bloco(hash_bloco)
+                        conferidos[hash_bloco] = None
+                    except ErroBackup as e:
+                        conferidos[hash_bloco] = str(e)
+                if conferidos[hash_bloco]:
+                    problemas.append((manifesto["nome"], conferidos[hash_bloco]))
+
+                feitos += 1
+                if progresso:
+                    progresso(feitos, total)
+
+        return problemas
+
+
+def _tamanho_pagina(arquivo):
+    """Tamanho de página gravado no cabeçalho do arquivo SQLite"""
+    with open(arquivo, "rb") as f:
+        cabecalho = f.read(100)
+    if len(cabecalho) < 100 or not cabecalho.startswith(b"SQLite format 3\x00"):
+        raise ErroBackup(f"Arquivo não é um banco SQLite: {arquivo}")
+    tamanho = int.from_bytes(cabecalho[16:18], "big")
+    return 65536 if tamanho == 1 else tamanho
+
+
+def _formatar_bytes(n):
+    for unidade in ("B", "KB", "MB"):
+        if n < 1024:
+            return f"{n:.1f} {unidade}"
+        n /= 1024
+    return f"{n:.1f} GB"
+
+
+def main(argv=None):
+    """Linha de comando do repositório de backups"""
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv:
+        print(__doc__)
+        return 2
+
+    comando, args = argv[0], argv[1:]
+
+    if comando == "criar" and len(args) in (2, 3):
+        if not os.path.exists(args[0]):
+            print(f"❌ Banco não encontrado: {args[0]}")
+            return 1
+        conn = sqlite3.connect(args[0])
+        try:
+            manifesto = RepositorioBackup(args[1]).criar(conn, args[2] if len(args) == 3 else "")
+        finally:
+            conn.close()
+        print(
+            f"✅ Snapshot {manifesto['nome']}: {len(manifesto['blocos'])} blocos, "
+            f"{manifesto['blocos_novos']} novos ({_formatar_bytes(manifesto['bytes_gravados'])} gravados)"
+        )
+        return 0
+
+    if comando == "listar" and len(args) == 1:
+        for manifesto in RepositorioBackup(args[0]).snapshots():
+            print(
+                f"{manifesto['nome']}  {manifesto['criado_em']}  "
+                f"{_formatar_bytes(manifesto['tamanho']):>10}  {manifesto['rotulo']}"
+            )
+        return 0
+
+    if comando == "restaurar" and len(args) == 3:
+        RepositorioBackup(args[0]).restaurar(args[1], args[2])
+        print(f"✅ Snapshot {args[1]} restaurado em {args[2]}")
+        return 0
+
+    if comando == "verificar" and len(args) in (1, 2):
+        problemas = RepositorioBackup(args[0]).verificar(args[1] if len(args) == 2 else None)
+        for nome, problema in problemas:
+            print(f"❌ {nome}: {problema}")
+        if problemas:
+            return 1
+        print("✅ Todos os blocos estão íntegros")
+        return 0
+
+    print(__doc__)
+    return 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,564 @@
+"""
+Medições de desempenho sem interface gráfica
+
+Cada medição monta um banco sintético num arquivo temporário e compara a
+forma antiga de fazer algo com a atual, imprimindo o custo por linha.
+
+    python -m sistema_juridico.benchmarks [quantidade de tarefas]
+    python -m sistema_juridico.benchmarks partida [repetições]
+    python -m sistema_juridico.benchmarks suite [pequeno|medio|grande] [--saida arquivo.json]
+        [--comparar anterior.json] [--repeticoes N]
+
+A suíte gera um banco com dados_sinteticos e cronometra cada caminho de
+dados do programa (consultas de cada tela, busca, dashboard, backup,
+restauração, importação, exportação e recálculo de prazos), sem interface
+gráfica. O resultado vai para um JSON; com --comparar, as medianas são
+comparadas com as de uma execução anterior (outra versão) e as regressões
+são apontadas.
+
+A medição de partida abre o programa (main.py) sobre bancos vazio, médio e
+com 1 milhão de tarefas e registra o tempo até a primeira pintura da janela
+e até o dashboard preenchido. Sem tela disponível (servidor, CI), mede só a
+parte do banco: abrir a conexão, conferir a versão do esquema e fazer as
+consultas do dashboard, cada vez num processo novo.
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+from sistema_juridico import datas, lembretes
+
+
+# Tarefas geradas por padrão
+QUANTIDADE_PADRAO = 200000
+
+# Linhas por página, como na lista de tarefas
+TAMANHO_PAGINA = 200
+
+
+# ========== DADOS SINTÉTICOS ==========
+
+def criar_tarefas(db, quantidade, semente=1):
+    """Insere quantidade tarefas com vencimentos espalhados em torno de hoje"""
+    aleatorio = random.Random(semente)
+    hoje = datetime.now()
+    agora = hoje.strftime(datas.CARIMBO)
+
+    with db.transacao():
+        db.conn.execute(
+            "INSERT INTO processos (numero, cliente, tipo_acao, vara, status, data_distribuicao, data_cadastro) "
+            "VALUES ('0000001-00.2024.8.26.0001', 'Cliente', 'Cível', '1ª Vara', 'Ativo', ?, ?)",
+            (hoje.strftime(datas.DATA), agora)
+        )
+        db.conn.executemany(
+            "INSERT INTO tarefas (processo_id, titulo, descricao, tipo, data_vencimento, concluida, data_cadastro) "
+            "VALUES (?, ?, '', 'Prazo', ?, ?, ?)",
+            (
+                (
+                    1 if i % 3 == 0 else None,
+                    f"Tarefa {i}",
+                    (hoje + timedelta(minutes=aleatorio.randint(-525600, 525600))).strftime(datas.DATA_HORA),
+                    int(aleatorio.random() < 0.3),
+                    agora,
+                )
+                for i in range(quantidade)
+            )
+        )
+
+
+def _banco_temporario(nome="benchmark.db"):
+    from sistema_juridico.repositorio import BancoDados
+
+    diretorio = tempfile.mkdtemp(prefix="benchmark_")
+    return BancoDados(os.path.join(diretorio, nome)), diretorio
+
+
+def _remover(db, diretorio):
+    db.fechar()
+    shutil.rmtree(diretorio)
+
+
+# ========== LISTA DE TAREFAS ==========
+
+# Consulta e formatação da lista de tarefas antes da situação ir para o SQL
+SELECT_TAREFAS_ANTIGO = '''
+    SELECT t.id, t.data_vencimento, t.titulo, t.tipo, t.concluida, p.numero
+    FROM tarefas t
+    LEFT JOIN processos p ON t.processo_id = p.id
+    WHERE (t.data_vencimento, t.id) > (?, ?)
+    ORDER BY t.data_vencimento, t.id
+    LIMIT ?
+'''
+
+
+def _formatar_antigo(linha):
+    tarefa_id, vencimento, titulo, tipo, concluida, numero_processo = linha
+    try:
+        data_venc = datetime.strptime(vencimento, "%Y-%m-%d %H:%M")
+        venc_formatado = data_venc.strftime("%d/%m/%Y %H:%M")
+        if concluida:
+            status = "✓"
+        elif data_venc < datetime.now():
+            status = "⚠️"
+        else:
+            status = "⏳"
+        return (status, titulo, tipo, venc_formatado, numero_processo or "-"), (tarefa_id,)
+    except ValueError:
+        return None
+
+
+def _formatar_atual(linha):
+    tarefa_id, vencimento, status, titulo, tipo, venc_formatado, processo_texto, data_valida = linha
+    if not data_valida:
+        return ("❗", titulo, tipo, vencimento, processo_texto), ("data_invalida",)
+    return (status, titulo, tipo, venc_formatado, processo_texto), ()
+
+
+def _percorrer(buscar, formatar):
+    """Percorre a lista inteira página a página; retorna as linhas formatadas"""
+    chave = ("", 0)
+    linhas = 0
+    while True:
+        pagina = buscar(chave)
+        if not pagina:
+            return linhas
+        for linha in pagina:
+            if formatar(linha) is not None:
+                linhas += 1
+        chave = (pagina[-1][1], pagina[-1][0])
+
+
+def medir_lista_tarefas(db):
+    """Percorre todas as tarefas com a consulta antiga e a atual
+
+    Retorna {"antiga": (segundos, linhas), "atual": (segundos, linhas)}.
+    """
+    agora = datetime.now().strftime(datas.DATA_HORA)
+    resultados = {}
+
+    inicio = time.perf_counter()
+    linhas = _percorrer(
+        lambda chave: db.conn.execute(SELECT_TAREFAS_ANTIGO, (*chave, TAMANHO_PAGINA)).fetchall(),
+        _formatar_antigo
+    )
+    resultados["antiga"] = (time.perf_counter() - inicio, linhas)
+
+    inicio = time.perf_counter()
+    linhas = _percorrer(
+        lambda chave: db.tarefas.pagina("Todas", agora, "apos", chave, TAMANHO_PAGINA),
+        _formatar_atual
+    )
+    resultados["atual"] = (time.perf_counter() - inicio, linhas)
+
+    return resultados
+
+
+# ========== PARTIDA ==========
+
+# Bancos da medição de partida: nome -> tarefas geradas
+BANCOS_PARTIDA = {"vazio": 0, "médio": 20000, "1M": 1000000}
+
+REPETICOES_PARTIDA = 5
+
+# Tempo máximo (s) de uma partida medida antes de desistir
+LIMITE_PARTIDA = 120
+
+RAIZ_PROJETO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# A parte da partida que não depende do Tk, como em SistemaJuridico.iniciar_dados
+# e consultar_dashboard; imprime os instantes (time.time) em JSON
+SCRIPT_PARTIDA_DADOS = '''
+import json, sys, time
+inicio = time.time()
+from datetime import date, datetime, timedelta
+from sistema_juridico.repositorio import BancoDados
+importado = time.time()
+db = BancoDados(sys.argv[1])
+aberto = time.time()
+vencimento_ate = (datetime.now() + timedelta(days=8)).strftime("%Y-%m-%d")
+db.estatisticas.todas()
+db.tarefas.contar_urgentes(vencimento_ate)
+db.tarefas.urgentes(vencimento_ate, 10)
+print(json.dumps({"inicio": inicio, "importado": importado, "aberto": aberto, "dashboard": time.time()}))
+'''
+
+
+def _ambiente():
+    ambiente = dict(os.environ)
+    ambiente["PYTHONPATH"] = os.pathsep.join(filter(None, [RAIZ_PROJETO, ambiente.get("PYTHONPATH")]))
+    return ambiente
+
+
+def _ultimo_json(saida):
+    for linha in reversed(saida.splitlines()):
+        if linha.startswith("{"):
+            return json.loads(linha)
+    raise RuntimeError(f"Nenhuma medição na saída: {saida[-500:]!r}")
+
+
+def tem_tela():
+    """Verdadeiro se o Tk consegue abrir uma janela (testado num processo à parte)"""
+    teste = subprocess.run(
+        [sys.executable, "-c", "import tkinter; tkinter.Tk().destroy()"],
+        capture_output=True
+    )
+    return teste.returncode == 0
+
+
+def medir_partida_interface(diretorio):
+    """Abre main.py com o banco de diretorio; retorna (primeira pintura, interativo) em ms"""
+    ambiente = _ambiente()
+    ambiente["SISTEMA_JURIDICO_MEDIR_PARTIDA"] = "1"
+    inicio = time.time()
+    processo = subprocess.run(
+        [sys.executable, os.path.join(RAIZ_PROJETO, "main.py")],
+        cwd=diretorio, env=ambiente, capture_output=True, text=True, timeout=LIMITE_PARTIDA
+    )
+    marcos = _ultimo_json(processo.stdout)
+    return (marcos["primeira_pintura"] - inicio) * 1000, (marcos["interativo"] - inicio) * 1000
+
+
+def medir_partida_dados(caminho):
+    """Num processo novo: ms até importar, abrir o banco e ter os números do dashboard"""
+    inicio = time.time()
+    processo = subprocess.run(
+        [sys.executable, "-c", SCRIPT_PARTIDA_DADOS, caminho],
+        env=_ambiente(), capture_output=True, text=True, timeout=LIMITE_PARTIDA, check=True
+    )
+    marcos = _ultimo_json(processo.stdout)
+    return {nome: (marcos[nome] - inicio) * 1000 for nome in ("importado", "aberto", "dashboard")}
+
+
+def medir_partida(bancos=None, repeticoes=REPETICOES_PARTIDA):
+    """Mediana de cada etapa da partida para cada banco
+
+    Retorna {banco: {etapa: ms}}; as etapas da interface só aparecem se
+    houver tela. A primeira partida de cada banco só aquece o cache do
+    sistema operacional e não entra na mediana.
+    """
+    bancos = BANCOS_PARTIDA if bancos is None else bancos
+    com_tela = tem_tela()
+    resultados = {}
+
+    for nome, tarefas in bancos.items():
+        # main.py abre sistema_juridico.db no diretório atual
+        db, diretorio = _banco_temporario("sistema_juridico.db")
+        caminho = db.caminho
+        try:
+            if tarefas:
+                criar_tarefas(db, tarefas)
+            db.conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            db.fechar()
+
+            amostras = []
+            for _ in range(repeticoes + 1):
+                etapas = medir_partida_dados(caminho)
+                if com_tela:
+                    etapas["primeira_pintura"], etapas["interativo"] = medir_partida_interface(diretorio)
+                amostras.append(etapas)
+
+            resultados[nome] = {
+                etapa: statistics.median(amostra[etapa] for amostra in amostras[1:])
+                for etapa in amostras[0]
+            }
+        finally:
+            _remover(db, diretorio)
+
+    return resultados
+
+
+def main_partida(argv):
+    """Imprime a tabela da medição de partida"""
+    repeticoes = int(argv[0]) if argv else REPETICOES_PARTIDA
+    if not tem_tela():
+        print("Sem tela disponível: medindo só a abertura do banco e as consultas do dashboard")
+
+    resultados = medir_partida(repeticoes=repeticoes)
+    etapas = ["importado", "aberto", "dashboard", "primeira_pintura", "interativo"]
+    etapas = [etapa for etapa in etapas if any(etapa in r for r in resultados.values())]
+
+    print(f"{'banco (ms)':>10} " + " ".join(f"{etapa:>16}" for etapa in etapas))
+    for nome, medidas in resultados.items():
+        print(f"{nome:>10} " + " ".join(f"{medidas[etapa]:>16.1f}" for etapa in etapas))
+    return 0
+
+
+# ========== SUÍTE ==========
+
+REPETICOES_SUITE = 5
+
+# Piora (fração da mediana anterior) a partir da qual --comparar aponta regressão
+TOLERANCIA_REGRESSAO = 0.20
+
+# ...e em ms, para que o ruído de medidas de fração de milissegundo não conte
+DIFERENCA_MINIMA_MS = 1.0
+
+
+def _cronometrar(funcao, repeticoes):
+    """Roda funcao() repeticoes vezes (mais uma de aquecimento); estatísticas em ms"""
+    funcao()
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        tempos.append((time.perf_counter() - inicio) * 1000)
+    tempos.sort()
+    return {
+        "mediana_ms": round(statistics.median(tempos), 3),
+        "p95_ms": round(tempos[min(len(tempos) - 1, int(len(tempos) * 0.95))], 3),
+        "min_ms": round(tempos[0], 3),
+        "repeticoes": repeticoes,
+    }
+
+
+def _uma_vez(funcao):
+    """Operações que alteram o estado (backup, importação): uma única medida"""
+    inicio = time.perf_counter()
+    resultado = funcao()
+    return round((time.perf_counter() - inicio) * 1000, 3), resultado
+
+
+def _percorrer_paginas(buscar, limite=TAMANHO_PAGINA, maximo=None):
+    """Lê página a página (keyset) como a ListaVirtual ao rolar até o fim"""
+    pagina = buscar("inicio", None, limite)
+    paginas = 1
+    while len(pagina) == limite and (maximo is None or paginas < maximo):
+        pagina = buscar("apos", (pagina[-1][1], pagina[-1][0]), limite)
+        paginas += 1
+    return paginas
+
+
+def consultas_das_telas(db):
+    """{nome: função()} com as consultas que cada tela faz ao abrir e ao rolar"""
+    agora = datetime.now().strftime(datas.DATA_HORA)
+    vencimento_ate = (datetime.now() + timedelta(days=8)).strftime(datas.DATA)
+
+    # Valores reais do banco para a busca e para os andamentos
+    numero = db.conn.execute("SELECT numero FROM processos ORDER BY id LIMIT 1").fetchone()
+    cliente = db.conn.execute("SELECT nome FROM clientes ORDER BY id LIMIT 1").fetchone()
+    maior = db.conn.execute(
+        "SELECT processo_id FROM andamentos GROUP BY processo_id ORDER BY COUNT(*) DESC LIMIT 1"
+    ).fetchone()
+    numero = numero[0][:9] if numero else "0000000"
+    sobrenome = cliente[0].split()[-1] if cliente else "Silva"
+    maior = maior[0] if maior else 0
+
+    consultas = {
+        # mostrar_dashboard / carregar_dashboard
+        "dashboard": lambda: (
+            db.estatisticas.todas(),
+            db.tarefas.contar_urgentes(vencimento_ate),
+            db.tarefas.urgentes(vencimento_ate, 10),
+        ),
+        # carregar_processos / carregar_clientes: primeira página e dez páginas de rolagem
+        "processos.primeira_pagina": lambda: db.processos.pagina("inicio", None, TAMANHO_PAGINA),
+        "processos.rolar_10_paginas": lambda: _percorrer_paginas(db.processos.pagina, maximo=10),
+        "clientes.primeira_pagina": lambda: db.clientes.pagina("inicio", None, TAMANHO_PAGINA),
+        "clientes.rolar_10_paginas": lambda: _percorrer_paginas(db.clientes.pagina, maximo=10),
+        # Sugestões dos campos de cliente (processos) e de processo (tarefas), tecla a tecla
+        "autocompletar.clientes": lambda: [db.clientes.autocompletar(sobrenome[:n]) for n in range(1, len(sobrenome) + 1)],
+        "autocompletar.processos_numero": lambda: [db.processos.autocompletar(numero[:n]) for n in range(1, len(numero) + 1)],
+        "autocompletar.processos_cliente": lambda: [db.processos.autocompletar(sobrenome[:n]) for n in range(1, len(sobrenome) + 1)],
+        # realizar_busca
+        "busca.numero": lambda: db.busca.processos(numero=numero),
+        "busca.cliente": lambda: db.busca.processos(cliente=sobrenome),
+        "busca.texto": lambda: db.busca.processos(texto="sentença procedente"),
+        "busca.texto_e_filtros": lambda: db.busca.processos(texto="audiência", tipo="Cível", status="Ativo"),
+        "busca.so_filtros": lambda: db.busca.processos(tipo="Trabalhista"),
+        # abrir_detalhes_processo: linha do tempo do processo com mais andamentos
+        "andamentos.primeira_pagina": lambda: db.andamentos.pagina(maior, "inicio"),
+        "andamentos.percorrer_maior_processo": lambda: _percorrer_paginas(
+            lambda direcao, chave, limite: db.andamentos.pagina(maior, direcao, chave, limite), limite=100
+        ),
+        # AgendaLembretes.carregar: pendentes a vencer, já no heap
+        "lembretes.carga": lambda: lembretes.montar(
+            db.tarefas.vencimentos_futuros(agora), lembretes.ANTECEDENCIAS_PADRAO, time.time()
+        ),
+    }
+    # carregar_tarefas, um filtro por vez
+    for filtro in db.tarefas.FILTROS:
+        consultas[f"tarefas.{filtro}.primeira_pagina"] = (
+            lambda filtro=filtro: db.tarefas.pagina(filtro, agora, "inicio", None, TAMANHO_PAGINA)
+        )
+    return consultas
+
+
+def medir_operacoes(db, diretorio):
+    """Backup (completo e incremental), restauração, exportação, importação e recálculo de prazos; ms de cada"""
+    from sistema_juridico import exportacao, importacao, restauracao
+    from sistema_juridico.backup_incremental import RepositorioBackup
+    from sistema_juridico.repositorio import BancoDados
+
+    resultados = {}
+    repositorio = RepositorioBackup(os.path.join(diretorio, "backups"))
+
+    resultados["backup.completo"], manifesto = _uma_vez(lambda: repositorio.criar(db.conn))
+    with db.transacao():
+        db.conn.execute("UPDATE processos SET observacoes = 'alterado' WHERE id = (SELECT MIN(id) FROM processos)")
+    resultados["backup.incremental"], _ = _uma_vez(lambda: repositorio.criar(db.conn))
+
+    destino = os.path.join(diretorio, "restaurado.db")
+    resultados["restauracao.snapshot"], _ = _uma_vez(lambda: restauracao.substituir(
+        restauracao.preparar_snapshot(repositorio, manifesto["nome"], destino), destino
+    ))
+
+    # Exporta e reimporta num banco vazio, na ordem exigida pelas chaves
+    novo = BancoDados(os.path.join(diretorio, "importado.db"), **importacao.AJUSTES_IMPORTACAO)
+    try:
+        for tabela in ("clientes", "processos", "tarefas", "andamentos"):
+            arquivo = os.path.join(diretorio, f"{tabela}.csv")
+            resultados[f"exportacao.{tabela}"], linhas = _uma_vez(
+                lambda: exportacao.exportar_tabela(db, tabela, arquivo)
+            )
+            resultados[f"importacao.{tabela}"], resumo = _uma_vez(
+                lambda: importacao.importar_arquivo(novo.conn, tabela, arquivo)
+            )
+            if resumo["rejeitadas"]:
+                raise RuntimeError(f"Importação de {tabela} rejeitou {resumo['rejeitadas']} linhas")
+    finally:
+        novo.fechar()
+
+    # Suspensão nacional daqui a uma semana: recalcula todos os prazos abertos
+    suspensao = (date.today() + timedelta(days=7)).strftime(datas.DATA)
+    db.prazos.incluir_feriado(suspensao, "", "Suspensão de prazos")
+    resultados["prazos.recalcular"], _ = _uma_vez(db.prazos.recalcular)
+
+    return {nome: {"ms": ms} for nome, ms in resultados.items()}
+
+
+def _versao():
+    """Commit atual do repositório (ou None fora de um checkout git)"""
+    try:
+        saida = subprocess.run(
+            ["git", "describe", "--always", "--dirty"],
+            cwd=RAIZ_PROJETO, capture_output=True, text=True, timeout=10
+        )
+    except OSError:
+        return None
+    return saida.stdout.strip() or None
+
+
+def executar_suite(tamanho="medio", repeticoes=REPETICOES_SUITE, semente=1, progresso=print):
+    """Gera o banco, mede tudo e retorna o relatório (dicionário pronto para JSON)"""
+    from sistema_juridico import dados_sinteticos
+
+    db, diretorio = _banco_temporario()
+    try:
+        progresso(f"Gerando banco {tamanho}...")
+        geracao_ms, quantidades = _uma_vez(lambda: dados_sinteticos.gerar(
+            db.conn, *dados_sinteticos.TAMANHOS[tamanho], semente=semente
+        ))
+        resultados = {}
+        for nome, funcao in consultas_das_telas(db).items():
+            progresso(f"  {nome}")
+            resultados[nome] = _cronometrar(funcao, repeticoes)
+        progresso("  backup, restauração, exportação e importação")
+        resultados.update(medir_operacoes(db, diretorio))
+    finally:
+        _remover(db, diretorio)
+
+    return {
+        "versao": _versao(),
+        "data": datetime.now().strftime(datas.CARIMBO),
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "plataforma": platform.platform(),
+        "tamanho": tamanho,
+        "semente": semente,
+        "quantidades": quantidades,
+        "geracao_ms": geracao_ms,
+        "resultados": resultados,
+    }
+
+
+def _valor(medida):
+    return medida.get("mediana_ms", medida.get("ms"))
+
+
+def comparar(anterior, atual):
+    """[(nome, ms antes, ms agora, variação)] das medidas presentes nos dois relatórios"""
+    comparacao = []
+    for nome, medida in atual["resultados"].items():
+        if nome in anterior["resultados"]:
+            antes, agora = _valor(anterior["resultados"][nome]), _valor(medida)
+            comparacao.append((nome, antes, agora, (agora - antes) / antes if antes else 0.0))
+    return comparacao
+
+
+def main_suite(argv):
+    """Roda a suíte, grava o JSON e compara com uma execução anterior"""
+    from sistema_juridico import dados_sinteticos
+
+    parser = argparse.ArgumentParser(prog="python -m sistema_juridico.benchmarks suite")
+    parser.add_argument("tamanho", nargs="?", default="medio", choices=list(dados_sinteticos.TAMANHOS))
+    parser.add_argument("--saida", default=None, help="arquivo JSON (padrão: benchmark_<tamanho>_<data>.json)")
+    parser.add_argument("--comparar", help="JSON de uma execução anterior")
+    parser.add_argument("--repeticoes", type=int, default=REPETICOES_SUITE)
+    parser.add_argument("--semente", type=int, default=1)
+    args = parser.parse_args(argv)
+
+    relatorio = executar_suite(args.tamanho, args.repeticoes, args.semente)
+    saida = args.saida or f"benchmark_{args.tamanho}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    with open(saida, "w", encoding="utf-8") as arquivo:
+        json.dump(relatorio, arquivo, ensure_ascii=False, indent=2)
+
+    print(f"\n{'medida':<40} {'ms':>10}")
+    for nome, medida in relatorio["resultados"].items():
+        print(f"{nome:<40} {_valor(medida):>10.2f}")
+    print(f"\n✅ Resultados gravados em {saida}")
+
+    if not args.comparar:
+        return 0
+
+    with open(args.comparar, encoding="utf-8") as arquivo:
+        anterior = json.load(arquivo)
+    if anterior.get("tamanho") != relatorio["tamanho"]:
+        print(f"⚠️ Bancos de tamanhos diferentes: {anterior.get('tamanho')} x {relatorio['tamanho']}")
+
+    print(f"\nComparação com {anterior.get('versao')} ({anterior.get('data')})")
+    print(f"{'medida':<40} {'antes':>10} {'agora':>10} {'variação':>9}")
+    regressoes = 0
+    for nome, antes, agora, variacao in comparar(anterior, relatorio):
+        marca = ""
+        if variacao > TOLERANCIA_REGRESSAO and agora - antes > DIFERENCA_MINIMA_MS:
+            marca = " ❌"
+            regressoes += 1
+        print(f"{nome:<40} {antes:>10.2f} {agora:>10.2f} {variacao:>+8.0%}{marca}")
+    return 1 if regressoes else 0
+
+
+def main(argv=None):
+    """Compara o custo por linha da lista de tarefas antes e depois"""
+    argv = sys.argv[1:] if argv is None else argv
+    if argv and argv[0] == "partida":
+        return main_partida(argv[1:])
+    if argv and argv[0] == "suite":
+        return main_suite(argv[1:])
+    quantidade = int(argv[0]) if argv else QUANTIDADE_PADRAO
+
+    db, diretorio = _banco_temporario()
+    try:
+        print(f"Gerando {quantidade} tarefas...")
+        criar_tarefas(db, quantidade)
+
+        print(f"{'lista de tarefas':>16} {'total (s)':>10} {'linhas':>8} {'µs/linha':>9}")
+        for nome, (segundos, linhas) in medir_lista_tarefas(db).items():
+            print(f"{nome:>16} {segundos:>10.2f} {linhas:>8} {segundos / max(linhas, 1) * 1e6:>9.2f}")
+    finally:
+        _remover(db, diretorio)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
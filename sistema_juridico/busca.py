@@ -0,0 +1,44 @@
+"""
+Montagem de expressões de busca textual (FTS5)
+
+O texto digitado pelo usuário nunca é repassado cru ao MATCH: cada palavra
+vira uma frase entre aspas com prefixo (*), o que neutraliza a sintaxe do
+FTS5. Acentos e maiúsculas são ignorados pelo tokenizador
+(unicode61 remove_diacritics 2), tanto no índice quanto na consulta.
+"""
+
+import re
+
+
+# Marcadores dos trechos destacados (o Treeview não exibe negrito)
+INICIO_DESTAQUE = "«"
+FIM_DESTAQUE = "»"
+
+
+def palavras(texto):
+    """Separa o texto em palavras (letras e dígitos, com acentos)"""
+    return re.findall(r"\w+", texto or "")
+
+
+def frase(termos, prefixo=True):
+    """Frase FTS5 entre aspas; com prefixo, a última palavra casa por início"""
+    return '"' + " ".join(termos) + '"' + ("*" if prefixo else "")
+
+
+def expressao_palavras(texto, coluna=None):
+    """Todas as palavras do texto, cada uma como prefixo (opcionalmente numa coluna)"""
+    partes = [frase([termo]) for termo in palavras(texto)]
+    if coluna:
+        partes = [f"{coluna} : {parte}" for parte in partes]
+    return " AND ".join(partes)
+
+
+def expressao_numero(texto):
+    """Número do processo como frase: '0001234-56' casa '0001234-56.2024...'"""
+    termos = palavras(texto)
+    return f"numero : {frase(termos)}" if termos else ""
+
+
+def combinar(*expressoes):
+    """Junta expressões não vazias com AND"""
+    return " AND ".join(f"({e})" for e in expressoes if e)
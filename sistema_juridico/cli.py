@@ -0,0 +1,272 @@
+"""
+Linha de comando do sistema, sem interface gráfica
+
+Usa a mesma camada de dados da interface e nunca importa o Tkinter, então
+roda em servidores e em tarefas agendadas (cron). Cada subcomando importa
+só os módulos de que precisa, para que a partida seja rápida.
+
+    python -m sistema_juridico stats [--json]
+    python -m sistema_juridico search [--numero N] [--cliente C] [--texto T]
+        [--tipo T] [--status S] [--limite 20] [--json]
+    python -m sistema_juridico backup [--rotulo R] [--repositorio DIR] [--copia arquivo.db]
+    python -m sistema_juridico restore <arquivo.db | manifesto.json | nome do snapshot>
+        [--repositorio DIR] [--completo]
+    python -m sistema_juridico import <tabela> <arquivo.csv|.jsonl>
+    python -m sistema_juridico export <tabela|busca> <arquivo.csv|.jsonl|.xlsx> [filtros da busca]
+
+Todos aceitam --banco, antes ou depois do subcomando (padrão:
+sistema_juridico.db no diretório atual).
+Saída 0 em caso de sucesso, 1 em erro e 2 em uso incorreto.
+"""
+
+import argparse
+import os
+import sys
+
+from sistema_juridico import ARQUIVO_BANCO
+
+
+TABELAS = ("clientes", "processos", "tarefas", "andamentos")
+
+
+# ========== SUBCOMANDOS ==========
+
+def _abrir(args):
+    from sistema_juridico.repositorio import BancoDados
+
+    return BancoDados(args.banco)
+
+
+def _imprimir_json(dados):
+    import json
+
+    print(json.dumps(dados, ensure_ascii=False))
+
+
+def comando_stats(args):
+    """Contadores do dashboard e tarefas atrasadas/urgentes"""
+    from datetime import datetime, timedelta
+    from sistema_juridico import datas
+
+    agora = datetime.now()
+    db = _abrir(args)
+    try:
+        estatisticas = db.estatisticas.todas()
+        dados = {
+            "processos": estatisticas.get("processos.total", 0),
+            "processos_ativos": estatisticas.get("processos.status.Ativo", 0),
+            "clientes": estatisticas.get("clientes.total", 0),
+            "tarefas": estatisticas.get("tarefas.total", 0),
+            "tarefas_pendentes": estatisticas.get("tarefas.pendentes", 0),
+            # Vencidas antes deste minuto / antes do início do 8º dia, como no dashboard
+            "tarefas_atrasadas": db.tarefas.contar_urgentes(agora.strftime(datas.DATA_HORA)),
+            "tarefas_urgentes": db.tarefas.contar_urgentes((agora + timedelta(days=8)).strftime(datas.DATA)),
+        }
+    finally:
+        db.fechar()
+
+    if args.json:
+        _imprimir_json(dados)
+    else:
+        for chave, valor in dados.items():
+            print(f"{chave:<20} {valor:>10}")
+    return 0
+
+
+def comando_search(args):
+    """Busca avançada, mais relevantes primeiro"""
+    db = _abrir(args)
+    try:
+        resultados = db.busca.processos(
+            args.numero, args.cliente, args.texto, args.tipo, args.status, args.limite
+        )
+    finally:
+        db.fechar()
+
+    campos = ("id", "numero", "cliente", "tipo_acao", "status", "vara", "data_distribuicao", "trecho")
+    for linha in resultados:
+        if args.json:
+            _imprimir_json(dict(zip(campos, linha)))
+        else:
+            print("  ".join(str(valor) for valor in linha[1:]))
+    if not args.json:
+        print(f"{len(resultados)} processo(s) encontrado(s)", file=sys.stderr)
+    return 0
+
+
+def comando_backup(args):
+    """Snapshot incremental (ou cópia completa com --copia)"""
+    db = _abrir(args)
+    try:
+        if args.copia:
+            from sistema_juridico import backup
+
+            backup.copiar_online(db.conn, args.copia)
+            print(f"✅ Cópia completa gravada em {args.copia}")
+            return 0
+
+        from sistema_juridico.backup_incremental import RepositorioBackup
+
+        manifesto = RepositorioBackup(args.repositorio).criar(db.conn, args.rotulo)
+    finally:
+        db.fechar()
+
+    print(
+        f"✅ Snapshot {manifesto['nome']}: {manifesto['blocos_novos']} de "
+        f"{len(manifesto['blocos'])} blocos novos ({manifesto['bytes_gravados']} bytes gravados)"
+    )
+    return 0
+
+
+def comando_restore(args):
+    """Verifica o backup, salva os dados atuais no repositório e só então restaura"""
+    from sistema_juridico import restauracao
+    from sistema_juridico.backup_incremental import RepositorioBackup
+
+    repositorio = RepositorioBackup(args.repositorio)
+    origem = args.origem
+
+    if origem.endswith(".json"):
+        # Manifesto em <repositório>/snapshots/<nome>.json
+        repositorio = RepositorioBackup(os.path.dirname(os.path.dirname(os.path.abspath(origem))))
+        snapshot = os.path.splitext(os.path.basename(origem))[0]
+    elif os.path.exists(origem):
+        snapshot = None
+    else:
+        snapshot = origem
+
+    # Verifica (e copia) antes de gravar qualquer coisa: um arquivo inválido não deixa snapshot
+    if snapshot is None:
+        temporario = restauracao.preparar(origem, args.banco, completo=args.completo)
+    else:
+        temporario = restauracao.preparar_snapshot(repositorio, snapshot, args.banco, completo=args.completo)
+
+    try:
+        if os.path.exists(args.banco):
+            db = _abrir(args)
+            try:
+                anterior = repositorio.criar(db.conn, rotulo="antes da restauração")["nome"]
+            finally:
+                db.fechar()
+            print(f"💾 Dados atuais salvos no snapshot {anterior}")
+
+        restauracao.substituir(temporario, args.banco)
+    except BaseException:
+        restauracao.descartar(temporario)
+        raise
+
+    print(f"✅ {origem} restaurado em {args.banco}")
+    return 0
+
+
+def comando_import(args):
+    """Importação em massa (veja sistema_juridico.importacao)"""
+    from sistema_juridico import importacao
+    from sistema_juridico.repositorio import BancoDados
+
+    if not os.path.exists(args.arquivo):
+        print(f"❌ Arquivo não encontrado: {args.arquivo}", file=sys.stderr)
+        return 1
+
+    db = BancoDados(args.banco, **importacao.AJUSTES_IMPORTACAO)
+    try:
+        resumo = importacao.importar_arquivo(db.conn, args.tabela, args.arquivo)
+    finally:
+        db.fechar()
+
+    print(f"✅ {importacao.descrever(resumo)}")
+    if resumo["relatorio"]:
+        print(f"⚠️ Registros rejeitados em {resumo['relatorio']}")
+    return 0
+
+
+def comando_export(args):
+    """Exportação em streaming (veja sistema_juridico.exportacao)"""
+    from sistema_juridico import exportacao
+
+    db = _abrir(args)
+    try:
+        if args.origem == "busca":
+            linhas = exportacao.exportar_busca(
+                db, args.arquivo, args.numero, args.cliente, args.texto, args.tipo, args.status
+            )
+        else:
+            linhas = exportacao.exportar_tabela(db, args.origem, args.arquivo)
+    finally:
+        db.fechar()
+
+    print(f"✅ {linhas} linhas exportadas para {args.arquivo}")
+    return 0
+
+
+# ========== ARGUMENTOS ==========
+
+def _filtros_busca(parser):
+    for campo in ("numero", "cliente", "texto"):
+        parser.add_argument(f"--{campo}", default="")
+    parser.add_argument("--tipo")
+    parser.add_argument("--status")
+
+
+def criar_parser():
+    parser = argparse.ArgumentParser(
+        prog="python -m sistema_juridico",
+        description="Sistema Jurídico pela linha de comando (sem interface gráfica)"
+    )
+    parser.add_argument("--banco", default=ARQUIVO_BANCO, help="arquivo do banco de dados")
+    subcomandos = parser.add_subparsers(dest="comando", required=True)
+
+    # --banco também depois do subcomando; SUPPRESS mantém o valor dado antes dele
+    comum = argparse.ArgumentParser(add_help=False)
+    comum.add_argument("--banco", default=argparse.SUPPRESS, help="arquivo do banco de dados")
+
+    stats = subcomandos.add_parser("stats", parents=[comum], help="contadores e tarefas atrasadas")
+    stats.add_argument("--json", action="store_true")
+    stats.set_defaults(funcao=comando_stats)
+
+    search = subcomandos.add_parser("search", parents=[comum], help="busca avançada de processos")
+    _filtros_busca(search)
+    search.add_argument("--limite", type=int, default=20)
+    search.add_argument("--json", action="store_true", help="um objeto JSON por linha")
+    search.set_defaults(funcao=comando_search)
+
+    backup = subcomandos.add_parser("backup", parents=[comum], help="snapshot incremental do banco")
+    backup.add_argument("--rotulo", default="")
+    backup.add_argument("--repositorio", default="backups")
+    backup.add_argument("--copia", help="grava uma cópia completa (.db) em vez do snapshot")
+    backup.set_defaults(funcao=comando_backup)
+
+    restore = subcomandos.add_parser("restore", parents=[comum], help="restaura um backup ou snapshot")
+    restore.add_argument("origem", help="arquivo .db, manifesto .json ou nome do snapshot")
+    restore.add_argument("--repositorio", default="backups")
+    restore.add_argument("--completo", action="store_true", help="integrity_check em vez de quick_check")
+    restore.set_defaults(funcao=comando_restore)
+
+    importar = subcomandos.add_parser("import", parents=[comum], help="importa um arquivo CSV/JSONL")
+    importar.add_argument("tabela", choices=TABELAS)
+    importar.add_argument("arquivo")
+    importar.set_defaults(funcao=comando_import)
+
+    exportar = subcomandos.add_parser("export", parents=[comum], help="exporta uma tabela ou uma busca")
+    exportar.add_argument("origem", choices=TABELAS + ("busca",))
+    exportar.add_argument("arquivo")
+    _filtros_busca(exportar)
+    exportar.set_defaults(funcao=comando_export)
+
+    return parser
+
+
+def main(argv=None):
+    args = criar_parser().parse_args(sys.argv[1:] if argv is None else argv)
+
+    # restore e import podem criar o banco; os demais exigem que ele exista
+    if args.comando not in ("restore", "import") and not os.path.exists(args.banco):
+        print(f"❌ Banco não encontrado: {args.banco}", file=sys.stderr)
+        return 1
+
+    try:
+        return args.funcao(args)
+    except Exception as e:
+        # Erros esperados (arquivo inválido, backup corrompido, banco em uso...)
+        print(f"❌ {e}", file=sys.stderr)
+        return 1
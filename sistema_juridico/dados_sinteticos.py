@@ -0,0 +1,447 @@
+"""
+Gerador de bancos sintéticos para medições de desempenho
+
+Monta bancos reprodutíveis (mesma semente, mesmos dados) com distribuições
+parecidas com as de um escritório real:
+
+- números de processo no padrão CNJ (NNNNNNN-DD.AAAA.J.TR.OOOO), com
+  dígito verificador válido, segmento da Justiça conforme o tipo de ação;
+- clientes com CPF ou CNPJ válidos, nomes, endereços e e-mails em português;
+- poucos clientes com muitos processos e poucos processos com muitos
+  andamentos (distribuição de Pareto), como nos acervos de verdade;
+- tarefas espalhadas em torno de hoje, quase todas as vencidas concluídas;
+  as do tipo Prazo com processo têm o vencimento contado em dias úteis.
+
+Os triggers da busca textual ficam desligados durante a geração e o índice
+é reconstruído uma vez no final.
+
+    python -m sistema_juridico.dados_sinteticos <banco> [pequeno|medio|grande] [semente]
+    python -m sistema_juridico.dados_sinteticos <banco> <clientes> <processos> <tarefas> <andamentos> [semente]
+"""
+
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+from sistema_juridico import datas, manutencao, prazos
+
+
+# Tamanhos prontos: (clientes, processos, tarefas, andamentos)
+TAMANHOS = {
+    "pequeno": (500, 1000, 3000, 10000),
+    "medio": (5000, 20000, 60000, 300000),
+    "grande": (50000, 200000, 500000, 1500000),
+}
+
+# Linhas por executemany
+TAMANHO_LOTE = 50000
+
+# Tabelas com índice textual: o trigger de inserção sai durante a geração
+TABELAS_FTS = ("clientes", "processos", "andamentos")
+
+# Forma da cauda de Pareto: ~1,16 dá a regra 80/20
+CAUDA = 1.16
+
+
+# ========== VOCABULÁRIO ==========
+
+PRENOMES = (
+    "Ana", "Antônio", "Beatriz", "Bruno", "Camila", "Carlos", "Cláudia", "Daniel", "Eduarda", "Fábio",
+    "Fernanda", "Gabriel", "Helena", "Igor", "Isabela", "João", "Júlia", "Larissa", "Lucas", "Luíza",
+    "Marcos", "Maria", "Mariana", "Mateus", "Natália", "Otávio", "Patrícia", "Paulo", "Rafael", "Renata",
+    "Rodrigo", "Sérgio", "Sofia", "Tatiane", "Thiago", "Valéria", "Vinícius", "Vitória", "Wagner", "Yasmin",
+)
+
+SOBRENOMES = (
+    "Almeida", "Alves", "Araújo", "Barbosa", "Cardoso", "Carvalho", "Castro", "Costa", "Dias", "Fernandes",
+    "Ferreira", "Gomes", "Lima", "Lopes", "Machado", "Marques", "Martins", "Melo", "Mendes", "Monteiro",
+    "Moreira", "Nascimento", "Oliveira", "Pereira", "Pinto", "Ramos", "Reis", "Ribeiro", "Rocha", "Rodrigues",
+    "Santos", "Silva", "Soares", "Sousa", "Teixeira", "Vieira",
+)
+
+RAMOS_EMPRESA = (
+    "Comércio de Alimentos", "Construções", "Transportes", "Tecnologia", "Serviços Médicos",
+    "Indústria Têxtil", "Agropecuária", "Engenharia", "Distribuidora", "Educação",
+)
+
+LOGRADOUROS = ("Rua", "Avenida", "Travessa", "Alameda", "Praça")
+
+CIDADES = (
+    ("São Paulo", "SP"), ("Campinas", "SP"), ("Rio de Janeiro", "RJ"), ("Niterói", "RJ"),
+    ("Belo Horizonte", "MG"), ("Curitiba", "PR"), ("Porto Alegre", "RS"), ("Salvador", "BA"),
+    ("Recife", "PE"), ("Fortaleza", "CE"), ("Goiânia", "GO"), ("Florianópolis", "SC"),
+)
+
+# Tribunal de Justiça (segmento 8) de cada UF: código TR do número CNJ
+TRIBUNAIS_ESTADUAIS = {"SP": 26, "RJ": 19, "MG": 13, "PR": 16, "RS": 21, "BA": 5, "PE": 17, "CE": 6,
+                       "GO": 9, "SC": 24}
+
+# Tipo de ação -> (peso, segmento da Justiça, nome da vara)
+TIPOS_ACAO = {
+    "Cível": (35, 8, "Vara Cível"),
+    "Trabalhista": (25, 5, "Vara do Trabalho"),
+    "Família": (12, 8, "Vara de Família e Sucessões"),
+    "Criminal": (10, 8, "Vara Criminal"),
+    "Previdenciário": (10, 4, "Vara Federal Previdenciária"),
+    "Tributário": (8, 4, "Vara Federal de Execuções Fiscais"),
+}
+
+STATUS = {"Ativo": 60, "Arquivado": 25, "Finalizado": 15}
+
+OBSERVACOES = (
+    "Cliente prefere contato por e-mail.", "Aguardando documentos do cliente.",
+    "Processo com pedido de tutela de urgência.", "Honorários pagos em parcelas.",
+    "Possibilidade de acordo na audiência.", "Verificar prazo prescricional.",
+    "Parte contrária representada por escritório de grande porte.", "",
+)
+
+TAREFAS_POR_TIPO = {
+    "Audiência": ("Audiência de conciliação", "Audiência de instrução e julgamento", "Audiência una"),
+    "Petição": ("Protocolar contestação", "Protocolar réplica", "Manifestação sobre laudo pericial"),
+    "Recurso": ("Interpor apelação", "Contrarrazões de apelação", "Opor embargos de declaração"),
+    "Prazo": ("Prazo para contestação", "Prazo para cumprimento de sentença", "Prazo para manifestação"),
+    "Reunião": ("Reunião com o cliente", "Reunião para proposta de acordo"),
+    "Outro": ("Atualizar cálculos", "Organizar documentos", "Solicitar certidões"),
+}
+PESOS_TAREFAS = {"Prazo": 35, "Petição": 25, "Audiência": 15, "Recurso": 10, "Reunião": 8, "Outro": 7}
+# Prazos em dias úteis das tarefas do tipo Prazo (CPC: 5 para embargos, 15 para a maioria)
+PRAZOS_DIAS_UTEIS = (5, 15, 15, 15, 30)
+
+PECAS = ("contestação", "réplica", "alegações finais", "embargos de declaração", "apelação",
+         "impugnação ao cumprimento de sentença", "juntada de documentos", "habilitação")
+PARTES = ("autora", "ré", "requerente", "requerida", "exequente", "executada")
+ATOS = ("despacho", "decisão", "sentença", "decisão interlocutória")
+AUDIENCIAS = ("conciliação", "instrução e julgamento", "mediação")
+MANDADOS = ("citação", "intimação", "penhora e avaliação", "busca e apreensão")
+RESULTADOS = ("procedente", "parcialmente procedente", "improcedente")
+
+ANDAMENTOS = (
+    "Juntada de petição de {peca} pela parte {parte}.",
+    "Conclusos para {ato}.",
+    "Publicado(a) {ato} no Diário de Justiça Eletrônico.",
+    "Audiência de {audiencia} designada para {data}.",
+    "Expedido mandado de {mandado}.",
+    "Certidão: decorrido o prazo sem manifestação da parte {parte}.",
+    "Remetidos os autos à contadoria judicial.",
+    "Recebidos os autos do Tribunal.",
+    "Sentença proferida: pedido julgado {resultado}.",
+    "Mandado de {mandado} cumprido; certidão do oficial de justiça juntada.",
+)
+
+
+# ========== DOCUMENTOS ==========
+
+def _digitos_verificadores(base, pesos_lista):
+    digitos = list(base)
+    for pesos in pesos_lista:
+        resto = sum(d * p for d, p in zip(digitos, pesos)) % 11
+        digitos.append(0 if resto < 2 else 11 - resto)
+    return digitos
+
+
+def cpf(numero):
+    """CPF formatado e válido a partir de um número de 9 dígitos"""
+    base = [int(c) for c in f"{numero % 10**9:09d}"]
+    d = _digitos_verificadores(base, (range(10, 1, -1), range(11, 1, -1)))
+    return f"{d[0]}{d[1]}{d[2]}.{d[3]}{d[4]}{d[5]}.{d[6]}{d[7]}{d[8]}-{d[9]}{d[10]}"
+
+
+def cnpj(numero):
+    """CNPJ (matriz, 0001) formatado e válido a partir de um número de 8 dígitos"""
+    base = [int(c) for c in f"{numero % 10**8:08d}0001"]
+    d = _digitos_verificadores(base, ((5, 4, 3, 2, 9, 8, 7, 6, 5, 4, 3, 2),
+                                      (6, 5, 4, 3, 2, 9, 8, 7, 6, 5, 4, 3, 2)))
+    texto = "".join(map(str, d))
+    return f"{texto[:2]}.{texto[2:5]}.{texto[5:8]}/{texto[8:12]}-{texto[12:]}"
+
+
+def numero_cnj(sequencial, ano, segmento, tribunal, origem):
+    """Número CNJ (Resolução 65/2008) com o dígito verificador módulo 97"""
+    resto = int(f"{sequencial:07d}{ano}{segmento}{tribunal:02d}{origem:04d}") * 100 % 97
+    return f"{sequencial:07d}-{98 - resto:02d}.{ano}.{segmento}.{tribunal:02d}.{origem:04d}"
+
+
+def _espalhar(i, modulo):
+    # Bijeção em range(modulo) (3^18 é primo com 10^k): números distintos, sem ordem aparente
+    return (i * 387420489 + 104729) % modulo
+
+
+# ========== GERAÇÃO ==========
+
+def _pesos_pareto(aleatorio, quantidade):
+    return [aleatorio.paretovariate(CAUDA) for _ in range(quantidade)]
+
+
+def _repartir(aleatorio, total, pesos):
+    """Divide total em partes proporcionais aos pesos (a soma é exatamente total)"""
+    soma = sum(pesos)
+    partes = [int(total * peso / soma) for peso in pesos]
+    for indice in aleatorio.choices(range(len(pesos)), weights=pesos, k=total - sum(partes)):
+        partes[indice] += 1
+    return partes
+
+
+def _clientes(aleatorio, quantidade, agora):
+    inicio = agora - timedelta(days=3650)
+    for i in range(quantidade):
+        cidade, uf = aleatorio.choice(CIDADES)
+        if aleatorio.random() < 0.2:
+            socio1, socio2 = aleatorio.sample(SOBRENOMES, 2)
+            nome = f"{socio1} & {socio2} {aleatorio.choice(RAMOS_EMPRESA)} Ltda"
+            documento = cnpj(_espalhar(i, 10**8))
+            email = f"contato{i}@{nome.split()[0].lower()}.com.br"
+        else:
+            prenome = aleatorio.choice(PRENOMES)
+            nome = f"{prenome} {' '.join(aleatorio.sample(SOBRENOMES, 2))}"
+            documento = cpf(_espalhar(i, 10**9))
+            email = f"{prenome.lower()}.{i}@email.com"
+        yield (
+            nome,
+            documento,
+            f"({aleatorio.randint(11, 99)}) 9{aleatorio.randint(1000, 9999)}-{aleatorio.randint(1000, 9999)}",
+            email,
+            f"{aleatorio.choice(LOGRADOUROS)} {aleatorio.choice(SOBRENOMES)}, {aleatorio.randint(1, 3000)} - "
+            f"{cidade}/{uf}",
+            aleatorio.choice(OBSERVACOES),
+            (inicio + timedelta(seconds=aleatorio.randint(0, 3650 * 86400))).strftime(datas.CARIMBO),
+        )
+
+
+def _processos(aleatorio, quantidade, clientes, agora):
+    """Gera as linhas de processos; guarda (id, data de distribuição) em distribuicoes"""
+    tipos = list(TIPOS_ACAO)
+    pesos_tipos = [TIPOS_ACAO[t][0] for t in tipos]
+    status = list(STATUS)
+    pesos_status = list(STATUS.values())
+    # Poucos clientes com muitos processos
+    escolhidos = aleatorio.choices(clientes, weights=_pesos_pareto(aleatorio, len(clientes)), k=quantidade) \
+        if clientes else [None] * quantidade
+
+    for i in range(quantidade):
+        tipo = aleatorio.choices(tipos, pesos_tipos)[0]
+        _, segmento, nome_vara = TIPOS_ACAO[tipo]
+        cidade, uf = aleatorio.choice(CIDADES)
+        tribunal = TRIBUNAIS_ESTADUAIS[uf] if segmento == 8 else aleatorio.randint(1, 5)
+        distribuicao = agora - timedelta(days=aleatorio.randint(0, 15 * 365))
+        cliente = escolhidos[i]
+        yield (
+            numero_cnj(_espalhar(i, 10**7), distribuicao.year, segmento, tribunal, aleatorio.randint(1, 999)),
+            cliente[1] if cliente else "Cliente não cadastrado",
+            cliente[0] if cliente else None,
+            tipo,
+            f"{aleatorio.randint(1, 12)}ª {nome_vara} de {cidade}",
+            aleatorio.choices(status, pesos_status)[0],
+            distribuicao.strftime(datas.DATA),
+            round(aleatorio.lognormvariate(10, 1.2), 2),
+            aleatorio.choice(OBSERVACOES),
+            (distribuicao + timedelta(days=aleatorio.randint(0, 30), seconds=aleatorio.randint(0, 86399)))
+            .strftime(datas.CARIMBO),
+        )
+
+
+def _texto_andamento(aleatorio, quando):
+    return aleatorio.choice(ANDAMENTOS).format(
+        peca=aleatorio.choice(PECAS),
+        parte=aleatorio.choice(PARTES),
+        ato=aleatorio.choice(ATOS),
+        audiencia=aleatorio.choice(AUDIENCIAS),
+        data=(quando + timedelta(days=aleatorio.randint(15, 90))).strftime("%d/%m/%Y"),
+        mandado=aleatorio.choice(MANDADOS),
+        resultado=aleatorio.choice(RESULTADOS),
+    )
+
+
+def _andamentos(aleatorio, quantidade, processos, agora):
+    """Andamentos em ordem cronológica dentro de cada processo, com contagens de Pareto"""
+    if not processos:
+        return
+    for (processo_id, distribuicao, _), contagem in zip(processos, _repartir(
+            aleatorio, quantidade, _pesos_pareto(aleatorio, len(processos)))):
+        if not contagem:
+            continue
+        inicio = datetime.strptime(distribuicao, datas.DATA)
+        segundos = max(int((agora - inicio).total_seconds()), 60)
+        for deslocamento in sorted(aleatorio.randrange(segundos) for _ in range(contagem)):
+            quando = inicio + timedelta(seconds=deslocamento)
+            yield (
+                processo_id,
+                quando.strftime(datas.DATA_HORA),
+                _texto_andamento(aleatorio, quando),
+                quando.strftime(datas.CARIMBO),
+            )
+
+
+def _tarefas(aleatorio, quantidade, processos, agora):
+    tipos = list(PESOS_TAREFAS)
+    pesos = list(PESOS_TAREFAS.values())
+    calendarios = {}
+    for _ in range(quantidade):
+        tipo = aleatorio.choices(tipos, pesos)[0]
+        # Mais tarefas perto de hoje: desvio padrão de ~4 meses
+        vencimento = agora + timedelta(minutes=int(aleatorio.gauss(0, 120 * 24 * 60)))
+        processo = aleatorio.choice(processos) if processos and aleatorio.random() < 0.85 else None
+
+        prazo_inicio = prazo_dias = tribunal = None
+        if tipo == "Prazo" and processo:
+            # Contado no calendário do tribunal, a partir de uma intimação uns dias antes
+            prazo_dias = aleatorio.choice(PRAZOS_DIAS_UTEIS)
+            tribunal = prazos.tribunal_do_numero(processo[2])
+            inicio = (vencimento - timedelta(days=prazo_dias * 7 // 5)).date()
+            calendario = calendarios.get(tribunal)
+            if calendario is None or not calendario.cobre(*prazos.intervalo(inicio, prazo_dias)):
+                calendario = calendarios[tribunal] = prazos.montar(
+                    tribunal, *prazos.intervalo(min(inicio, agora.date()), prazo_dias), ()
+                )
+            vencimento = datetime.combine(calendario.prazo(inicio, prazo_dias), vencimento.time())
+            prazo_inicio = inicio.strftime(datas.DATA)
+
+        vencida = vencimento < agora
+        concluida = aleatorio.random() < (0.85 if vencida else 0.05)
+        cadastro = vencimento - timedelta(days=aleatorio.randint(1, 60))
+        yield (
+            processo[0] if processo else None,
+            aleatorio.choice(TAREFAS_POR_TIPO[tipo]),
+            aleatorio.choice(OBSERVACOES),
+            tipo,
+            vencimento.strftime(datas.DATA_HORA),
+            int(concluida),
+            min(vencimento, agora).strftime(datas.CARIMBO) if concluida else None,
+            min(cadastro, agora).strftime(datas.CARIMBO),
+            prazo_inicio,
+            prazo_dias,
+            tribunal,
+        )
+
+
+def _lotes(linhas, tamanho):
+    lote = []
+    for linha in linhas:
+        lote.append(linha)
+        if len(lote) == tamanho:
+            yield lote
+            lote = []
+    if lote:
+        yield lote
+
+
+INSERCOES = {
+    "clientes": '''
+        INSERT INTO clientes (nome, cpf_cnpj, telefone, email, endereco, observacoes, data_cadastro)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+    ''',
+    "processos": '''
+        INSERT INTO processos (numero, cliente, cliente_id, tipo_acao, vara, status, data_distribuicao,
+                               valor_causa, observacoes, data_cadastro)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ''',
+    "tarefas": '''
+        INSERT INTO tarefas (processo_id, titulo, descricao, tipo, data_vencimento, concluida,
+                             data_conclusao, data_cadastro, prazo_inicio, prazo_dias, tribunal)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ''',
+    "andamentos": '''
+        INSERT INTO andamentos (processo_id, data_andamento, descricao, data_cadastro)
+        VALUES (?, ?, ?, ?)
+    ''',
+}
+
+
+def gerar(conn, clientes, processos, tarefas, andamentos, semente=1, progresso=None):
+    """Acrescenta dados sintéticos ao banco (já migrado) e retorna {tabela: linhas}
+
+    progresso(tabela, linhas gravadas, total) é chamado após cada lote.
+    """
+    aleatorio = random.Random(semente)
+    agora = datetime.now().replace(microsecond=0)
+    quantidades = {"clientes": clientes, "processos": processos, "tarefas": tarefas, "andamentos": andamentos}
+
+    gatilhos = conn.execute(
+        "SELECT name, sql FROM sqlite_master WHERE type = 'trigger' AND name IN "
+        f"({', '.join(repr(f'{tabela}_fts_ai') for tabela in TABELAS_FTS)})"
+    ).fetchall()
+
+    def _gravar(tabela, linhas):
+        gravadas = 0
+        for lote in _lotes(linhas, TAMANHO_LOTE):
+            with conn:
+                conn.executemany(INSERCOES[tabela], lote)
+            gravadas += len(lote)
+            if progresso:
+                progresso(tabela, gravadas, quantidades[tabela])
+
+    for nome, _ in gatilhos:
+        conn.execute(f"DROP TRIGGER {nome}")
+    try:
+        primeiro = conn.execute("SELECT COALESCE(MAX(id), 0) FROM clientes").fetchone()[0]
+        _gravar("clientes", _clientes(aleatorio, clientes, agora))
+        lista_clientes = conn.execute("SELECT id, nome FROM clientes WHERE id > ?", (primeiro,)).fetchall()
+
+        primeiro = conn.execute("SELECT COALESCE(MAX(id), 0) FROM processos").fetchone()[0]
+        _gravar("processos", _processos(aleatorio, processos, lista_clientes, agora))
+        lista_processos = conn.execute(
+            "SELECT id, data_distribuicao, numero FROM processos WHERE id > ? ORDER BY id", (primeiro,)
+        ).fetchall()
+        del lista_clientes
+
+        _gravar("tarefas", _tarefas(aleatorio, tarefas, lista_processos, agora))
+        _gravar("andamentos", _andamentos(aleatorio, andamentos, lista_processos, agora))
+    finally:
+        with conn:
+            for nome, sql in gatilhos:
+                conn.execute(sql)
+            # Índice textual reconstruído de uma vez a partir das tabelas
+            for tabela in TABELAS_FTS:
+                conn.execute(f"INSERT INTO {tabela}_fts({tabela}_fts) VALUES('rebuild')")
+            # Dados já canônicos e vinculados: nada para a manutenção em lotes refazer
+            for tarefa, (tabela, _) in manutencao.TAREFAS.items():
+                conn.execute(f'''
+                    INSERT INTO progresso_manutencao (tarefa, ultimo_id, concluida)
+                    SELECT ?, COALESCE(MAX(id), 0), 1 FROM {tabela} WHERE true
+                    ON CONFLICT (tarefa) DO UPDATE SET ultimo_id = excluded.ultimo_id, concluida = 1
+                ''', (tarefa,))
+
+    return quantidades
+
+
+def gerar_banco(caminho, tamanho="pequeno", semente=1, progresso=None):
+    """Cria (ou completa) o banco em caminho com um dos TAMANHOS ou uma tupla de quantidades"""
+    from sistema_juridico.repositorio import BancoDados
+
+    quantidades = TAMANHOS[tamanho] if isinstance(tamanho, str) else tamanho
+    db = BancoDados(caminho)
+    try:
+        return gerar(db.conn, *quantidades, semente=semente, progresso=progresso)
+    finally:
+        db.fechar()
+
+
+def main(argv=None):
+    """Gera um banco sintético pela linha de comando"""
+    argv = sys.argv[1:] if argv is None else argv
+    if len(argv) in (1, 2, 3) and (len(argv) == 1 or argv[1] in TAMANHOS):
+        tamanho = argv[1] if len(argv) > 1 else "pequeno"
+        semente = int(argv[2]) if len(argv) == 3 else 1
+    elif len(argv) in (5, 6):
+        tamanho = tuple(int(n) for n in argv[1:5])
+        semente = int(argv[5]) if len(argv) == 6 else 1
+    else:
+        print(__doc__)
+        return 2
+
+    if os.path.exists(argv[0]):
+        print(f"⚠️ {argv[0]} já existe: os dados serão acrescentados")
+
+    def _progresso(tabela, linhas, total):
+        print(f"\r{tabela:<11} {linhas:>9} de {total}", end="", flush=True)
+
+    inicio = time.perf_counter()
+    quantidades = gerar_banco(argv[0], tamanho, semente, _progresso)
+    resumo = ", ".join(f"{n} {tabela}" for tabela, n in quantidades.items())
+    print(f"\r✅ {resumo} em {time.perf_counter() - inicio:.1f} s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
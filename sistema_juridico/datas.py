@@ -0,0 +1,96 @@
+"""
+Formato canônico das datas gravadas no banco
+
+Todas as colunas de data guardam texto ISO-8601 (AAAA-MM-DD, com a hora
+quando houver), que ordena como texto na ordem cronológica: filtros e
+ORDER BY viram faixas nos índices, sem date() em volta da coluna.
+A interface continua mostrando e aceitando DD/MM/AAAA.
+"""
+
+from datetime import datetime
+
+
+DATA = "%Y-%m-%d"
+DATA_HORA = "%Y-%m-%d %H:%M"
+CARIMBO = "%Y-%m-%d %H:%M:%S"
+
+# Formato canônico de cada coluna de data
+COLUNAS = {
+    "processos": {"data_distribuicao": DATA, "data_cadastro": CARIMBO},
+    "andamentos": {"data_andamento": DATA_HORA, "data_cadastro": CARIMBO},
+    "tarefas": {"data_vencimento": DATA_HORA, "data_conclusao": CARIMBO, "data_cadastro": CARIMBO},
+    "clientes": {"data_cadastro": CARIMBO},
+}
+
+# Formato de exibição correspondente a cada formato canônico
+EXIBICAO = {
+    DATA: "%d/%m/%Y",
+    DATA_HORA: "%d/%m/%Y %H:%M",
+    CARIMBO: "%d/%m/%Y %H:%M:%S",
+}
+
+# Formatos aceitos na digitação e nos dados antigos
+FORMATOS_ENTRADA = (
+    "%d/%m/%Y %H:%M:%S", "%d/%m/%Y %H:%M", "%d/%m/%Y",
+    "%d-%m-%Y", "%d.%m.%Y", "%d/%m/%y",
+    CARIMBO, DATA_HORA, DATA,
+    "%Y-%m-%dT%H:%M:%S", "%Y-%m-%dT%H:%M",
+)
+
+DESCRICAO = {
+    DATA: "AAAA-MM-DD",
+    DATA_HORA: "AAAA-MM-DD HH:MM",
+    CARIMBO: "AAAA-MM-DD HH:MM:SS",
+}
+
+
+def interpretar(texto):
+    """Converte o texto em datetime (None se não estiver num formato aceito)"""
+    texto = (texto or "").strip()
+
+    # Caminho rápido para o formato canônico (o dos dados gravados e importados):
+    # fromisoformat é implementado em C, cada strptime custa dezenas de µs
+    if len(texto) >= 10 and texto[4:5] == "-":
+        try:
+            data = datetime.fromisoformat(texto)
+        except ValueError:
+            pass
+        else:
+            if data.tzinfo is None:
+                return data
+
+    for formato in FORMATOS_ENTRADA:
+        try:
+            return datetime.strptime(texto, formato)
+        except ValueError:
+            continue
+    return None
+
+
+def normalizar(texto, formato):
+    """Texto no formato canônico, ou None se não for uma data reconhecível"""
+    data = interpretar(texto)
+    return data.strftime(formato) if data else None
+
+
+def exibir(texto, formato):
+    """Valor canônico no formato de exibição (o próprio texto se não for canônico)"""
+    try:
+        return datetime.strptime(texto, formato).strftime(EXIBICAO[formato])
+    except (TypeError, ValueError):
+        return texto
+
+
+def sql_exibir(coluna, formato):
+    """Expressão SQL que mostra a coluna no formato de exibição"""
+    return f"COALESCE(strftime('{EXIBICAO[formato]}', {coluna}), {coluna})"
+
+
+def sql_valida(coluna, formato):
+    """Expressão SQL verdadeira quando a coluna é NULL ou está no formato canônico
+
+    strftime() devolve NULL para texto que não é data e, com um modificador,
+    normaliza datas impossíveis (30/02 vira 01/03): só o valor canônico
+    volta idêntico.
+    """
+    return f"{coluna} IS strftime('{formato}', {coluna}, '+0 days')"
@@ -0,0 +1,60 @@
+"""
+Contadores do dashboard
+
+A tabela estatisticas guarda totais mantidos por triggers (migração 4),
+de modo que o dashboard lê alguns poucos valores em vez de contar as
+tabelas. As funções abaixo recalculam os totais a partir dos dados e
+apontam divergências.
+"""
+
+
+# Contagem real de cada chave, a partir das tabelas
+SQL_CONTAGENS = '''
+    SELECT 'processos.total', COUNT(*) FROM processos
+    UNION ALL
+    SELECT 'processos.status.' || status, COUNT(*) FROM processos GROUP BY status
+    UNION ALL
+    SELECT 'clientes.total', COUNT(*) FROM clientes
+    UNION ALL
+    SELECT 'tarefas.total', COUNT(*) FROM tarefas
+    UNION ALL
+    SELECT 'tarefas.pendentes', COUNT(*) FROM tarefas WHERE concluida = 0
+'''
+
+
+def contagens_reais(conn):
+    """Conta as tabelas e retorna {chave: valor}"""
+    return dict(conn.execute(SQL_CONTAGENS).fetchall())
+
+
+def contagens_armazenadas(conn):
+    """Retorna {chave: valor} da tabela estatisticas"""
+    return dict(conn.execute("SELECT chave, valor FROM estatisticas").fetchall())
+
+
+def recalcular(conn):
+    """Regrava todos os contadores (sem commit; quem chama controla a transação)"""
+    conn.execute("DELETE FROM estatisticas")
+    conn.executemany(
+        "INSERT INTO estatisticas (chave, valor) VALUES (?, ?)",
+        contagens_reais(conn).items()
+    )
+
+
+def verificar(conn, corrigir=False):
+    """Compara contadores e tabelas; retorna [(chave, armazenado, real)] divergentes"""
+    reais = contagens_reais(conn)
+    armazenadas = contagens_armazenadas(conn)
+
+    divergencias = []
+    for chave in sorted(set(reais) | set(armazenadas)):
+        real = reais.get(chave, 0)
+        armazenado = armazenadas.get(chave, 0)
+        if real != armazenado:
+            divergencias.append((chave, armazenado, real))
+
+    if divergencias and corrigir:
+        with conn:
+            recalcular(conn)
+
+    return divergencias
@@ -0,0 +1,242 @@
+"""
+Executor de consultas em segundo plano
+
+Uma thread de trabalho com conexão própria executa as consultas das telas,
+para que o mainloop do Tkinter nunca fique bloqueado no SQLite. Cada
+consulta devolve um Future; os callbacks são entregues na thread do Tk por
+root.after. Consultas com a mesma chave se substituem: a anterior é
+cancelada (Connection.interrupt() se já estiver rodando) e seu resultado
+é descartado.
+"""
+
+import queue
+import sqlite3
+import sys
+import threading
+from concurrent.futures import Future
+
+from sistema_juridico import ARQUIVO_BANCO
+from sistema_juridico.instrumentacao import INSTRUMENTACAO
+from sistema_juridico.repositorio import BancoDados, PERFIL_PADRAO
+
+
+class ConsultaCancelada(Exception):
+    """A consulta foi cancelada ou substituída por outra mais nova"""
+
+
+class Trabalho:
+    """Uma consulta na fila do executor"""
+
+    def __init__(self, funcao, args, chave, ao_concluir, ao_falhar):
+        self.funcao = funcao
+        self.args = args
+        self.chave = chave
+        self.ao_concluir = ao_concluir
+        self.ao_falhar = ao_falhar
+        self.cancelado = False
+        self.future = Future()
+        # Tela que pediu a consulta (instrumentação ligada): espera o callback
+        self.tela = INSTRUMENTACAO.tela_atual()
+
+
+class ExecutorConsultas:
+    """Thread de trabalho com conexão própria ao banco
+
+    funcao(db, *args) roda na thread de trabalho com o BancoDados dela.
+    """
+
+    # Intervalo (ms) de entrega dos resultados enquanto houver consultas pendentes
+    INTERVALO_ENTREGA = 15
+
+    def __init__(self, caminho=ARQUIVO_BANCO, perfil=PERFIL_PADRAO):
+        self.caminho = caminho
+        self.perfil = perfil
+        self.db = None
+        self.root = None
+
+        self.fila = queue.Queue()
+        self.entregas = queue.Queue()
+        self.lock = threading.Lock()
+        self.em_execucao = None
+
+        # Acessados apenas na thread do Tk
+        self.ultimos = {}
+        self.pendentes = 0
+        self._entregando = False
+
+        self.thread = threading.Thread(target=self._rodar, name="executor-consultas", daemon=True)
+        self.thread.start()
+
+    def ligar_tk(self, root):
+        """Define a janela cujo mainloop recebe os callbacks"""
+        self.root = root
+
+    # ========== API (thread do Tk) ==========
+
+    def executar(self, funcao, *args, chave=None, ao_concluir=None, ao_falhar=None):
+        """Enfileira funcao(db, *args) e retorna o Future
+
+        ao_concluir(resultado) e ao_falhar(erro) rodam na thread do Tk.
+        Uma nova consulta com a mesma chave cancela a anterior.
+        """
+        trabalho = Trabalho(funcao, args, chave, ao_concluir, ao_falhar)
+
+        if chave is not None:
+            anterior = self.ultimos.get(chave)
+            self.ultimos[chave] = trabalho
+            if anterior is not None:
+                self._cancelar(anterior)
+
+        if self.root is not None and (ao_concluir or ao_falhar):
+            self.pendentes += 1
+            if trabalho.tela is not None:
+                trabalho.tela.pendencia()
+            trabalho.future.add_done_callback(lambda f: self.entregas.put(trabalho))
+            self._agendar_entrega()
+
+        self.fila.put(trabalho)
+        return trabalho.future
+
+    def notificar(self, funcao, *args):
+        """Agenda funcao(*args) na thread do Tk; pode ser chamado pela thread de trabalho
+
+        Usado para progresso: só é entregue enquanto houver consulta pendente.
+        """
+        self.entregas.put(lambda: funcao(*args))
+
+    def cancelar(self, chave):
+        """Cancela a consulta mais recente com esta chave"""
+        trabalho = self.ultimos.pop(chave, None)
+        if trabalho is not None:
+            self._cancelar(trabalho)
+
+    def suspender(self):
+        """Fecha a conexão da thread de trabalho (antes de substituir o arquivo do banco)"""
+        for chave in list(self.ultimos):
+            self.cancelar(chave)
+        self.executar(lambda db: db.fechar()).result()
+
+    def retomar(self):
+        """Reabre a conexão da thread de trabalho"""
+        self.executar(lambda db: db.abrir()).result()
+
+    def fechar(self, espera=2.0):
+        """Cancela o que estiver rodando e encerra a thread"""
+        with self.lock:
+            if self.em_execucao is not None:
+                self._interromper(self.em_execucao)
+        self.fila.put(None)
+        self.thread.join(espera)
+
+    # ========== INTERNO ==========
+
+    def _cancelar(self, trabalho):
+        if trabalho.future.cancel():
+            return
+        with self.lock:
+            if self.em_execucao is trabalho:
+                self._interromper(trabalho)
+
+    def _interromper(self, trabalho):
+        # Chamado com self.lock; interrupt() pode ser chamado de outra thread
+        trabalho.cancelado = True
+        if self.db is not None and self.db.conn is not None:
+            self.db.conn.interrupt()
+
+    def _agendar_entrega(self):
+        if not self._entregando:
+            self._entregando = True
+            self.root.after(self.INTERVALO_ENTREGA, self._entregar)
+
+    def _entregar(self):
+        """Repassa os resultados prontos aos callbacks, na thread do Tk"""
+        self._entregando = False
+
+        while True:
+            try:
+                trabalho = self.entregas.get_nowait()
+            except queue.Empty:
+                break
+
+            if not isinstance(trabalho, Trabalho):
+                # Notificação de progresso (notificar)
+                try:
+                    trabalho()
+                except Exception:
+                    self.root.report_callback_exception(*sys.exc_info())
+                continue
+
+            self.pendentes -= 1
+            try:
+                INSTRUMENTACAO.na_tela(trabalho.tela, self._entregar_trabalho, trabalho)
+            finally:
+                if trabalho.tela is not None:
+                    trabalho.tela.concluir()
+
+        if self.pendentes > 0:
+            self._agendar_entrega()
+
+    def _entregar_trabalho(self, trabalho):
+        """Chama o callback de uma consulta concluída (se ela não foi substituída)"""
+        # Resultado de uma consulta já substituída: descartado
+        if trabalho.chave is not None:
+            if self.ultimos.get(trabalho.chave) is not trabalho:
+                return
+            del self.ultimos[trabalho.chave]
+
+        future = trabalho.future
+        if future.cancelled():
+            return
+
+        try:
+            erro = future.exception()
+            if erro is None:
+                if trabalho.ao_concluir:
+                    trabalho.ao_concluir(future.result())
+            elif not isinstance(erro, ConsultaCancelada):
+                if trabalho.ao_falhar:
+                    trabalho.ao_falhar(erro)
+                else:
+                    print(f"❌ Erro em consulta em segundo plano: {erro}")
+        except Exception:
+            # Um callback com erro não pode interromper as demais entregas
+            self.root.report_callback_exception(*sys.exc_info())
+
+    def _rodar(self):
+        """Laço da thread de trabalho"""
+        self.db = BancoDados(self.caminho, self.perfil, migrar=False)
+
+        while True:
+            trabalho = self.fila.get()
+            if trabalho is None:
+                break
+
+            if not trabalho.future.set_running_or_notify_cancel():
+                continue
+
+            with self.lock:
+                self.em_execucao = trabalho
+
+            try:
+                resultado = INSTRUMENTACAO.na_tela(trabalho.tela, trabalho.funcao, self.db, *trabalho.args)
+            except sqlite3.OperationalError as e:
+                if trabalho.cancelado:
+                    erro = ConsultaCancelada(str(e))
+                else:
+                    erro = e
+                resultado = None
+            except Exception as e:
+                erro = e
+                resultado = None
+            else:
+                erro = ConsultaCancelada() if trabalho.cancelado else None
+            finally:
+                with self.lock:
+                    self.em_execucao = None
+
+            if erro is None:
+                trabalho.future.set_result(resultado)
+            else:
+                trabalho.future.set_exception(erro)
+
+        self.db.fechar()
@@ -0,0 +1,291 @@
+"""
+Exportação de tabelas inteiras e de resultados da busca avançada
+
+As linhas saem do cursor em blocos (fetchmany) e são gravadas à medida que
+chegam, de modo que a memória usada depende do tamanho do bloco, não da
+quantidade de linhas. O formato vem da extensão do arquivo:
+
+    .csv    cabeçalho + uma linha por registro (UTF-8 com BOM, abre no Excel)
+    .jsonl  um objeto JSON por linha
+    .xlsx   planilha do Excel, montada diretamente no zip, uma aba a cada
+            1.048.575 linhas (o limite de linhas por aba do Excel)
+
+As colunas das tabelas são as aceitas pela importação, então um arquivo
+exportado pode ser importado em outro banco.
+
+Uso pela linha de comando:
+
+    python -m sistema_juridico.exportacao <tabela> <arquivo> [--banco caminho]
+    python -m sistema_juridico.exportacao busca <arquivo> [--numero ...] [--cliente ...]
+        [--texto ...] [--tipo ...] [--status ...]
+"""
+
+import argparse
+import csv
+import json
+import os
+import re
+import sys
+import time
+import zipfile
+from xml.sax.saxutils import escape
+
+from sistema_juridico import ARQUIVO_BANCO
+
+
+# Linhas lidas do cursor por vez
+TAMANHO_BLOCO = 5000
+
+TABELAS = ("clientes", "processos", "tarefas", "andamentos")
+
+# Linhas por aba da planilha, sem contar o cabeçalho
+LINHAS_POR_ABA = 1048575
+
+# Limite de caracteres de uma célula do Excel
+MAXIMO_CELULA = 32767
+
+# Caracteres de controle que o XML não aceita
+INVALIDOS_XML = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f\ufffe\uffff]")
+
+
+class ErroExportacao(Exception):
+    """Formato ou tabela que não podem ser exportados"""
+
+
+# ========== FORMATOS ==========
+
+class EscritorCSV:
+    def __init__(self, caminho, colunas):
+        self.arquivo = open(caminho, "w", newline="", encoding="utf-8-sig")
+        self.escritor = csv.writer(self.arquivo)
+        self.escritor.writerow(colunas)
+
+    def escrever(self, linhas):
+        self.escritor.writerows(linhas)
+
+    def fechar(self):
+        self.arquivo.close()
+
+
+class EscritorJSONL:
+    def __init__(self, caminho, colunas):
+        self.arquivo = open(caminho, "w", encoding="utf-8")
+        self.colunas = colunas
+
+    def escrever(self, linhas):
+        self.arquivo.write("".join(
+            json.dumps(dict(zip(self.colunas, linha)), ensure_ascii=False) + "\n"
+            for linha in linhas
+        ))
+
+    def fechar(self):
+        self.arquivo.close()
+
+
+XML_ABA_INICIO = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+)
+XML_ABA_FIM = "</sheetData></worksheet>"
+
+XML_TIPOS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '{abas}</Types>'
+)
+XML_TIPO_ABA = (
+    '<Override PartName="/xl/worksheets/sheet{n}.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+)
+
+XML_RELACOES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="xl/workbook.xml"/></Relationships>'
+)
+
+XML_PASTA = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+    'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+    '<sheets>{abas}</sheets></workbook>'
+)
+XML_PASTA_ABA = '<sheet name="Planilha{n}" sheetId="{n}" r:id="rId{n}"/>'
+
+XML_RELACOES_PASTA = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '{abas}</Relationships>'
+)
+XML_RELACAO_ABA = (
+    '<Relationship Id="rId{n}" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+    'Target="worksheets/sheet{n}.xml"/>'
+)
+
+
+def _celula(valor):
+    if valor is None:
+        return "<c/>"
+    if isinstance(valor, (int, float)) and not isinstance(valor, bool):
+        return f"<c><v>{valor!r}</v></c>"
+    texto = escape(INVALIDOS_XML.sub("", str(valor))[:MAXIMO_CELULA])
+    return f'<c t="inlineStr"><is><t xml:space="preserve">{texto}</t></is></c>'
+
+
+def _linha_xml(linha):
+    return "<row>" + "".join(_celula(valor) for valor in linha) + "</row>"
+
+
+class EscritorXLSX:
+    """Planilha mínima (sem estilos, textos inline) gravada aba por aba no zip"""
+
+    def __init__(self, caminho, colunas):
+        self.zip = zipfile.ZipFile(caminho, "w", zipfile.ZIP_DEFLATED)
+        self.cabecalho = _linha_xml(colunas)
+        self.abas = 0
+        self.aba = None
+        self.linhas_na_aba = 0
+        self._nova_aba()
+
+    def _nova_aba(self):
+        self._fechar_aba()
+        self.abas += 1
+        self.aba = self.zip.open(f"xl/worksheets/sheet{self.abas}.xml", "w", force_zip64=True)
+        self.aba.write((XML_ABA_INICIO + self.cabecalho).encode("utf-8"))
+        self.linhas_na_aba = 0
+
+    def _fechar_aba(self):
+        if self.aba is not None:
+            self.aba.write(XML_ABA_FIM.encode("utf-8"))
+            self.aba.close()
+            self.aba = None
+
+    def escrever(self, linhas):
+        while linhas:
+            if self.linhas_na_aba == LINHAS_POR_ABA:
+                self._nova_aba()
+            parte = linhas[:LINHAS_POR_ABA - self.linhas_na_aba]
+            linhas = linhas[len(parte):]
+            self.aba.write("".join(_linha_xml(linha) for linha in parte).encode("utf-8"))
+            self.linhas_na_aba += len(parte)
+
+    def fechar(self):
+        self._fechar_aba()
+        numeros = range(1, self.abas + 1)
+        self.zip.writestr("[Content_Types].xml", XML_TIPOS.format(
+            abas="".join(XML_TIPO_ABA.format(n=n) for n in numeros)))
+        self.zip.writestr("_rels/.rels", XML_RELACOES)
+        self.zip.writestr("xl/workbook.xml", XML_PASTA.format(
+            abas="".join(XML_PASTA_ABA.format(n=n) for n in numeros)))
+        self.zip.writestr("xl/_rels/workbook.xml.rels", XML_RELACOES_PASTA.format(
+            abas="".join(XML_RELACAO_ABA.format(n=n) for n in numeros)))
+        self.zip.close()
+
+
+FORMATOS = {
+    ".csv": EscritorCSV,
+    ".jsonl": EscritorJSONL,
+    ".xlsx": EscritorXLSX,
+}
+
+
+# ========== EXPORTAÇÃO ==========
+
+def exportar(cursor, caminho, total=0, tamanho_bloco=TAMANHO_BLOCO, progresso=None):
+    """Grava todas as linhas do cursor em caminho e retorna quantas foram
+
+    total é a quantidade esperada de linhas, só para o progresso (0 se
+    desconhecida). progresso(linhas gravadas, total) é chamado a cada bloco.
+    Se algo falhar, o arquivo incompleto é apagado.
+    """
+    extensao = os.path.splitext(caminho)[1].lower()
+    if extensao not in FORMATOS:
+        raise ErroExportacao(f"Formato não suportado: {extensao or caminho} (use .csv, .jsonl ou .xlsx)")
+
+    colunas = [descricao[0] for descricao in cursor.description]
+    escritor = FORMATOS[extensao](caminho, colunas)
+    linhas = 0
+    try:
+        while True:
+            bloco = cursor.fetchmany(tamanho_bloco)
+            if not bloco:
+                break
+            escritor.escrever(bloco)
+            linhas += len(bloco)
+            if progresso:
+                progresso(linhas, max(total, linhas) if total else 0)
+        escritor.fechar()
+    except BaseException:
+        escritor.fechar()
+        os.remove(caminho)
+        raise
+    finally:
+        cursor.close()
+    return linhas
+
+
+def exportar_tabela(db, tabela, caminho, progresso=None):
+    """Exporta uma tabela inteira (clientes, processos, tarefas ou andamentos)"""
+    if tabela not in TABELAS:
+        raise ErroExportacao(f"Tabela desconhecida: {tabela}")
+    total = db.conn.execute(f"SELECT COUNT(*) FROM {tabela}").fetchone()[0]
+    return exportar(db.executar(f"exportacao.{tabela}"), caminho, total, progresso=progresso)
+
+
+def exportar_busca(db, caminho, numero="", cliente="", texto="", tipo=None, status=None, progresso=None):
+    """Exporta todos os processos que a busca avançada encontra com esses critérios"""
+    return exportar(db.busca.exportacao(numero, cliente, texto, tipo, status), caminho, progresso=progresso)
+
+
+def main(argv=None):
+    """Exporta uma tabela ou uma busca pela linha de comando"""
+    from sistema_juridico.repositorio import BancoDados
+
+    parser = argparse.ArgumentParser(
+        prog="python -m sistema_juridico.exportacao",
+        description="Exporta uma tabela ou os resultados de uma busca para .csv, .jsonl ou .xlsx"
+    )
+    parser.add_argument("origem", choices=TABELAS + ("busca",))
+    parser.add_argument("arquivo")
+    parser.add_argument("--banco", default=ARQUIVO_BANCO)
+    for campo in ("numero", "cliente", "texto"):
+        parser.add_argument(f"--{campo}", default="")
+    parser.add_argument("--tipo")
+    parser.add_argument("--status")
+    args = parser.parse_args(sys.argv[1:] if argv is None else argv)
+
+    if not os.path.exists(args.banco):
+        print(f"❌ Banco não encontrado: {args.banco}")
+        return 1
+
+    def _progresso(linhas, total):
+        texto = f"{100 * linhas // total:3d}% " if total else ""
+        print(f"\r{texto}{linhas} linhas", end="", flush=True)
+
+    inicio = time.perf_counter()
+    db = BancoDados(args.banco)
+    try:
+        if args.origem == "busca":
+            linhas = exportar_busca(db, args.arquivo, args.numero, args.cliente, args.texto,
+                                    args.tipo, args.status, progresso=_progresso)
+        else:
+            linhas = exportar_tabela(db, args.origem, args.arquivo, progresso=_progresso)
+    except ErroExportacao as e:
+        print(f"❌ {e}")
+        return 1
+    finally:
+        db.fechar()
+
+    print(f"\r✅ {linhas} linhas exportadas para {args.arquivo} em {time.perf_counter() - inicio:.1f} s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,436 @@
+"""
+Importação em massa de clientes, processos, tarefas e andamentos
+
+Os registros são lidos um a um de arquivos CSV (com cabeçalho) ou JSONL
+(um objeto JSON por linha), validados e gravados com executemany em lotes
+grandes, cada lote na sua própria transação. A memória usada depende do
+tamanho do lote, não do arquivo.
+
+Reimportar o mesmo arquivo não duplica nada: clientes são identificados
+pelo cpf_cnpj, processos pelo número, tarefas por (processo, título,
+vencimento) e andamentos por (processo, data, descrição). Registros que já
+existem são contados e ignorados.
+
+Durante cada lote os triggers que alimentam a busca textual (FTS5) são
+suspensos e as linhas novas do lote são indexadas de uma vez ao final, na
+mesma transação: se o lote falhar, triggers e índice voltam ao estado
+anterior junto com os dados.
+
+Colunas aceitas (as demais são ignoradas; * obrigatória):
+
+    clientes    nome*, cpf_cnpj*, telefone, email, endereco, observacoes, data_cadastro
+    processos   numero*, cliente*, tipo_acao*, vara*, data_distribuicao*, status,
+                valor_causa, observacoes, data_cadastro
+    tarefas     titulo*, tipo*, data_vencimento*, processo (número), descricao,
+                concluida, data_conclusao, data_cadastro, prazo_inicio, prazo_dias,
+                tribunal (J.TR; sem ele, o do número do processo)
+    andamentos  processo* (número), data_andamento*, descricao*, data_cadastro
+
+Uso pela linha de comando (importe clientes antes de processos, e
+processos antes de tarefas e andamentos):
+
+    python -m sistema_juridico.importacao <tabela> <arquivo.csv|arquivo.jsonl> [banco]
+"""
+
+import csv
+import json
+import os
+import sys
+import time
+from datetime import datetime
+
+from sistema_juridico import ARQUIVO_BANCO, datas, prazos
+from sistema_juridico.instrumentacao import INSTRUMENTACAO
+
+
+# Registros por transação
+TAMANHO_LOTE = 20000
+
+# Números de processo resolvidos por consulta (limite de parâmetros do SQLite)
+NUMEROS_POR_CONSULTA = 500
+
+# Cache maior durante a importação: os índices das tabelas ficam em memória
+AJUSTES_IMPORTACAO = {"cache_size": -256000}
+
+VERDADEIRO = {"1", "s", "sim", "true", "t", "x", "concluida", "concluída"}
+
+
+class ErroImportacao(Exception):
+    """Arquivo ou tabela que não podem ser importados"""
+
+
+# ========== LEITURA ==========
+
+def ler_registros(arquivo):
+    """Gera (número da linha, registro, erro) a partir de um arquivo aberto em modo texto
+
+    O formato vem da extensão do nome do arquivo (.csv, .jsonl ou .json).
+    erro é a descrição de uma linha ilegível (registro None nesse caso).
+    """
+    extensao = os.path.splitext(arquivo.name)[1].lower()
+
+    if extensao == ".csv":
+        leitor = csv.DictReader(arquivo)
+        for registro in leitor:
+            yield leitor.line_num, registro, None
+
+    elif extensao in (".jsonl", ".json"):
+        for numero, linha in enumerate(arquivo, 1):
+            if not linha.strip():
+                continue
+            try:
+                registro = json.loads(linha)
+            except ValueError as e:
+                yield numero, None, f"JSON inválido: {e}"
+                continue
+            if isinstance(registro, dict):
+                yield numero, registro, None
+            else:
+                yield numero, None, "A linha não é um objeto JSON"
+
+    else:
+        raise ErroImportacao(f"Formato não suportado: {extensao or arquivo.name} (use .csv ou .jsonl)")
+
+
+# ========== VALIDAÇÃO ==========
+
+def _texto(registro, campo, obrigatorio=False):
+    valor = registro.get(campo)
+    valor = "" if valor is None else str(valor).strip()
+    if obrigatorio and not valor:
+        raise ValueError(f"{campo} obrigatório")
+    return valor or None
+
+
+def _data(registro, campo, formato, obrigatorio=False):
+    valor = _texto(registro, campo, obrigatorio)
+    if valor is None:
+        return None
+    canonico = datas.normalizar(valor, formato)
+    if canonico is None:
+        raise ValueError(f"{campo} inválida: {valor!r}")
+    return canonico
+
+
+def _cadastro(registro, agora):
+    return _data(registro, "data_cadastro", datas.CARIMBO) or agora
+
+
+def _valor(registro, campo):
+    valor = _texto(registro, campo)
+    if valor is None:
+        return 0.0
+    if "," in valor:
+        # 1.234,56
+        valor = valor.replace(".", "").replace(",", ".")
+    try:
+        return float(valor)
+    except ValueError:
+        raise ValueError(f"{campo} inválido: {valor!r}")
+
+
+def validar_cliente(registro, agora):
+    return (
+        _texto(registro, "nome", True),
+        _texto(registro, "cpf_cnpj", True),
+        _texto(registro, "telefone"),
+        _texto(registro, "email"),
+        _texto(registro, "endereco"),
+        _texto(registro, "observacoes"),
+        _cadastro(registro, agora),
+    )
+
+
+def validar_processo(registro, agora):
+    cliente = _texto(registro, "cliente", True)
+    return (
+        _texto(registro, "numero", True),
+        cliente,
+        _texto(registro, "tipo_acao", True),
+        _texto(registro, "vara", True),
+        _texto(registro, "status") or "Ativo",
+        _data(registro, "data_distribuicao", datas.DATA, True),
+        _valor(registro, "valor_causa"),
+        _texto(registro, "observacoes"),
+        _cadastro(registro, agora),
+        cliente,
+    )
+
+
+def _prazo(registro, processo):
+    """(prazo_inicio, prazo_dias, tribunal) de um prazo em dias úteis, ou três None"""
+    inicio = _data(registro, "prazo_inicio", datas.DATA)
+    texto_dias = _texto(registro, "prazo_dias")
+    if inicio is None and texto_dias is None:
+        return None, None, None
+    if inicio is None or texto_dias is None:
+        raise ValueError("prazo_inicio e prazo_dias devem vir juntos")
+    if not texto_dias.isdigit() or int(texto_dias) < 1:
+        raise ValueError(f"prazo_dias inválido: {texto_dias!r}")
+    # Tarefas criadas na tela guardam o tribunal do número CNJ (TODOS sem processo)
+    tribunal = _texto(registro, "tribunal") or prazos.tribunal_do_numero(processo)
+    return inicio, int(texto_dias), tribunal
+
+
+def validar_tarefa(registro, agora):
+    # O primeiro valor (número do processo) é trocado pelo id em _resolver_processos
+    concluida = (_texto(registro, "concluida") or "").lower() in VERDADEIRO
+    titulo = _texto(registro, "titulo", True)
+    vencimento = _data(registro, "data_vencimento", datas.DATA_HORA, True)
+    processo = _texto(registro, "processo")
+    return (
+        processo,
+        titulo,
+        _texto(registro, "descricao"),
+        _texto(registro, "tipo", True),
+        vencimento,
+        int(concluida),
+        (_data(registro, "data_conclusao", datas.CARIMBO) or agora) if concluida else None,
+        _cadastro(registro, agora),
+        *_prazo(registro, processo),
+        # Chave natural para o NOT EXISTS
+        vencimento,
+        None,
+        titulo,
+    )
+
+
+def validar_andamento(registro, agora):
+    data_andamento = _data(registro, "data_andamento", datas.DATA_HORA, True)
+    descricao = _texto(registro, "descricao", True)
+    return (
+        _texto(registro, "processo", True),
+        data_andamento,
+        descricao,
+        _cadastro(registro, agora),
+        None,
+        data_andamento,
+        descricao,
+    )
+
+
+# ========== GRAVAÇÃO ==========
+
+# Tabela -> (validação, comando de inserção, colunas do índice FTS ou None,
+#            posições do id do processo nos parâmetros ou None)
+IMPORTADORES = {
+    "clientes": (validar_cliente, '''
+        INSERT INTO clientes (nome, cpf_cnpj, telefone, email, endereco, observacoes, data_cadastro)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT (cpf_cnpj) DO NOTHING
+    ''', ("nome",), None),
+    # cliente_id como em processos.inserir: o cliente com esse nome, se houver exatamente um
+    "processos": (validar_processo, '''
+        INSERT INTO processos
+        (numero, cliente, tipo_acao, vara, status, data_distribuicao, valor_causa, observacoes, data_cadastro,
+         cliente_id)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?,
+                (SELECT CASE WHEN COUNT(*) = 1 THEN MIN(id) END FROM clientes WHERE nome = ?))
+        ON CONFLICT (numero) DO NOTHING
+    ''', ("numero", "cliente", "vara", "observacoes"), None),
+    # Chave natural verificada em idx_tarefas_vencimento
+    "tarefas": (validar_tarefa, '''
+        INSERT INTO tarefas
+        (processo_id, titulo, descricao, tipo, data_vencimento, concluida, data_conclusao, data_cadastro,
+         prazo_inicio, prazo_dias, tribunal)
+        SELECT ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?
+        WHERE NOT EXISTS (
+            SELECT 1 FROM tarefas WHERE data_vencimento = ? AND processo_id IS ? AND titulo = ?
+        )
+    ''', None, (0, 12)),
+    # Chave natural verificada em idx_andamentos_processo_data
+    "andamentos": (validar_andamento, '''
+        INSERT INTO andamentos (processo_id, data_andamento, descricao, data_cadastro)
+        SELECT ?, ?, ?, ?
+        WHERE NOT EXISTS (
+            SELECT 1 FROM andamentos WHERE processo_id = ? AND data_andamento = ? AND descricao = ?
+        )
+    ''', ("descricao",), (0, 4)),
+}
+
+
+def _resolver_processos(conn, lote, posicoes):
+    """Troca o número do processo pelo id; retorna (lote resolvido, [(linha, registro, motivo)])"""
+    numeros = list({params[0] for _, _, params in lote if params[0] is not None})
+    ids = {}
+    for inicio in range(0, len(numeros), NUMEROS_POR_CONSULTA):
+        parte = numeros[inicio:inicio + NUMEROS_POR_CONSULTA]
+        ids.update(conn.execute(
+            f"SELECT numero, id FROM processos WHERE numero IN ({', '.join('?' * len(parte))})",
+            parte
+        ))
+
+    resolvido, rejeitados = [], []
+    for linha, registro, params in lote:
+        numero = params[0]
+        if numero is not None and numero not in ids:
+            rejeitados.append((linha, registro, f"processo {numero!r} não cadastrado"))
+            continue
+        params = list(params)
+        for posicao in posicoes:
+            params[posicao] = ids.get(numero)
+        resolvido.append((linha, registro, params))
+    return resolvido, rejeitados
+
+
+def _trigger_fts(conn, tabela):
+    """(nome, SQL) do trigger que indexa as inserções de tabela na busca textual"""
+    nome = f"{tabela}_fts_ai"
+    linha = conn.execute("SELECT sql FROM sqlite_master WHERE type = 'trigger' AND name = ?", (nome,)).fetchone()
+    return (nome, linha[0]) if linha else None
+
+
+def _gravar_lote(conn, tabela, comando, colunas_fts, trigger, lote):
+    """Grava um lote numa transação; retorna quantas linhas foram inseridas"""
+    # Um registro por lote na instrumentação, não um por linha (nem pelos triggers e pelo FTS5)
+    with INSTRUMENTACAO.medir_lote("sql", f"importacao.{tabela}", comando) as medida, conn:
+        if colunas_fts and trigger:
+            maior_id = conn.execute(f"SELECT COALESCE(MAX(id), 0) FROM {tabela}").fetchone()[0]
+            conn.execute(f"DROP TRIGGER {trigger[0]}")
+
+        inseridas = medida["linhas"] = conn.executemany(comando, (params for _, _, params in lote)).rowcount
+
+        if colunas_fts and trigger:
+            # Linhas novas do lote indexadas de uma vez (ids crescentes: AUTOINCREMENT)
+            lista = ", ".join(colunas_fts)
+            conn.execute(
+                f"INSERT INTO {tabela}_fts (rowid, {lista}) SELECT id, {lista} FROM {tabela} WHERE id > ?",
+                (maior_id,)
+            )
+            conn.execute(trigger[1])
+    return inseridas
+
+
+def importar(conn, tabela, arquivo, tamanho_lote=TAMANHO_LOTE, progresso=None, rejeitado=None):
+    """Importa os registros de um arquivo aberto em modo texto para tabela
+
+    progresso(resumo) é chamado após cada lote; rejeitado(linha, registro,
+    motivo) para cada registro recusado. Retorna o resumo:
+    {"lidas", "inseridas", "existentes", "rejeitadas", "segundos"}.
+    """
+    if tabela not in IMPORTADORES:
+        raise ErroImportacao(f"Tabela desconhecida: {tabela} (use {', '.join(IMPORTADORES)})")
+
+    validar, comando, colunas_fts, posicoes = IMPORTADORES[tabela]
+    trigger = _trigger_fts(conn, tabela) if colunas_fts else None
+    agora = datetime.now().strftime(datas.CARIMBO)
+    resumo = {"lidas": 0, "inseridas": 0, "existentes": 0, "rejeitadas": 0, "segundos": 0.0}
+    inicio = time.perf_counter()
+
+    def _rejeitar(linha, registro, motivo):
+        resumo["rejeitadas"] += 1
+        if rejeitado:
+            rejeitado(linha, registro, motivo)
+
+    def _gravar(lote):
+        if posicoes:
+            lote, recusados = _resolver_processos(conn, lote, posicoes)
+            for recusado in recusados:
+                _rejeitar(*recusado)
+        if lote:
+            inseridas = _gravar_lote(conn, tabela, comando, colunas_fts, trigger, lote)
+            resumo["inseridas"] += inseridas
+            resumo["existentes"] += len(lote) - inseridas
+        resumo["segundos"] = time.perf_counter() - inicio
+        if progresso:
+            progresso(dict(resumo))
+
+    lote = []
+    for linha, registro, erro in ler_registros(arquivo):
+        resumo["lidas"] += 1
+        if erro is None:
+            try:
+                lote.append((linha, registro, validar(registro, agora)))
+            except ValueError as e:
+                erro = str(e)
+        if erro is not None:
+            _rejeitar(linha, registro, erro)
+
+        if len(lote) >= tamanho_lote:
+            _gravar(lote)
+            lote = []
+
+    _gravar(lote)
+    return resumo
+
+
+def importar_arquivo(conn, tabela, caminho, relatorio=None, tamanho_lote=TAMANHO_LOTE, progresso=None):
+    """Importa o arquivo caminho; os registros recusados vão para o CSV relatorio
+
+    O relatório (linha, motivo, registro em JSON) só é criado se houver
+    recusas. progresso(bytes lidos, tamanho do arquivo, resumo) é chamado
+    após cada lote. Retorna o resumo de importar() com "relatorio" (caminho
+    ou None).
+    """
+    relatorio = relatorio or caminho + ".rejeitadas.csv"
+    saida = {"arquivo": None, "escritor": None}
+    total = os.path.getsize(caminho)
+
+    def _rejeitado(linha, registro, motivo):
+        if saida["arquivo"] is None:
+            saida["arquivo"] = open(relatorio, "w", newline="", encoding="utf-8")
+            saida["escritor"] = csv.writer(saida["arquivo"])
+            saida["escritor"].writerow(("linha", "motivo", "registro"))
+        saida["escritor"].writerow((linha, motivo, json.dumps(registro, ensure_ascii=False, default=str)))
+
+    # utf-8-sig aceita arquivos salvos pelo Excel (com BOM)
+    with open(caminho, newline="", encoding="utf-8-sig") as arquivo:
+        def _progresso(resumo):
+            if progresso:
+                progresso(arquivo.buffer.tell(), total, resumo)
+
+        try:
+            resumo = importar(conn, tabela, arquivo, tamanho_lote, _progresso, _rejeitado)
+        finally:
+            if saida["arquivo"] is not None:
+                saida["arquivo"].close()
+
+    resumo["relatorio"] = relatorio if saida["arquivo"] is not None else None
+    return resumo
+
+
+def descrever(resumo):
+    """Resumo da importação em uma linha"""
+    taxa = resumo["lidas"] / resumo["segundos"] if resumo["segundos"] else 0
+    return (
+        f"{resumo['lidas']} lidas, {resumo['inseridas']} inseridas, "
+        f"{resumo['existentes']} já existentes, {resumo['rejeitadas']} rejeitadas "
+        f"em {resumo['segundos']:.1f} s ({taxa:,.0f} registros/s)"
+    )
+
+
+def main(argv=None):
+    """Importa um arquivo pela linha de comando"""
+    from sistema_juridico.repositorio import BancoDados
+
+    argv = sys.argv[1:] if argv is None else argv
+    if len(argv) not in (2, 3) or argv[0] not in IMPORTADORES:
+        print(__doc__)
+        return 2
+
+    tabela, caminho = argv[0], argv[1]
+    banco = argv[2] if len(argv) == 3 else ARQUIVO_BANCO
+    if not os.path.exists(caminho):
+        print(f"❌ Arquivo não encontrado: {caminho}")
+        return 1
+
+    def _progresso(lidos, total, resumo):
+        print(f"\r{100 * lidos // max(total, 1):3d}%  {descrever(resumo)}", end="", flush=True)
+
+    db = BancoDados(banco, **AJUSTES_IMPORTACAO)
+    try:
+        resumo = importar_arquivo(db.conn, tabela, caminho, progresso=_progresso)
+    except ErroImportacao as e:
+        print(f"❌ {e}")
+        return 1
+    finally:
+        db.fechar()
+
+    print(f"\r✅ {descrever(resumo)}")
+    if resumo["relatorio"]:
+        print(f"⚠️ Registros rejeitados em {resumo['relatorio']}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,350 @@
+"""
+Instrumentação: tempo das consultas e das telas
+
+Desligada por padrão, sem custo além de um teste por comando. Ligada (pelo
+painel de diagnóstico ou com SISTEMA_JURIDICO_INSTRUMENTAR=1), mede:
+
+    consultas  cada comando registrado executado por BancoDados: tempo,
+               linhas e a tela (método mostrar_*/carregar_*) que o pediu,
+               inclusive quando ele roda na thread do executor
+    telas      cada mostrar_*/carregar_* da interface, da chamada até a
+               tela terminar de se desenhar com os dados das consultas em
+               segundo plano que ela disparou
+    sql        comandos fora do registro (conn.execute direto em migrações,
+               backup...), contados pelo trace callback do SQLite; cada
+               executemany (importação, recálculo de prazos) conta como um
+
+As consultas mais lentas que o limite (SISTEMA_JURIDICO_LIMITE_LENTA_MS,
+padrão 100 ms) e as telas acima de limite_tela_ms vão para um log rotativo,
+opcionalmente com o EXPLAIN QUERY PLAN da consulta. O painel de diagnóstico
+mostra p50/p95/p99 por consulta e por tela (resumo()).
+"""
+
+import contextlib
+import contextvars
+import functools
+import inspect
+import logging
+import logging.handlers
+import os
+import re
+import threading
+import time
+from collections import Counter, deque
+
+
+ARQUIVO_LOG = "consultas_lentas.log"
+TAMANHO_LOG = 1024 * 1024
+ARQUIVOS_LOG = 3  # consultas_lentas.log.1 ... .3
+
+LIMITE_CONSULTA_MS = 100
+LIMITE_TELA_MS = 500
+
+# Amostras guardadas por consulta para os percentis (as mais recentes)
+AMOSTRAS = 1000
+
+# Literais trocados por ? para agrupar os comandos vistos pelo trace callback
+LITERAIS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+ESPACOS = re.compile(r"\s+")
+
+# Tela (MedicaoTela) em andamento no contexto atual
+_tela = contextvars.ContextVar("tela", default=None)
+
+
+def _percentil(ordenadas, fracao):
+    """Percentil pelo posto mais próximo (ordenadas não vazia)"""
+    return ordenadas[min(len(ordenadas) - 1, max(0, round(fracao * len(ordenadas)) - 1))]
+
+
+def _sql_legivel(sql):
+    return ESPACOS.sub(" ", sql).strip()
+
+
+class Estatistica:
+    """Medidas de uma consulta ou tela"""
+
+    def __init__(self):
+        self.amostras = deque(maxlen=AMOSTRAS)
+        self.chamadas = 0
+        self.total_ms = 0.0
+        self.maximo_ms = 0.0
+        self.linhas = 0
+        self.origens = Counter()
+        self.sql = None
+        self.plano = None
+
+    def adicionar(self, ms, linhas, origem):
+        self.amostras.append(ms)
+        self.chamadas += 1
+        self.total_ms += ms
+        self.maximo_ms = max(self.maximo_ms, ms)
+        if linhas:
+            self.linhas += linhas
+        if origem:
+            self.origens[origem] += 1
+
+    def resumo(self):
+        ordenadas = sorted(self.amostras)
+        if not ordenadas:
+            p50 = p95 = p99 = 0.0
+        else:
+            p50, p95, p99 = (_percentil(ordenadas, f) for f in (0.50, 0.95, 0.99))
+        return {
+            "chamadas": self.chamadas,
+            "total_ms": self.total_ms,
+            "p50_ms": p50,
+            "p95_ms": p95,
+            "p99_ms": p99,
+            "maximo_ms": self.maximo_ms,
+            "linhas_media": self.linhas / self.chamadas if self.chamadas else 0,
+            "origem": self.origens.most_common(1)[0][0] if self.origens else "",
+            "sql": self.sql,
+            "plano": self.plano,
+        }
+
+
+class MedicaoTela:
+    """Um mostrar_*/carregar_* em andamento
+
+    Termina quando a chamada retornou e todas as pendências (consultas em
+    segundo plano com callback, telas aninhadas) foram concluídas.
+    """
+
+    def __init__(self, nome, pai, ao_terminar):
+        self.nome = nome
+        self.pai = pai
+        self.ao_terminar = ao_terminar
+        self.inicio = time.perf_counter()
+        self.pendentes = 1  # a própria chamada
+        if pai is not None:
+            pai.pendentes += 1
+
+    def pendencia(self):
+        self.pendentes += 1
+
+    def concluir(self):
+        self.pendentes -= 1
+        if self.pendentes == 0:
+            self.ao_terminar(self)
+
+
+class Instrumentacao:
+    """Coleta das medidas (uma instância global: INSTRUMENTACAO)
+
+    As consultas rodam na thread do Tk e nas threads dos executores; as
+    telas, só na thread do Tk.
+    """
+
+    def __init__(self):
+        self.ativa = bool(os.environ.get("SISTEMA_JURIDICO_INSTRUMENTAR"))
+        self.limite_ms = float(os.environ.get("SISTEMA_JURIDICO_LIMITE_LENTA_MS", LIMITE_CONSULTA_MS))
+        self.limite_tela_ms = LIMITE_TELA_MS
+        self.capturar_planos = False
+        self.arquivo_log = ARQUIVO_LOG
+        self.root = None
+
+        self.lock = threading.Lock()
+        self.estatisticas = {}
+        self._local = threading.local()
+        self._log = None
+
+    def ligar_tk(self, root):
+        """Janela cujo mainloop marca o fim do desenho das telas"""
+        self.root = root
+
+    def limpar(self):
+        with self.lock:
+            self.estatisticas.clear()
+
+    # ========== CONSULTAS ==========
+
+    def medir(self, db, nome, sql, params, ler=None):
+        """Executa sql em db.conn medindo tempo e linhas (chamado por BancoDados)
+
+        ler(cursor) busca as linhas (fetchall/fetchone); sem ele o cursor é
+        devolvido e as linhas não são contadas (exceto em INSERT/UPDATE/DELETE).
+        """
+        if not db.rastreada:
+            db.conn.set_trace_callback(self._rastrear)
+            db.rastreada = True
+
+        medida = self._local.medida = {"comandos": 0, "internos": 0}
+        inicio = time.perf_counter()
+        try:
+            cursor = db.conn.execute(sql, params)
+            resultado = ler(cursor) if ler else cursor
+        finally:
+            ms = (time.perf_counter() - inicio) * 1000
+            self._local.medida = None
+
+        if isinstance(resultado, list):
+            linhas = len(resultado)
+        elif ler is not None:
+            linhas = 0 if resultado is None else 1
+        else:
+            linhas = cursor.rowcount if cursor.rowcount >= 0 else None
+
+        origem = self.origem()
+        self.registrar("consulta", nome, ms, linhas, origem, sql)
+        if ms >= self.limite_ms:
+            plano = self.plano(db.conn, sql, params) if self.capturar_planos else None
+            if plano:
+                with self.lock:
+                    self.estatisticas[("consulta", nome)].plano = plano
+            self.escrever_log(
+                f"consulta {nome} {ms:.1f} ms, {'?' if linhas is None else linhas} linha(s), "
+                f"{medida['comandos']} comando(s) e {medida['internos']} interno(s), origem {origem or '-'}\n"
+                f"    {_sql_legivel(sql)}\n    parâmetros: {params!r}"
+                + "".join(f"\n    plano: {linha}" for linha in plano or ())
+            )
+        return resultado
+
+    @contextlib.contextmanager
+    def medir_lote(self, categoria, nome, sql=None):
+        """Mede um executemany (ou outro bloco de muitos comandos) como um único registro
+
+        Enquanto o bloco roda, o trace callback só conta os comandos, sem o
+        lock e a expressão regular de cada linha. O bloco informa as linhas
+        em medida["linhas"].
+        """
+        medida = {"comandos": 0, "internos": 0, "linhas": None}
+        if not self.ativa:
+            yield medida
+            return
+
+        anterior = getattr(self._local, "medida", None)
+        self._local.medida = medida
+        inicio = time.perf_counter()
+        try:
+            yield medida
+        finally:
+            ms = (time.perf_counter() - inicio) * 1000
+            self._local.medida = anterior
+
+        origem = self.origem()
+        self.registrar(categoria, nome, ms, medida["linhas"], origem, sql)
+        if ms >= self.limite_ms:
+            self.escrever_log(
+                f"lote {nome} {ms:.1f} ms, {'?' if medida['linhas'] is None else medida['linhas']} linha(s), "
+                f"{medida['comandos']} comando(s) e {medida['internos']} interno(s), origem {origem or '-'}"
+            )
+
+    def _rastrear(self, sql):
+        """Trace callback: cada comando que o SQLite começa a executar"""
+        if not self.ativa:
+            return
+        medida = getattr(self._local, "medida", None)
+        if medida is not None:
+            # Comandos de triggers e das tabelas internas do FTS5 vêm comentados ("-- ...")
+            medida["internos" if sql.startswith("--") else "comandos"] += 1
+        elif not getattr(self._local, "explicando", False):
+            self.registrar("sql", LITERAIS.sub("?", _sql_legivel(sql))[:120], 0.0, None, self.origem())
+
+    def plano(self, conn, sql, params):
+        """Linhas do EXPLAIN QUERY PLAN (vazio para comandos que não são consultas)"""
+        if not sql.lstrip().upper().startswith(("SELECT", "WITH")):
+            return []
+        self._local.explicando = True
+        try:
+            return [linha[-1] for linha in conn.execute("EXPLAIN QUERY PLAN " + sql, params)]
+        except Exception as e:
+            return [f"(plano indisponível: {e})"]
+        finally:
+            self._local.explicando = False
+
+    # ========== TELAS ==========
+
+    def medir_metodos(self, *prefixos):
+        """Decorador de classe: mede os métodos cujo nome começa por um dos prefixos"""
+        def decorar(classe):
+            for nome, funcao in list(vars(classe).items()):
+                if nome.startswith(prefixos) and inspect.isfunction(funcao):
+                    setattr(classe, nome, self._medir_tela(nome, funcao))
+            return classe
+        return decorar
+
+    def _medir_tela(self, nome, funcao):
+        @functools.wraps(funcao)
+        def medida(*args, **kwargs):
+            if not self.ativa:
+                return funcao(*args, **kwargs)
+            medicao = MedicaoTela(nome, _tela.get(), self._tela_concluida)
+            token = _tela.set(medicao)
+            try:
+                return funcao(*args, **kwargs)
+            finally:
+                _tela.reset(token)
+                medicao.concluir()
+        return medida
+
+    def _tela_concluida(self, medicao):
+        """Pendências concluídas: mede quando o Tk terminar de desenhar"""
+        def desenhada():
+            ms = (time.perf_counter() - medicao.inicio) * 1000
+            origem = medicao.pai.nome if medicao.pai is not None else ""
+            self.registrar("tela", medicao.nome, ms, None, origem)
+            if ms >= self.limite_tela_ms:
+                self.escrever_log(f"tela {medicao.nome} {ms:.1f} ms, origem {origem or '-'}")
+            if medicao.pai is not None:
+                medicao.pai.concluir()
+
+        if self.root is not None:
+            # after_idle: depois dos redesenhos que o Tk já tem pendentes
+            self.root.after_idle(desenhada)
+        else:
+            desenhada()
+
+    def tela_atual(self):
+        """Tela em medição no contexto atual (None se nenhuma ou desligada)"""
+        return _tela.get()
+
+    def na_tela(self, medicao, funcao, *args):
+        """funcao(*args) como parte da tela medicao (em outra thread ou num callback)"""
+        if medicao is None:
+            return funcao(*args)
+        token = _tela.set(medicao)
+        try:
+            return funcao(*args)
+        finally:
+            _tela.reset(token)
+
+    def origem(self):
+        medicao = _tela.get()
+        return medicao.nome if medicao is not None else ""
+
+    # ========== REGISTRO ==========
+
+    def registrar(self, categoria, nome, ms, linhas=None, origem="", sql=None):
+        with self.lock:
+            estatistica = self.estatisticas.get((categoria, nome))
+            if estatistica is None:
+                estatistica = self.estatisticas[(categoria, nome)] = Estatistica()
+                estatistica.sql = sql
+            estatistica.adicionar(ms, linhas, origem)
+
+    def resumo(self):
+        """[(categoria, nome, resumo da Estatistica)], o maior p95 primeiro"""
+        with self.lock:
+            itens = [(categoria, nome, e.resumo()) for (categoria, nome), e in self.estatisticas.items()]
+        itens.sort(key=lambda item: (item[2]["p95_ms"], item[2]["chamadas"]), reverse=True)
+        return itens
+
+    def escrever_log(self, mensagem):
+        """Acrescenta ao log rotativo de consultas lentas"""
+        if self._log is None:
+            # Criado sob o lock: duas threads com consultas lentas não anexam dois manipuladores
+            with self.lock:
+                if self._log is None:
+                    log = logging.getLogger("sistema_juridico.lentas")
+                    log.setLevel(logging.INFO)
+                    log.propagate = False
+                    manipulador = logging.handlers.RotatingFileHandler(
+                        self.arquivo_log, maxBytes=TAMANHO_LOG, backupCount=ARQUIVOS_LOG, encoding="utf-8"
+                    )
+                    manipulador.setFormatter(logging.Formatter("%(asctime)s [%(threadName)s] %(message)s"))
+                    log.addHandler(manipulador)
+                    self._log = log
+        self._log.info(mensagem)
+
+
+INSTRUMENTACAO = Instrumentacao()
@@ -0,0 +1,308 @@
+"""
+Lembretes de vencimento das tarefas
+
+AgendaLembretes guarda as tarefas pendentes com vencimento futuro num heap
+(heapq) ordenado pelo instante do próximo aviso de cada uma e mantém um
+único after() armado na janela, para o primeiro deles. A tabela não é
+consultada periodicamente: a carga roda uma vez no executor e depois a
+interface informa cada tarefa gravada, concluída ou excluída.
+
+Cada tarefa é avisada em cada antecedência configurada (ANTECEDENCIAS_PADRAO
+ou SISTEMA_JURIDICO_LEMBRETES, por exemplo "1d, 1h, 0"). Tarefas concluídas
+ou excluídas não são procuradas no heap: saem do dicionário de ativas e as
+entradas delas são descartadas ao chegar ao topo (ou quando passam da
+metade do heap, que então é reconstruído).
+
+Avisos com o mesmo instante, ou atrasados porque o computador dormiu, saem
+juntos num único alerta.
+"""
+
+import heapq
+import os
+import re
+import time
+from datetime import datetime
+from itertools import count
+
+
+# Minutos antes do vencimento: um dia, uma hora e no próprio vencimento
+ANTECEDENCIAS_PADRAO = (24 * 60, 60, 0)
+
+UNIDADES = {"d": 24 * 60, "h": 60, "min": 1, "m": 1}
+ANTECEDENCIA = re.compile(r"^(\d+)\s*(d|h|min|m)?$")
+
+
+def interpretar_antecedencias(texto):
+    """Minutos (maior primeiro) de um texto como "1d, 2h, 30min, 0"
+
+    Sem unidade, o número é em minutos. Levanta ValueError se algum item
+    não for reconhecido.
+    """
+    minutos = set()
+    for item in texto.replace(";", ",").split(","):
+        item = item.strip().lower()
+        if not item:
+            continue
+        encontrado = ANTECEDENCIA.match(item)
+        if not encontrado:
+            raise ValueError(f"Antecedência não reconhecida: {item!r} (use, por exemplo, 1d, 2h, 30min ou 0)")
+        minutos.add(int(encontrado.group(1)) * UNIDADES[encontrado.group(2) or "min"])
+    if not minutos:
+        raise ValueError("Informe pelo menos uma antecedência")
+    return tuple(sorted(minutos, reverse=True))
+
+
+def antecedencias_configuradas():
+    """Antecedências de SISTEMA_JURIDICO_LEMBRETES ou as padrão"""
+    texto = os.environ.get("SISTEMA_JURIDICO_LEMBRETES")
+    if texto:
+        try:
+            return interpretar_antecedencias(texto)
+        except ValueError as e:
+            print(f"⚠️ SISTEMA_JURIDICO_LEMBRETES ignorada: {e}")
+    return ANTECEDENCIAS_PADRAO
+
+
+def formatar_antecedencias(antecedencias):
+    """Texto aceito por interpretar_antecedencias ("1d, 1h, 0")"""
+    itens = []
+    for minutos in antecedencias:
+        if minutos and minutos % UNIDADES["d"] == 0:
+            itens.append(f"{minutos // UNIDADES['d']}d")
+        elif minutos and minutos % UNIDADES["h"] == 0:
+            itens.append(f"{minutos // UNIDADES['h']}h")
+        else:
+            itens.append(f"{minutos}min" if minutos else "0")
+    return ", ".join(itens)
+
+
+def descrever_antecedencia(minutos):
+    """"vence agora", "vence em 1 hora", "vence em 2 dias"..."""
+    if minutos == 0:
+        return "vence agora"
+    for nome, plural, tamanho in (("dia", "dias", UNIDADES["d"]), ("hora", "horas", UNIDADES["h"])):
+        if minutos % tamanho == 0:
+            quantidade = minutos // tamanho
+            return f"vence em {quantidade} {nome if quantidade == 1 else plural}"
+    return f"vence em {minutos} min"
+
+
+def instante(vencimento):
+    """Segundos desde a época do vencimento (hora local), ou None se a data for inválida"""
+    try:
+        return datetime.fromisoformat(vencimento).timestamp()
+    except (TypeError, ValueError):
+        return None
+
+
+def proximo_aviso(vencimento, antecedencias, agora):
+    """(instante, minutos) do primeiro aviso depois de agora, ou None se não resta nenhum"""
+    for minutos in antecedencias:
+        momento = vencimento - minutos * 60
+        if momento > agora:
+            return momento, minutos
+    return None
+
+
+def montar(linhas, antecedencias, agora, geracao=0):
+    """Heap e ativas a partir de [(tarefa_id, data_vencimento)] (roda fora da thread do Tk)"""
+    heap = []
+    ativas = {}
+    for tarefa_id, vencimento in linhas:
+        segundos = instante(vencimento)
+        if segundos is None:
+            continue
+        aviso = proximo_aviso(segundos, antecedencias, agora)
+        if aviso is None:
+            continue
+        ativas[tarefa_id] = (geracao, segundos, vencimento)
+        heap.append((aviso[0], tarefa_id, geracao, aviso[1]))
+    heapq.heapify(heap)
+    return heap, ativas
+
+
+class AgendaLembretes:
+    """Avisos de vencimento com um único timer
+
+    janela: objeto com after/after_cancel (a raiz do Tk); executor:
+    ExecutorConsultas usado na carga. ao_avisar(avisos) roda na thread do
+    Tk com [(tarefa_id, data_vencimento, minutos de antecedência)].
+
+    Entradas do heap: (instante do aviso, tarefa_id, geração, minutos). A
+    geração muda a cada vez que a tarefa é incluída: entradas de versões
+    anteriores (vencimento alterado, tarefa concluída) deixam de valer.
+    """
+
+    # Espera máxima de um after (ms): o Tcl aceita até ~24 dias, e rearmar a
+    # cada hora acompanha mudanças no relógio e o computador que dormiu
+    ESPERA_MAXIMA = 60 * 60 * 1000
+
+    # Entradas descartadas a partir das quais o heap é reconstruído (ou metade dele)
+    MINIMO_COMPACTACAO = 1000
+
+    def __init__(self, janela, executor, ao_avisar, antecedencias=ANTECEDENCIAS_PADRAO, ao_falhar=None):
+        self.janela = janela
+        self.executor = executor
+        self.ao_avisar = ao_avisar
+        self.ao_falhar = ao_falhar
+        self.antecedencias = tuple(sorted(set(antecedencias), reverse=True))
+
+        self.heap = []
+        self.ativas = {}  # tarefa_id -> (geração, instante do vencimento, data_vencimento)
+        self.descartadas = 0
+        self._geracoes = count(1)
+        self._timer = None
+        self._armado = None
+        self._durante_carga = None  # [(tarefa_id, data_vencimento ou None)] enquanto a carga roda
+
+    # ========== API (thread do Tk) ==========
+
+    def carregar(self):
+        """(Re)carrega as tarefas pendentes que ainda vencem, no executor"""
+        self._durante_carga = []
+        antecedencias = self.antecedencias
+        agora = datetime.now()
+
+        def buscar(db):
+            linhas = db.tarefas.vencimentos_futuros(agora.strftime("%Y-%m-%d %H:%M"))
+            return montar(linhas, antecedencias, agora.timestamp())
+
+        self.executor.executar(
+            buscar,
+            chave="lembretes",
+            ao_concluir=self._carregado,
+            ao_falhar=self.ao_falhar
+        )
+
+    def adicionar(self, tarefa_id, vencimento):
+        """Tarefa gravada (nova ou com vencimento alterado)"""
+        if self._durante_carga is not None:
+            self._durante_carga.append((tarefa_id, vencimento))
+        self._incluir(tarefa_id, vencimento, time.time())
+        self._armar()
+
+    def remover(self, tarefa_id):
+        """Tarefa concluída ou excluída"""
+        if self._durante_carga is not None:
+            self._durante_carga.append((tarefa_id, None))
+        self._retirar(tarefa_id)
+        self._armar()
+
+    def definir_antecedencias(self, antecedencias):
+        """Troca as antecedências e reagenda as tarefas já carregadas"""
+        self.antecedencias = tuple(sorted(set(antecedencias), reverse=True))
+        agora = time.time()
+        self.heap = []
+        for tarefa_id, (geracao, segundos, vencimento) in list(self.ativas.items()):
+            aviso = proximo_aviso(segundos, self.antecedencias, agora)
+            if aviso is None:
+                del self.ativas[tarefa_id]
+            else:
+                self.heap.append((aviso[0], tarefa_id, geracao, aviso[1]))
+        heapq.heapify(self.heap)
+        self.descartadas = 0
+        self._armar()
+
+    def proximo(self):
+        """(instante, tarefa_id, minutos) do próximo aviso, ou None"""
+        self._limpar_topo()
+        if not self.heap:
+            return None
+        momento, tarefa_id, _, minutos = self.heap[0]
+        return momento, tarefa_id, minutos
+
+    def parar(self):
+        """Desarma o timer (ao fechar o programa)"""
+        self.executor.cancelar("lembretes")
+        self._desarmar()
+
+    # ========== INTERNO ==========
+
+    def _carregado(self, resultado):
+        self.heap, self.ativas = resultado
+        self.descartadas = 0
+        # Gravações feitas enquanto a consulta rodava podem não estar no resultado
+        operacoes, self._durante_carga = self._durante_carga or [], None
+        agora = time.time()
+        for tarefa_id, vencimento in operacoes:
+            if vencimento is None:
+                self._retirar(tarefa_id)
+            else:
+                self._incluir(tarefa_id, vencimento, agora)
+        self._armar()
+
+    def _incluir(self, tarefa_id, vencimento, agora):
+        self._retirar(tarefa_id)
+        segundos = instante(vencimento)
+        if segundos is None:
+            return
+        aviso = proximo_aviso(segundos, self.antecedencias, agora)
+        if aviso is None:
+            return
+        geracao = next(self._geracoes)
+        self.ativas[tarefa_id] = (geracao, segundos, vencimento)
+        heapq.heappush(self.heap, (aviso[0], tarefa_id, geracao, aviso[1]))
+
+    def _retirar(self, tarefa_id):
+        if self.ativas.pop(tarefa_id, None) is None:
+            return
+        self.descartadas += 1
+        if self.descartadas > max(self.MINIMO_COMPACTACAO, len(self.heap) // 2):
+            self.heap = [entrada for entrada in self.heap if self._valida(entrada)]
+            heapq.heapify(self.heap)
+            self.descartadas = 0
+
+    def _valida(self, entrada):
+        ativa = self.ativas.get(entrada[1])
+        return ativa is not None and ativa[0] == entrada[2]
+
+    def _limpar_topo(self):
+        while self.heap and not self._valida(self.heap[0]):
+            heapq.heappop(self.heap)
+            self.descartadas = max(0, self.descartadas - 1)
+
+    def _armar(self):
+        """Arma o after para o primeiro aviso válido (mantém o atual se já é para ele)"""
+        self._limpar_topo()
+        if not self.heap:
+            self._desarmar()
+            return
+        momento = self.heap[0][0]
+        if self._timer is not None and self._armado == momento:
+            return
+        self._desarmar()
+        espera = min(max(0, int((momento - time.time()) * 1000) + 1), self.ESPERA_MAXIMA)
+        self._timer = self.janela.after(espera, self._disparar)
+        self._armado = momento
+
+    def _desarmar(self):
+        if self._timer is not None:
+            self.janela.after_cancel(self._timer)
+        self._timer = None
+        self._armado = None
+
+    def _disparar(self):
+        self._timer = None
+        self._armado = None
+        agora = time.time()
+
+        avisos = []
+        while self.heap and self.heap[0][0] <= agora:
+            entrada = heapq.heappop(self.heap)
+            if not self._valida(entrada):
+                self.descartadas = max(0, self.descartadas - 1)
+                continue
+            _, tarefa_id, geracao, minutos = entrada
+            _, segundos, vencimento = self.ativas[tarefa_id]
+            avisos.append((tarefa_id, vencimento, minutos))
+
+            # Próxima antecedência ainda por vir (as que passaram saem neste aviso)
+            aviso = proximo_aviso(segundos, self.antecedencias, agora)
+            if aviso is None:
+                del self.ativas[tarefa_id]
+            else:
+                heapq.heappush(self.heap, (aviso[0], tarefa_id, geracao, aviso[1]))
+
+        self._armar()
+        if avisos:
+            self.ao_avisar(avisos)
@@ -0,0 +1,266 @@
+"""
+Linha do tempo virtual para tk.Canvas
+
+Desenha no Canvas apenas os andamentos que estão na área visível (um
+retângulo e dois textos por item, recriados a cada rolagem), em vez de um
+Frame com Labels por andamento. A altura de cada item só é medida quando
+ele aparece; até lá vale uma estimativa pelo tamanho do texto. Os itens mais
+antigos são buscados em páginas por keyset, pelo ExecutorConsultas, quando
+a rolagem se aproxima do fim do que já foi carregado.
+"""
+
+from bisect import bisect_right
+from itertools import accumulate, count
+
+
+_contador = count()
+
+
+class LinhaTempo:
+    """Lista de andamentos desenhada num Canvas, do mais recente ao mais antigo
+
+    buscar_pagina(db, direcao, chave, limite) roda na thread do executor e
+    retorna linhas (id, coluna de ordenação, data de exibição, descrição);
+    direcao é "inicio" ou "apos" da chave (coluna de ordenação, id).
+    """
+
+    # Espaçamentos (px)
+    MARGEM = 10
+    RECUO = 15
+    ESPACO = 10
+
+    # Pixels por unidade de rolagem (setas e roda do mouse)
+    PASSO_ROLAGEM = 40
+
+    # Busca a próxima página quando restam menos itens carregados que isto abaixo da área visível
+    ANTECEDENCIA = 20
+
+    def __init__(self, canvas, scrollbar, executor, buscar_pagina, cor_texto="#1e293b",
+                 cor_data="#2563eb", cor_fundo="#f0f9ff", tamanho_pagina=100):
+        self.canvas = canvas
+        self.scrollbar = scrollbar
+        self.executor = executor
+        self.buscar_pagina = buscar_pagina
+        self.cor_texto = cor_texto
+        self.cor_data = cor_data
+        self.cor_fundo = cor_fundo
+        self.tamanho_pagina = tamanho_pagina
+
+        # Importado aqui para que o pacote continue utilizável sem Tk
+        from tkinter import font as tkfont
+        self.fonte_data = tkfont.Font(family="Arial", size=9, weight="bold")
+        self.fonte_texto = tkfont.Font(family="Arial", size=10)
+        self.largura_caractere = self.fonte_texto.measure("0")
+        self.altura_linha = self.fonte_texto.metrics("linespace")
+        self.altura_data = self.fonte_data.metrics("linespace")
+
+        self.itens = []      # (id, chave de ordenação, data, descrição), na ordem de exibição
+        self.alturas = {}    # id -> altura medida na largura atual
+        self._inicios = None  # posição (px) do topo de cada item; None quando precisa recalcular
+        self.posicao = 0     # px do conteúdo no topo da área visível
+        self.largura = 0
+        self.tem_mais = False
+        self.carregando = False
+        self.erro = None
+
+        self.chave_executor = f"linha-tempo-{next(_contador)}"
+
+        self.scrollbar.configure(command=self.yview)
+        self.canvas.bind("<Configure>", self._ao_redimensionar)
+        self.canvas.bind("<Enter>", self._ativar_roda)
+        self.canvas.bind("<Leave>", self._desativar_roda)
+
+    # ========== DADOS ==========
+
+    def recarregar(self):
+        """Descarta tudo e busca a página mais recente"""
+        self.itens = []
+        self.alturas.clear()
+        self._inicios = None
+        self.posicao = 0
+        self.tem_mais = False
+        self.erro = None
+        self._buscar("inicio", None)
+        self.desenhar()
+
+    def inserir_no_topo(self, linha):
+        """Acrescenta um andamento recém-gravado no início, sem recarregar
+
+        Se o usuário estiver vendo o topo, o novo item aparece; se tiver
+        rolado para baixo, a área visível continua no mesmo lugar.
+        """
+        self.itens.insert(0, linha)
+        self._inicios = None
+        if self.posicao > 0:
+            self.posicao += self._altura(0) + self.ESPACO
+        self.desenhar()
+
+    def _buscar(self, direcao, chave):
+        self.carregando = True
+        self.executor.executar(
+            self.buscar_pagina, direcao, chave, self.tamanho_pagina,
+            chave=self.chave_executor,
+            ao_concluir=self._receber,
+            ao_falhar=self._falhou
+        )
+
+    def _viva(self):
+        """Falso se o Canvas já foi destruído (a janela foi fechada)"""
+        return bool(self.canvas.winfo_exists())
+
+    def _receber(self, linhas):
+        self.carregando = False
+        if not self._viva():
+            return
+        # Uma página que chegue depois de um inserir_no_topo pode repetir o item novo
+        vistos = {item[0] for item in self.itens[:self.tamanho_pagina]}
+        self.itens.extend(linha for linha in linhas if linha[0] not in vistos)
+        self.tem_mais = len(linhas) == self.tamanho_pagina
+        self._inicios = None
+        self.desenhar()
+
+    def _falhou(self, erro):
+        self.carregando = False
+        self.erro = erro
+        if self._viva():
+            self.desenhar()
+
+    # ========== MEDIDAS ==========
+
+    def _largura_texto(self):
+        return max(self.largura - 2 * (self.MARGEM + self.RECUO), 50)
+
+    def _altura(self, indice):
+        """Altura medida do item, ou estimada se ele ainda não apareceu"""
+        item = self.itens[indice]
+        altura = self.alturas.get(item[0])
+        if altura is not None:
+            return altura
+        caracteres_por_linha = max(self._largura_texto() // self.largura_caractere, 1)
+        linhas = sum(
+            max(-(-len(paragrafo) // caracteres_por_linha), 1)
+            for paragrafo in item[3].split("\n")
+        )
+        return self._altura_item(linhas * self.altura_linha)
+
+    def _altura_item(self, altura_texto):
+        return self.RECUO + self.altura_data + 5 + altura_texto + self.RECUO
+
+    def _calcular_inicios(self):
+        if self._inicios is None:
+            passos = (self._altura(i) + self.ESPACO for i in range(len(self.itens)))
+            self._inicios = [0, *accumulate(passos)]
+        return self._inicios
+
+    def altura_total(self):
+        return self._calcular_inicios()[-1]
+
+    # ========== ROLAGEM ==========
+
+    def yview(self, *args):
+        """Comando da barra de rolagem (moveto / scroll)"""
+        altura_visivel = self.canvas.winfo_height()
+        if args[0] == "moveto":
+            self.posicao = float(args[1]) * self.altura_total()
+        elif args[0] == "scroll":
+            unidades = int(args[1])
+            passo = altura_visivel if args[2] == "pages" else self.PASSO_ROLAGEM
+            self.posicao += unidades * passo
+        self.desenhar()
+
+    def _ao_rolar_roda(self, evento):
+        if evento.num == 4:
+            unidades = -1
+        elif evento.num == 5:
+            unidades = 1
+        else:
+            unidades = -1 if evento.delta > 0 else 1
+        self.yview("scroll", unidades * 3, "units")
+
+    def _ativar_roda(self, evento):
+        for sequencia in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+            self.canvas.bind_all(sequencia, self._ao_rolar_roda)
+
+    def _desativar_roda(self, evento):
+        for sequencia in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+            self.canvas.unbind_all(sequencia)
+
+    def _ao_redimensionar(self, evento):
+        if evento.width != self.largura:
+            # Outra largura, outra quebra de linhas: as medidas antigas não valem
+            self.largura = evento.width
+            self.alturas.clear()
+            self._inicios = None
+        self.desenhar()
+
+    # ========== DESENHO ==========
+
+    def desenhar(self):
+        """Redesenha só os itens que cruzam a área visível"""
+        if not self._viva():
+            return
+        self.canvas.delete("all")
+        altura_visivel = self.canvas.winfo_height()
+
+        if not self.itens:
+            if self.erro is not None:
+                texto = f"❌ Erro ao carregar andamentos: {self.erro}"
+            elif self.carregando:
+                texto = "⏳ Carregando andamentos..."
+            else:
+                texto = "📭 Nenhum andamento registrado"
+            self.canvas.create_text(self.largura // 2, 40, text=texto, fill="#6b7280",
+                                    font=("Arial", 11))
+            self.scrollbar.set(0, 1)
+            return
+
+        inicios = self._calcular_inicios()
+        self.posicao = max(0, min(self.posicao, inicios[-1] - altura_visivel))
+
+        indice = max(bisect_right(inicios, self.posicao) - 1, 0)
+        y = inicios[indice] - self.posicao
+        mudou = False
+
+        while indice < len(self.itens) and y < altura_visivel:
+            altura = self._desenhar_item(self.itens[indice], y)
+            if self.alturas.get(self.itens[indice][0]) != altura:
+                self.alturas[self.itens[indice][0]] = altura
+                mudou = True
+            y += altura + self.ESPACO
+            indice += 1
+
+        if mudou:
+            # As medidas reais substituem as estimativas a partir do topo visível,
+            # então o item no topo não sai do lugar
+            self._inicios = None
+
+        total = self.altura_total()
+        if total:
+            self.scrollbar.set(self.posicao / total, min((self.posicao + altura_visivel) / total, 1.0))
+
+        if self.tem_mais and not self.carregando and indice >= len(self.itens) - self.ANTECEDENCIA:
+            ultimo = self.itens[-1]
+            self._buscar("apos", (ultimo[1], ultimo[0]))
+
+    def _desenhar_item(self, item, y):
+        """Desenha um cartão e retorna a altura dele"""
+        _, _, data, descricao = item
+        esquerda = self.MARGEM
+        direita = self.largura - self.MARGEM
+
+        fundo = self.canvas.create_rectangle(esquerda, y, direita, y, fill=self.cor_fundo, outline="#cbd5e1")
+        self.canvas.create_text(
+            esquerda + self.RECUO, y + self.RECUO, anchor="nw",
+            text=f"📅 {data}", font=self.fonte_data, fill=self.cor_data
+        )
+        texto = self.canvas.create_text(
+            esquerda + self.RECUO, y + self.RECUO + self.altura_data + 5, anchor="nw",
+            text=descricao, font=self.fonte_texto, fill=self.cor_texto,
+            width=self._largura_texto()
+        )
+
+        caixa = self.canvas.bbox(texto)
+        altura_texto = caixa[3] - caixa[1] if caixa else self.altura_linha
+        altura = self._altura_item(altura_texto)
+        self.canvas.coords(fundo, esquerda, y, direita, y + altura)
+        return altura
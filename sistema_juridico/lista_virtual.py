@@ -0,0 +1,345 @@
+"""
+Lista virtual para ttk.Treeview
+
+Carrega as linhas em páginas por keyset (chave da última linha carregada)
+conforme o usuário rola, e descarta as páginas que ficam longe da área
+visível, mantendo a memória limitada a max_paginas * tamanho_pagina linhas.
+As páginas são buscadas pelo ExecutorConsultas, fora da thread do Tk.
+
+Depois de uma gravação a lista não é recarregada: atualizar(id) busca só a
+linha gravada e a insere, move ou altera no lugar certo dentro da janela
+carregada, e remover(id) tira o item. O custo depende do tamanho da janela,
+não da tabela, e a seleção e a linha no topo da área visível são mantidas.
+"""
+
+from collections import deque
+from itertools import count
+
+
+ITEM_CARREGANDO = "__carregando__"
+
+_contador = count()
+
+
+class ListaVirtual:
+    """Alimenta um Treeview com páginas sob demanda
+
+    buscar_pagina(db, direcao, chave, limite) roda na thread do executor e
+    deve retornar as linhas na ordem de exibição; direcao é "inicio", "apos"
+    ou "antes" da chave informada. Cada linha começa com
+    (id, coluna de ordenação, ...); o id vira o iid do item no Treeview.
+
+    buscar_linha(db, id) retorna uma única linha no mesmo formato (None se
+    ela não existe mais ou saiu do filtro) e alimenta atualizar(); a ordem
+    (descendente ou não) deve ser a mesma das páginas.
+    """
+
+    # Fração da área carregada a partir da qual a próxima página é buscada
+    MARGEM = 0.15
+
+    def __init__(self, tree, scrollbar, executor, buscar_pagina, formatar=None,
+                 tamanho_pagina=200, max_paginas=5, buscar_linha=None, descendente=False):
+        self.tree = tree
+        self.scrollbar = scrollbar
+        self.executor = executor
+        self.buscar_pagina = buscar_pagina
+        self.buscar_linha = buscar_linha
+        self.descendente = descendente
+        self.formatar = formatar or (lambda linha: (linha[2:], ()))
+        self.tamanho_pagina = tamanho_pagina
+        self.max_paginas = max_paginas
+
+        # Cada página: (iids, chave da primeira linha, chave da última linha).
+        # As chaves vêm das linhas do banco, mesmo que formatar descarte alguma.
+        self.paginas = deque()
+        self.chaves = {}  # iid -> chave de ordenação (apenas das linhas carregadas)
+        self.tem_antes = False
+        self.tem_depois = False
+        self.carregando = False
+        self._agendado = None
+
+        # Uma nova busca desta lista substitui a anterior no executor
+        self.chave_executor = f"lista-{next(_contador)}"
+
+        self.tree.configure(yscrollcommand=self._ao_rolar)
+
+    @staticmethod
+    def chave_de(linha):
+        """Chave de ordenação da linha: (coluna de ordenação, id)"""
+        return (linha[1], linha[0])
+
+    def recarregar(self, buscar_pagina=None, buscar_linha=None):
+        """Descarta tudo e carrega a primeira página (opcionalmente com outra busca)"""
+        if buscar_pagina is not None:
+            self.buscar_pagina = buscar_pagina
+        if buscar_linha is not None:
+            self.buscar_linha = buscar_linha
+
+        self.tree.delete(*self.tree.get_children())
+        self.paginas.clear()
+        self.chaves.clear()
+        self.tem_antes = False
+        self.tem_depois = False
+
+        # Estado de carregamento enquanto a primeira página não chega
+        colunas = self.tree["columns"]
+        self.tree.insert("", "end", iid=ITEM_CARREGANDO,
+                         values=("⏳ Carregando...",) + ("",) * (len(colunas) - 1))
+
+        self._buscar("inicio", None, self._receber_inicio)
+
+    def _buscar(self, direcao, chave, ao_receber):
+        self.carregando = True
+        self.executor.executar(
+            self.buscar_pagina, direcao, chave, self.tamanho_pagina,
+            chave=self.chave_executor,
+            ao_concluir=ao_receber,
+            ao_falhar=self._falhou
+        )
+
+    def _viva(self):
+        """Falso se o Treeview já foi destruído (a tela foi trocada)"""
+        return bool(self.tree.winfo_exists())
+
+    def _falhou(self, erro):
+        self.carregando = False
+        if self._viva() and self.tree.exists(ITEM_CARREGANDO):
+            self.tree.item(ITEM_CARREGANDO, values=(f"❌ Erro ao carregar: {erro}",))
+
+    def _receber_inicio(self, linhas):
+        self.carregando = False
+        if not self._viva():
+            return
+        if self.tree.exists(ITEM_CARREGANDO):
+            self.tree.delete(ITEM_CARREGANDO)
+
+        self.tem_depois = len(linhas) == self.tamanho_pagina
+        if linhas:
+            self.paginas.append(self._pagina(linhas, "end"))
+        self.tree.yview_moveto(0)
+
+    def _pagina(self, linhas, posicao):
+        """Insere as linhas e monta a página com as chaves das extremidades"""
+        return (self._inserir(linhas, posicao), self.chave_de(linhas[0]), self.chave_de(linhas[-1]))
+
+    def _inserir(self, linhas, posicao):
+        """Insere as linhas no Treeview e retorna a lista de iids"""
+        iids = []
+        indice = 0
+        for linha in linhas:
+            formatada = self.formatar(linha)
+            if formatada is None:
+                continue
+            valores, tags = formatada
+
+            iid = str(linha[0])
+            if self.tree.exists(iid):
+                # Já inserido por atualizar() enquanto a página era buscada
+                self._tirar(iid)
+            if posicao == "end":
+                self.tree.insert("", "end", iid=iid, values=valores, tags=tags)
+            else:
+                self.tree.insert("", indice, iid=iid, values=valores, tags=tags)
+                indice += 1
+
+            self.chaves[iid] = self.chave_de(linha)
+            iids.append(iid)
+        return iids
+
+    def _ao_rolar(self, primeiro, ultimo):
+        """yscrollcommand do Treeview: atualiza a barra e busca páginas vizinhas"""
+        self.scrollbar.set(primeiro, ultimo)
+
+        precisa = (
+            (float(ultimo) >= 1 - self.MARGEM and self.tem_depois) or
+            (float(primeiro) <= self.MARGEM and self.tem_antes)
+        )
+        if precisa and not self.carregando and self._agendado is None:
+            # Carrega fora do callback de rolagem para não reentrar no Treeview
+            self._agendado = self.tree.after_idle(self._carregar_vizinhas)
+
+    def _carregar_vizinhas(self):
+        self._agendado = None
+        if self.carregando:
+            return
+
+        primeiro, ultimo = self.tree.yview()
+        if ultimo >= 1 - self.MARGEM and self.tem_depois:
+            self._buscar("apos", self.paginas[-1][2], self._receber_depois)
+        elif primeiro <= self.MARGEM and self.tem_antes:
+            self._buscar("antes", self.paginas[0][1], self._receber_antes)
+
+    def _receber_depois(self, linhas):
+        self.carregando = False
+        self.tem_depois = len(linhas) == self.tamanho_pagina
+        if not linhas or not self._viva():
+            return
+
+        self.paginas.append(self._pagina(linhas, "end"))
+
+        if len(self.paginas) > self.max_paginas:
+            # Descarta a página do topo mantendo a mesma linha visível
+            total = len(self.tree.get_children())
+            topo = self.tree.yview()[0] * total
+            removidas = self._descartar(self.paginas.popleft())
+            self.tem_antes = True
+            restante = total - removidas
+            if restante:
+                self.tree.yview_moveto(max(topo - removidas, 0) / restante)
+
+    def _receber_antes(self, linhas):
+        self.carregando = False
+        self.tem_antes = len(linhas) == self.tamanho_pagina
+        if not linhas or not self._viva():
+            return
+
+        total = len(self.tree.get_children())
+        topo = self.tree.yview()[0] * total
+        pagina = self._pagina(linhas, 0)
+        self.paginas.appendleft(pagina)
+
+        if len(self.paginas) > self.max_paginas:
+            self._descartar(self.paginas.pop())
+            self.tem_depois = True
+
+        # Mantém a mesma linha no topo após inserir acima dela
+        novo_total = len(self.tree.get_children())
+        if novo_total:
+            self.tree.yview_moveto((topo + len(pagina[0])) / novo_total)
+
+    # ========== ATUALIZAÇÃO APÓS GRAVAÇÕES ==========
+
+    def atualizar(self, item_id):
+        """Busca a linha gravada e a aplica à lista (inserção, alteração ou saída do filtro)"""
+        if self.buscar_linha is None:
+            self.recarregar()
+            return
+        self.executor.executar(
+            self.buscar_linha, item_id,
+            ao_concluir=lambda linha: self.aplicar(item_id, linha),
+            ao_falhar=self._falhou
+        )
+
+    def remover(self, item_id):
+        """Tira da lista o item excluído"""
+        self.aplicar(item_id, None)
+
+    def aplicar(self, item_id, linha):
+        """Coloca a linha (ou a ausência dela) na posição certa da janela carregada
+
+        Fora da janela (antes da primeira ou depois da última linha carregada,
+        havendo mais linhas para aquele lado) o item só é removido: ele aparece
+        quando a rolagem chegar lá.
+        """
+        if not self._viva():
+            return
+        iid = str(item_id)
+        formatada = self.formatar(linha) if linha is not None else None
+
+        if formatada is None or not self._na_janela(self.chave_de(linha)):
+            if self.tree.exists(iid) and iid != ITEM_CARREGANDO:
+                self._com_topo_mantido(lambda: self._tirar(iid))
+            return
+
+        valores, tags = formatada
+        chave = self.chave_de(linha)
+
+        if self.tree.exists(iid) and self.chaves.get(iid) == chave:
+            # Mesma posição: só os valores mudam
+            self.tree.item(iid, values=valores, tags=tags)
+            return
+
+        def _posicionar():
+            if self.tree.exists(iid):
+                # move() preserva a seleção do item
+                self._tirar_das_paginas(iid)
+                indice, pagina, posicao = self._posicao(chave)
+                self.tree.move(iid, "", indice)
+                self.tree.item(iid, values=valores, tags=tags)
+            else:
+                indice, pagina, posicao = self._posicao(chave)
+                self.tree.insert("", indice, iid=iid, values=valores, tags=tags)
+            self._incluir_na_pagina(iid, chave, pagina, posicao)
+
+        self._com_topo_mantido(_posicionar)
+
+    def _ordem(self, chave):
+        """Chave comparável em Python na ordem de exibição (NULL primeiro, como no SQLite)"""
+        return tuple((valor is not None, valor) for valor in chave)
+
+    def _antes(self, a, b):
+        """a vem antes de b na ordem de exibição"""
+        return self._ordem(a) > self._ordem(b) if self.descendente else self._ordem(a) < self._ordem(b)
+
+    def _na_janela(self, chave):
+        if not self.paginas:
+            # Lista vazia e completa: qualquer linha cabe
+            return not (self.tem_antes or self.tem_depois or self.carregando)
+        if self.tem_antes and self._antes(chave, self.paginas[0][1]):
+            return False
+        if self.tem_depois and self._antes(self.paginas[-1][2], chave):
+            return False
+        return True
+
+    def _posicao(self, chave):
+        """(índice no Treeview, índice da página, posição na página) de uma nova chave"""
+        if not self.paginas:
+            self.paginas.append(([], chave, chave))
+            return 0, 0, 0
+
+        # Linhas da janela que vêm antes da nova (no máximo max_paginas * tamanho_pagina)
+        indice = sum(
+            1 for iids, _, _ in self.paginas for iid in iids
+            if not self._antes(chave, self.chaves[iid])
+        )
+
+        # A linha entra no fim da página da linha anterior (ou no início da primeira)
+        restante = indice
+        for numero, (iids, _, _) in enumerate(self.paginas):
+            if restante <= len(iids):
+                return indice, numero, restante
+            restante -= len(iids)
+        return indice, len(self.paginas) - 1, len(self.paginas[-1][0])
+
+    def _incluir_na_pagina(self, iid, chave, numero, posicao):
+        iids, primeira, ultima = self.paginas[numero]
+        iids.insert(posicao, iid)
+        if self._antes(chave, primeira):
+            primeira = chave
+        if self._antes(ultima, chave):
+            ultima = chave
+        self.paginas[numero] = (iids, primeira, ultima)
+        self.chaves[iid] = chave
+
+    def _tirar_das_paginas(self, iid):
+        for iids, _, _ in self.paginas:
+            if iid in iids:
+                iids.remove(iid)
+                break
+        self.chaves.pop(iid, None)
+
+    def _tirar(self, iid):
+        self._tirar_das_paginas(iid)
+        self.tree.delete(iid)
+
+    def _com_topo_mantido(self, alteracao):
+        """Executa a alteração mantendo a mesma linha no topo da área visível"""
+        filhos = self.tree.get_children()
+        topo = int(round(self.tree.yview()[0] * len(filhos))) if filhos else 0
+        item_topo = filhos[topo] if topo < len(filhos) else None
+
+        alteracao()
+
+        filhos = self.tree.get_children()
+        if item_topo is not None and self.tree.exists(item_topo) and filhos:
+            self.tree.yview_moveto(self.tree.index(item_topo) / len(filhos))
+
+    def _descartar(self, pagina):
+        """Remove uma página do Treeview e retorna quantas linhas saíram"""
+        iids = pagina[0]
+        if iids:
+            self.tree.delete(*iids)
+        for iid in iids:
+            self.chaves.pop(iid, None)
+        return len(iids)
+
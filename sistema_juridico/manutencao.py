@@ -0,0 +1,203 @@
+"""
+Migrações de dados em lotes
+
+Reescrever todas as linhas de uma tabela grande numa única transação
+trava as gravações do programa inteiro. As tarefas deste módulo percorrem
+a tabela por id em lotes pequenos, cada um na sua própria transação, e
+gravam o último id processado em progresso_manutencao: se o programa for
+fechado no meio, a tarefa continua de onde parou na próxima execução.
+
+As tarefas rodam em segundo plano (executor de manutenção) logo após a
+abertura do programa.
+"""
+
+from sistema_juridico import datas, prazos
+
+
+# Linhas por lote (cada lote é uma transação curta)
+TAMANHO_LOTE = 500
+
+
+# ========== TAREFAS ==========
+
+def vincular_clientes(conn, ultimo_id, tamanho_lote):
+    """Preenche processos.cliente_id a partir do nome do cliente
+
+    Só vincula quando exatamente um cliente tem o nome; os demais casos
+    aparecem em relatorio_vinculos().
+    """
+    faixa = conn.execute(
+        "SELECT MIN(id), MAX(id) FROM (SELECT id FROM processos WHERE id > ? ORDER BY id LIMIT ?)",
+        (ultimo_id, tamanho_lote)
+    ).fetchone()
+    if faixa[0] is None:
+        return None
+
+    conn.execute('''
+        UPDATE processos
+        SET cliente_id = (
+            SELECT CASE WHEN COUNT(*) = 1 THEN MIN(c.id) END
+            FROM clientes c WHERE c.nome = processos.cliente
+        )
+        WHERE id BETWEEN ? AND ? AND cliente_id IS NULL
+    ''', faixa)
+    return faixa[1]
+
+
+def normalizar_datas(tabela):
+    """Tarefa que reescreve as colunas de data da tabela no formato canônico
+
+    Valores que não são datas reconhecíveis ficam como estão e aparecem
+    em relatorio_datas().
+    """
+    colunas = datas.COLUNAS[tabela]
+
+    def lote(conn, ultimo_id, tamanho_lote):
+        linhas = conn.execute(
+            f"SELECT id, {', '.join(colunas)} FROM {tabela} WHERE id > ? ORDER BY id LIMIT ?",
+            (ultimo_id, tamanho_lote)
+        ).fetchall()
+        if not linhas:
+            return None
+
+        for posicao, (coluna, formato) in enumerate(colunas.items(), 1):
+            alteracoes = []
+            for linha in linhas:
+                valor = linha[posicao]
+                if valor is None:
+                    continue
+                canonico = datas.normalizar(valor, formato)
+                if canonico is not None and canonico != valor:
+                    alteracoes.append((canonico, linha[0]))
+            if alteracoes:
+                conn.executemany(f"UPDATE {tabela} SET {coluna} = ? WHERE id = ?", alteracoes)
+
+        return linhas[-1][0]
+
+    return lote
+
+
+def recalcular_prazos(conn, ultimo_id, tamanho_lote):
+    """Recalcula o vencimento das tarefas abertas com prazo em dias úteis
+
+    Corrige os vencimentos gravados antes de o início fora de dia útil
+    passar para o próximo dia útil (prazos.Calendario.prazo).
+    """
+    faixa = conn.execute(
+        "SELECT MAX(id) FROM (SELECT id FROM tarefas WHERE id > ? ORDER BY id LIMIT ?)",
+        (ultimo_id, tamanho_lote)
+    ).fetchone()[0]
+    if faixa is None:
+        return None
+
+    linhas = conn.execute('''
+        SELECT id, prazo_inicio, prazo_dias, tribunal, data_vencimento FROM tarefas
+        WHERE id BETWEEN ? AND ? AND concluida = 0 AND prazo_dias IS NOT NULL
+    ''', (ultimo_id + 1, faixa)).fetchall()
+
+    def calendario(tribunal, primeiro, ultimo):
+        feriados = conn.execute("SELECT data, tribunal FROM feriados WHERE tribunal IN ('', ?)", (tribunal,))
+        return prazos.montar(tribunal, primeiro, ultimo, feriados.fetchall())
+
+    alteracoes = prazos.novos_vencimentos(linhas, calendario)
+    if alteracoes:
+        conn.executemany("UPDATE tarefas SET data_vencimento = ? WHERE id = ?", alteracoes)
+    return faixa
+
+
+# Tarefa -> (tabela percorrida, função(conn, último id, tamanho do lote) -> novo último id ou None)
+TAREFAS = {
+    "vincular_clientes": ("processos", vincular_clientes),
+    **{f"datas_{tabela}": (tabela, normalizar_datas(tabela)) for tabela in datas.COLUNAS},
+    # Depois de datas_tarefas: prazo_inicio e data_vencimento já no formato canônico
+    "prazos_dias_uteis": ("tarefas", recalcular_prazos),
+}
+
+
+# ========== EXECUÇÃO ==========
+
+def estado(conn, tarefa):
+    """Retorna (último id processado, concluída) da tarefa"""
+    linha = conn.execute(
+        "SELECT ultimo_id, concluida FROM progresso_manutencao WHERE tarefa = ?", (tarefa,)
+    ).fetchone()
+    return (linha[0], bool(linha[1])) if linha else (0, False)
+
+
+def executar_tarefa(conn, tarefa, tamanho_lote=TAMANHO_LOTE, progresso=None):
+    """Executa a tarefa em lotes até o fim, retomando do último lote gravado
+
+    progresso(último id, maior id da tabela, tarefa) é chamado após cada lote.
+    Retorna o número de lotes executados.
+    """
+    tabela, funcao = TAREFAS[tarefa]
+    ultimo_id, concluida = estado(conn, tarefa)
+    if concluida:
+        return 0
+
+    maior_id = conn.execute(f"SELECT MAX(id) FROM {tabela}").fetchone()[0] or 0
+    lotes = 0
+
+    while True:
+        with conn:
+            novo = funcao(conn, ultimo_id, tamanho_lote)
+            conn.execute('''
+                INSERT INTO progresso_manutencao (tarefa, ultimo_id, concluida) VALUES (?, ?, ?)
+                ON CONFLICT (tarefa) DO UPDATE SET ultimo_id = excluded.ultimo_id, concluida = excluded.concluida
+            ''', (tarefa, ultimo_id if novo is None else novo, int(novo is None)))
+
+        if novo is None:
+            return lotes
+
+        lotes += 1
+        ultimo_id = novo
+        if progresso:
+            progresso(ultimo_id, maior_id, tarefa)
+
+
+def executar_pendentes(conn, tamanho_lote=TAMANHO_LOTE, progresso=None):
+    """Executa todas as tarefas ainda não concluídas; retorna {tarefa: lotes}"""
+    return {
+        tarefa: executar_tarefa(conn, tarefa, tamanho_lote, progresso)
+        for tarefa in TAREFAS
+        if not estado(conn, tarefa)[1]
+    }
+
+
+# ========== RELATÓRIOS ==========
+
+def relatorio_vinculos(conn, limite=None):
+    """Processos sem cliente vinculado: [(id, número, nome do cliente, clientes com esse nome)]
+
+    0 clientes: nome sem cadastro; 2 ou mais: nome ambíguo.
+    """
+    sql = '''
+        SELECT p.id, p.numero, p.cliente,
+               (SELECT COUNT(*) FROM clientes c WHERE c.nome = p.cliente)
+        FROM processos p
+        WHERE p.cliente_id IS NULL
+        ORDER BY p.id
+    '''
+    if limite is not None:
+        return conn.execute(sql + " LIMIT ?", (limite,)).fetchall()
+    return conn.execute(sql).fetchall()
+
+
+def relatorio_datas(conn, limite=100):
+    """Datas fora do formato canônico: [(tabela, coluna, id, valor)]
+
+    Lista o que a migração em lotes não conseguiu interpretar (ou ainda
+    não alcançou), até limite linhas por coluna.
+    """
+    problemas = []
+    for tabela, colunas in datas.COLUNAS.items():
+        for coluna, formato in colunas.items():
+            problemas += [
+                (tabela, coluna, linha_id, valor)
+                for linha_id, valor in conn.execute(
+                    f"SELECT id, {coluna} FROM {tabela} WHERE NOT ({datas.sql_valida(coluna, formato)}) "
+                    f"ORDER BY id LIMIT ?",
+                    (limite,)
+                )
+            ]
+    return problemas
@@ -0,0 +1,409 @@
+"""
+Migrações versionadas do esquema do banco de dados
+
+A versão do esquema fica gravada em PRAGMA user_version. Cada migração
+roda dentro de uma transação e só é aplicada uma vez.
+"""
+
+import sqlite3
+import sys
+
+from sistema_juridico import datas, estatisticas
+
+
+def somar_estatistica(chave, delta):
+    """Comando de corpo de trigger que soma delta ao contador chave (expressões SQL)"""
+    return (
+        f"INSERT INTO estatisticas (chave, valor) VALUES ({chave}, {delta}) "
+        f"ON CONFLICT (chave) DO UPDATE SET valor = valor + excluded.valor;"
+    )
+
+
+def gatilhos_datas(colunas=datas.COLUNAS):
+    """Triggers que recusam datas fora do formato canônico ({tabela: {coluna: formato}})
+
+    Um trigger por coluna no UPDATE, para que a migração em lotes possa
+    corrigir uma coluna mesmo que outra da mesma linha ainda seja antiga.
+    """
+    comandos = []
+    for tabela, formatos in colunas.items():
+        for coluna, formato in formatos.items():
+            erro = f"Data inválida em {tabela}.{coluna} (formato {datas.DESCRICAO[formato]})"
+            for evento, sufixo in (("INSERT", "bi"), (f"UPDATE OF {coluna}", "bu")):
+                comandos.append(f'''
+                    CREATE TRIGGER IF NOT EXISTS {tabela}_{coluna}_{sufixo} BEFORE {evento} ON {tabela}
+                    WHEN NOT ({datas.sql_valida("new." + coluna, formato)}) BEGIN
+                        SELECT RAISE(ABORT, '{erro}');
+                    END
+                ''')
+    return comandos
+
+
+PENDENTE_NEW = "(CASE WHEN new.concluida = 0 THEN 1 ELSE 0 END)"
+PENDENTE_OLD = "(CASE WHEN old.concluida = 0 THEN 1 ELSE 0 END)"
+
+
+# Cada migração: (versão, descrição, lista de passos).
+# Um passo é um comando SQL ou uma função que recebe a conexão.
+MIGRACOES = [
+    (1, "Tabelas iniciais", [
+        '''
+        CREATE TABLE IF NOT EXISTS processos (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            numero TEXT NOT NULL UNIQUE,
+            cliente TEXT NOT NULL,
+            tipo_acao TEXT NOT NULL,
+            vara TEXT NOT NULL,
+            status TEXT NOT NULL,
+            data_distribuicao TEXT NOT NULL,
+            valor_causa REAL,
+            observacoes TEXT,
+            data_cadastro TEXT NOT NULL
+        )
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS andamentos (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            processo_id INTEGER NOT NULL,
+            data_andamento TEXT NOT NULL,
+            descricao TEXT NOT NULL,
+            data_cadastro TEXT NOT NULL,
+            FOREIGN KEY (processo_id) REFERENCES processos (id)
+        )
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS tarefas (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            processo_id INTEGER,
+            titulo TEXT NOT NULL,
+            descricao TEXT,
+            tipo TEXT NOT NULL,
+            data_vencimento TEXT NOT NULL,
+            concluida INTEGER DEFAULT 0,
+            data_conclusao TEXT,
+            data_cadastro TEXT NOT NULL,
+            FOREIGN KEY (processo_id) REFERENCES processos (id)
+        )
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS clientes (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            nome TEXT NOT NULL,
+            cpf_cnpj TEXT UNIQUE,
+            telefone TEXT,
+            email TEXT,
+            endereco TEXT,
+            observacoes TEXT,
+            data_cadastro TEXT NOT NULL
+        )
+        ''',
+    ]),
+    (2, "Índices das consultas principais", [
+        # Lista de processos (mais recentes primeiro) e contagem por status
+        "CREATE INDEX IF NOT EXISTS idx_processos_data_cadastro ON processos (data_cadastro)",
+        "CREATE INDEX IF NOT EXISTS idx_processos_status ON processos (status)",
+        # Contagem de processos por cliente
+        "CREATE INDEX IF NOT EXISTS idx_processos_cliente ON processos (cliente)",
+        # Lista de clientes ordenada por nome
+        "CREATE INDEX IF NOT EXISTS idx_clientes_nome ON clientes (nome)",
+        # Tarefas filtradas por situação e ordenadas pelo vencimento
+        "CREATE INDEX IF NOT EXISTS idx_tarefas_concluida_vencimento ON tarefas (concluida, data_vencimento)",
+        "CREATE INDEX IF NOT EXISTS idx_tarefas_vencimento ON tarefas (data_vencimento)",
+        "CREATE INDEX IF NOT EXISTS idx_tarefas_processo ON tarefas (processo_id)",
+        # Andamentos de um processo e exclusão em cascata
+        "CREATE INDEX IF NOT EXISTS idx_andamentos_processo_cadastro ON andamentos (processo_id, data_cadastro)",
+    ]),
+    (3, "Busca textual (FTS5) em processos e andamentos", [
+        # Índices de conteúdo externo: o texto fica só nas tabelas originais
+        '''
+        CREATE VIRTUAL TABLE IF NOT EXISTS processos_fts USING fts5(
+            numero, cliente, vara, observacoes,
+            content='processos', content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+        )
+        ''',
+        '''
+        CREATE VIRTUAL TABLE IF NOT EXISTS andamentos_fts USING fts5(
+            descricao,
+            content='andamentos', content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+        )
+        ''',
+        # Relevância padrão (ORDER BY rank): número pesa mais que cliente, vara e observações
+        "INSERT INTO processos_fts(processos_fts, rank) VALUES('rank', 'bm25(10.0, 5.0, 2.0, 1.0)')",
+        # Sincronização por triggers
+        '''
+        CREATE TRIGGER IF NOT EXISTS processos_fts_ai AFTER INSERT ON processos BEGIN
+            INSERT INTO processos_fts(rowid, numero, cliente, vara, observacoes)
+            VALUES (new.id, new.numero, new.cliente, new.vara, new.observacoes);
+        END
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS processos_fts_ad AFTER DELETE ON processos BEGIN
+            INSERT INTO processos_fts(processos_fts, rowid, numero, cliente, vara, observacoes)
+            VALUES ('delete', old.id, old.numero, old.cliente, old.vara, old.observacoes);
+        END
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS processos_fts_au AFTER UPDATE OF numero, cliente, vara, observacoes ON processos BEGIN
+            INSERT INTO processos_fts(processos_fts, rowid, numero, cliente, vara, observacoes)
+            VALUES ('delete', old.id, old.numero, old.cliente, old.vara, old.observacoes);
+            INSERT INTO processos_fts(rowid, numero, cliente, vara, observacoes)
+            VALUES (new.id, new.numero, new.cliente, new.vara, new.observacoes);
+        END
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS andamentos_fts_ai AFTER INSERT ON andamentos BEGIN
+            INSERT INTO andamentos_fts(rowid, descricao) VALUES (new.id, new.descricao);
+        END
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS andamentos_fts_ad AFTER DELETE ON andamentos BEGIN
+            INSERT INTO andamentos_fts(andamentos_fts, rowid, descricao) VALUES ('delete', old.id, old.descricao);
+        END
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS andamentos_fts_au AFTER UPDATE OF descricao ON andamentos BEGIN
+            INSERT INTO andamentos_fts(andamentos_fts, rowid, descricao) VALUES ('delete', old.id, old.descricao);
+            INSERT INTO andamentos_fts(rowid, descricao) VALUES (new.id, new.descricao);
+        END
+        ''',
+        # Indexa as linhas que já existiam
+        "INSERT INTO processos_fts(processos_fts) VALUES('rebuild')",
+        "INSERT INTO andamentos_fts(andamentos_fts) VALUES('rebuild')",
+    ]),
+    (4, "Contadores do dashboard mantidos por triggers", [
+        '''
+        CREATE TABLE IF NOT EXISTS estatisticas (
+            chave TEXT PRIMARY KEY,
+            valor INTEGER NOT NULL DEFAULT 0
+        ) WITHOUT ROWID
+        ''',
+        f'''
+        CREATE TRIGGER IF NOT EXISTS processos_estat_ai AFTER INSERT ON processos BEGIN
+            {somar_estatistica("'processos.total'", 1)}
+            {somar_estatistica("'processos.status.' || new.status", 1)}
+        END
+        ''',
+        f'''
+        CREATE TRIGGER IF NOT EXISTS processos_estat_ad AFTER DELETE ON processos BEGIN
+            {somar_estatistica("'processos.total'", -1)}
+            {somar_estatistica("'processos.status.' || old.status", -1)}
+        END
+        ''',
+        f'''
+        CREATE TRIGGER IF NOT EXISTS processos_estat_au AFTER UPDATE OF status ON processos
+        WHEN old.status IS NOT new.status BEGIN
+            {somar_estatistica("'processos.status.' || old.status", -1)}
+            {somar_estatistica("'processos.status.' || new.status", 1)}
+        END
+        ''',
+        f'''
+        CREATE TRIGGER IF NOT EXISTS clientes_estat_ai AFTER INSERT ON clientes BEGIN
+            {somar_estatistica("'clientes.total'", 1)}
+        END
+        ''',
+        f'''
+        CREATE TRIGGER IF NOT EXISTS clientes_estat_ad AFTER DELETE ON clientes BEGIN
+            {somar_estatistica("'clientes.total'", -1)}
+        END
+        ''',
+        f'''
+        CREATE TRIGGER IF NOT EXISTS tarefas_estat_ai AFTER INSERT ON tarefas BEGIN
+            {somar_estatistica("'tarefas.total'", 1)}
+            {somar_estatistica("'tarefas.pendentes'", PENDENTE_NEW)}
+        END
+        ''',
+        f'''
+        CREATE TRIGGER IF NOT EXISTS tarefas_estat_ad AFTER DELETE ON tarefas BEGIN
+            {somar_estatistica("'tarefas.total'", -1)}
+            {somar_estatistica("'tarefas.pendentes'", "-" + PENDENTE_OLD)}
+        END
+        ''',
+        f'''
+        CREATE TRIGGER IF NOT EXISTS tarefas_estat_au AFTER UPDATE OF concluida ON tarefas BEGIN
+            {somar_estatistica("'tarefas.pendentes'", PENDENTE_NEW + " - " + PENDENTE_OLD)}
+        END
+        ''',
+        # Valores iniciais a partir dos dados existentes
+        estatisticas.recalcular,
+    ]),
+    (5, "Processos vinculados ao cliente por id", [
+        "ALTER TABLE processos ADD COLUMN cliente_id INTEGER REFERENCES clientes (id)",
+        # Contagem de processos por cliente e exclusão de clientes
+        "CREATE INDEX IF NOT EXISTS idx_processos_cliente_id ON processos (cliente_id)",
+        # Progresso das migrações de dados em lotes (manutencao.py); o
+        # preenchimento de cliente_id nas linhas existentes roda por lá
+        '''
+        CREATE TABLE IF NOT EXISTS progresso_manutencao (
+            tarefa TEXT PRIMARY KEY,
+            ultimo_id INTEGER NOT NULL DEFAULT 0,
+            concluida INTEGER NOT NULL DEFAULT 0
+        ) WITHOUT ROWID
+        ''',
+        # Processos cadastrados antes do cliente passam a apontar para ele
+        '''
+        CREATE TRIGGER IF NOT EXISTS clientes_vincular_ai AFTER INSERT ON clientes
+        WHEN (SELECT COUNT(*) FROM clientes WHERE nome = new.nome) = 1 BEGIN
+            UPDATE processos SET cliente_id = new.id
+            WHERE cliente = new.nome AND cliente_id IS NULL;
+        END
+        ''',
+    ]),
+    (6, "Datas no formato ISO-8601", [
+        # Andamentos em ordem cronológica pela data do andamento (faixa no índice)
+        "DROP INDEX IF EXISTS idx_andamentos_processo_cadastro",
+        "CREATE INDEX IF NOT EXISTS idx_andamentos_processo_data ON andamentos (processo_id, data_andamento)",
+        # Gravações novas já chegam no formato canônico; as linhas antigas são
+        # convertidas em lotes (manutencao.py, tarefas datas_<tabela>)
+        *gatilhos_datas(),
+    ]),
+    (7, "Autocompletar de clientes (FTS5)", [
+        # Prefixo de qualquer palavra do nome, sem acentos nem maiúsculas
+        '''
+        CREATE VIRTUAL TABLE IF NOT EXISTS clientes_fts USING fts5(
+            nome,
+            content='clientes', content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+        )
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS clientes_fts_ai AFTER INSERT ON clientes BEGIN
+            INSERT INTO clientes_fts(rowid, nome) VALUES (new.id, new.nome);
+        END
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS clientes_fts_ad AFTER DELETE ON clientes BEGIN
+            INSERT INTO clientes_fts(clientes_fts, rowid, nome) VALUES ('delete', old.id, old.nome);
+        END
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS clientes_fts_au AFTER UPDATE OF nome ON clientes BEGIN
+            INSERT INTO clientes_fts(clientes_fts, rowid, nome) VALUES ('delete', old.id, old.nome);
+            INSERT INTO clientes_fts(rowid, nome) VALUES (new.id, new.nome);
+        END
+        ''',
+        "INSERT INTO clientes_fts(clientes_fts) VALUES('rebuild')",
+    ]),
+    (8, "Prazos em dias úteis", [
+        # Feriados e suspensões de um tribunal (J.TR do número CNJ) ou de todos ('')
+        '''
+        CREATE TABLE IF NOT EXISTS feriados (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            data TEXT NOT NULL,
+            tribunal TEXT NOT NULL DEFAULT '',
+            descricao TEXT NOT NULL DEFAULT '',
+            UNIQUE (tribunal, data)
+        )
+        ''',
+        "CREATE INDEX IF NOT EXISTS idx_feriados_data ON feriados (data)",
+        # Origem do vencimento calculado: dias úteis a partir de prazo_inicio no
+        # calendário do tribunal; NULL nas tarefas com data digitada
+        "ALTER TABLE tarefas ADD COLUMN prazo_inicio TEXT",
+        "ALTER TABLE tarefas ADD COLUMN prazo_dias INTEGER",
+        "ALTER TABLE tarefas ADD COLUMN tribunal TEXT",
+        # Só as tarefas com prazo, já com tudo o que o recálculo lê
+        '''
+        CREATE INDEX IF NOT EXISTS idx_tarefas_prazos
+        ON tarefas (concluida, tribunal, prazo_inicio, prazo_dias, data_vencimento)
+        WHERE prazo_dias IS NOT NULL
+        ''',
+        *gatilhos_datas({"feriados": {"data": datas.DATA}, "tarefas": {"prazo_inicio": datas.DATA}}),
+    ]),
+]
+
+VERSAO_ATUAL = MIGRACOES[-1][0]
+
+
+class ErroMigracao(Exception):
+    """Erro ao atualizar o esquema do banco"""
+
+
+def versao_banco(conn):
+    """Retorna a versão do esquema gravada no banco"""
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def aplicar_migracoes(conn):
+    """Aplica as migrações pendentes e retorna a lista de versões aplicadas"""
+    versao = versao_banco(conn)
+
+    if versao > VERSAO_ATUAL:
+        raise ErroMigracao(
+            f"O banco está na versão {versao}, mais nova que a suportada ({VERSAO_ATUAL})."
+        )
+
+    aplicadas = []
+    for numero, descricao, passos in MIGRACOES:
+        if numero <= versao:
+            continue
+
+        try:
+            conn.execute("BEGIN")
+            for passo in passos:
+                if callable(passo):
+                    passo(conn)
+                else:
+                    conn.execute(passo)
+            # user_version faz parte do cabeçalho e é gravado na mesma transação
+            conn.execute(f"PRAGMA user_version = {numero}")
+            conn.commit()
+        except sqlite3.Error as e:
+            conn.rollback()
+            raise ErroMigracao(f"Falha na migração {numero} ({descricao}): {e}") from e
+
+        aplicadas.append(numero)
+
+    return aplicadas
+
+
+# ========== VERIFICAÇÃO DOS PLANOS DE CONSULTA ==========
+
+def plano_consulta(conn, sql, params=()):
+    """Retorna as linhas de EXPLAIN QUERY PLAN de uma consulta"""
+    return [linha[3] for linha in conn.execute("EXPLAIN QUERY PLAN " + sql, params)]
+
+
+def linha_problematica(linha):
+    """Indica se uma linha do plano é uma varredura sem índice ou uma ordenação temporária"""
+    if linha.startswith("SCAN") and "INDEX" not in linha:
+        return True
+    return "USE TEMP B-TREE" in linha
+
+
+def verificar_planos(conn, consultas):
+    """Retorna [(nome, linha do plano)] para cada consulta que varre a tabela
+
+    consultas: {nome: (sql, parâmetros)}
+    """
+    problemas = []
+
+    for nome, (sql, params) in consultas.items():
+        for linha in plano_consulta(conn, sql, params):
+            if linha_problematica(linha):
+                problemas.append((nome, linha))
+
+    return problemas
+
+
+def main():
+    """Cria um banco em memória, aplica as migrações e verifica os planos"""
+    from sistema_juridico.repositorio import consultas_para_verificacao
+
+    conn = sqlite3.connect(":memory:")
+    aplicar_migracoes(conn)
+
+    consultas = consultas_para_verificacao()
+    problemas = verificar_planos(conn, consultas)
+    for nome, linha in problemas:
+        print(f"❌ {nome}: {linha}")
+
+    if problemas:
+        return 1
+
+    print(f"✅ {len(consultas)} consultas usam índices (esquema v{VERSAO_ATUAL})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
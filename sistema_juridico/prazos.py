@@ -0,0 +1,287 @@
+"""
+Prazos processuais em dias úteis
+
+Um Calendario cobre um intervalo de datas de um tribunal e é montado uma
+única vez: um mapa de bits dos dias úteis (1 bit por dia), a quantidade
+acumulada de dias úteis até cada dia e a posição de cada dia útil. Com
+isso, "N dias úteis depois de uma data" e "dias úteis entre duas datas"
+são dois acessos a arrays, sem percorrer o calendário.
+
+Não são dias úteis (CPC, arts. 216, 219 e 220):
+
+    sábados e domingos
+    feriados nacionais (FERIADOS_FIXOS e os móveis, contados da Páscoa)
+    o recesso de 20 de dezembro a 20 de janeiro, inclusive
+    feriados e suspensões cadastrados na tabela feriados, do tribunal ou
+    de todos os tribunais
+
+A contagem exclui o dia do começo (a intimação ou publicação) e inclui o do
+vencimento (art. 224): o prazo vence no N-ésimo dia útil depois dele. Se o
+dia do começo não é útil, ele passa para o primeiro dia útil seguinte, que
+também fica excluído (art. 224, § 1º; Lei 11.419/2006, art. 4º, §§ 3º e 4º).
+
+O tribunal é o trecho J.TR do número CNJ (8.26 = TJSP, 5.02 = TRT da 2ª
+Região, 4.03 = TRF da 3ª Região); tarefas sem processo usam só o
+calendário comum a todos.
+
+    python -m sistema_juridico.prazos <início DD/MM/AAAA> <dias úteis> [tribunal] [--banco arquivo.db]
+"""
+
+import argparse
+import re
+import sys
+from array import array
+from datetime import date, timedelta
+
+from sistema_juridico import datas
+
+
+# Tribunal das tarefas sem processo e dos feriados que valem para todos
+TODOS = ""
+
+# (mês, dia, descrição, feriado desde o ano)
+FERIADOS_FIXOS = (
+    (1, 1, "Confraternização Universal", 1),
+    (4, 21, "Tiradentes", 1),
+    (5, 1, "Dia do Trabalho", 1),
+    (9, 7, "Independência do Brasil", 1),
+    (10, 12, "Nossa Senhora Aparecida", 1),
+    (11, 2, "Finados", 1),
+    (11, 15, "Proclamação da República", 1),
+    (11, 20, "Dia Nacional de Zumbi e da Consciência Negra", 2024),  # Lei 14.759/2023
+    (12, 25, "Natal", 1),
+)
+
+# Dias contados a partir do domingo de Páscoa
+FERIADOS_MOVEIS = (
+    (-48, "Carnaval"),
+    (-47, "Carnaval"),
+    (-2, "Sexta-feira Santa"),
+    (60, "Corpus Christi"),
+)
+
+# Recesso forense (art. 220): de 20/12 a 20/01, inclusive
+INICIO_RECESSO = (12, 20)
+FIM_RECESSO = (1, 20)
+
+# Hora gravada no vencimento calculado, quando a tarefa não tem outra
+HORA_VENCIMENTO = "23:59"
+
+# Anos cobertos além dos pedidos, para que um calendário sirva várias consultas
+ANOS_MARGEM = 2
+
+NUMERO_CNJ = re.compile(r"^\d{7}-\d{2}\.\d{4}\.(\d)\.(\d{2})\.\d{4}$")
+
+
+class ForaDoCalendario(ValueError):
+    """Data fora do intervalo coberto pelo calendário"""
+
+
+def pascoa(ano):
+    """Domingo de Páscoa (algoritmo de Meeus/Jones/Butcher, calendário gregoriano)"""
+    a = ano % 19
+    b, c = divmod(ano, 100)
+    d, e = divmod(b, 4)
+    f = (b + 8) // 25
+    g = (b - f + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = divmod(c, 4)
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * l) // 451
+    mes, dia = divmod(h + l - 7 * m + 114, 31)
+    return date(ano, mes, dia + 1)
+
+
+def feriados_nacionais(ano):
+    """{data: descrição} dos feriados nacionais do ano"""
+    feriados = {
+        date(ano, mes, dia): descricao
+        for mes, dia, descricao, desde in FERIADOS_FIXOS
+        if ano >= desde
+    }
+    domingo = pascoa(ano)
+    for deslocamento, descricao in FERIADOS_MOVEIS:
+        feriados[domingo + timedelta(days=deslocamento)] = descricao
+    return feriados
+
+
+def tribunal_do_numero(numero):
+    """Trecho J.TR do número CNJ ("8.26"), ou TODOS se o número não segue o padrão"""
+    encontrado = NUMERO_CNJ.match((numero or "").strip())
+    if not encontrado:
+        return TODOS
+    return f"{encontrado.group(1)}.{encontrado.group(2)}"
+
+
+def data_inicio(texto):
+    """date do texto (DD/MM/AAAA, AAAA-MM-DD...), ou None se não for uma data"""
+    valor = datas.interpretar(texto)
+    return valor.date() if valor is not None else None
+
+
+class Calendario:
+    """Dias úteis de primeiro a ultimo (inclusive) para um tribunal
+
+    nao_uteis: datas além dos fins de semana, feriados nacionais e recesso.
+    """
+
+    def __init__(self, primeiro, ultimo, nao_uteis=()):
+        if ultimo < primeiro:
+            raise ValueError("Intervalo do calendário vazio")
+        self.primeiro = primeiro
+        self.ultimo = ultimo
+        self.base = primeiro.toordinal()
+        self.total = ultimo.toordinal() - self.base + 1
+
+        fechados = {dia.toordinal() for dia in nao_uteis}
+        for ano in range(primeiro.year, ultimo.year + 1):
+            fechados.update(dia.toordinal() for dia in feriados_nacionais(ano))
+            inicio = date(ano, *INICIO_RECESSO).toordinal()
+            fechados.update(range(date(ano, 1, 1).toordinal(), date(ano, *FIM_RECESSO).toordinal() + 1))
+            fechados.update(range(inicio, date(ano, 12, 31).toordinal() + 1))
+
+        # mapa: bit i ligado quando o dia primeiro + i é útil
+        # acumulado[i]: dias úteis antes do dia i; uteis[k]: índice do k-ésimo dia útil
+        self.mapa = bytearray((self.total + 7) // 8)
+        self.acumulado = array("I", bytes(4 * (self.total + 1)))
+        self.uteis = array("I")
+        contagem = 0
+        for i in range(self.total):
+            ordinal = self.base + i
+            # date.fromordinal(1) é uma segunda-feira: (ordinal - 1) % 7 é o weekday()
+            if (ordinal - 1) % 7 < 5 and ordinal not in fechados:
+                self.mapa[i >> 3] |= 1 << (i & 7)
+                self.uteis.append(i)
+                contagem += 1
+            self.acumulado[i + 1] = contagem
+
+    def cobre(self, primeiro, ultimo):
+        return self.primeiro <= primeiro and ultimo <= self.ultimo
+
+    def _indice(self, dia):
+        i = dia.toordinal() - self.base
+        if not 0 <= i < self.total:
+            raise ForaDoCalendario(f"{dia:%d/%m/%Y} fora do calendário ({self.primeiro:%Y}–{self.ultimo:%Y})")
+        return i
+
+    def util(self, dia):
+        i = self._indice(dia)
+        return bool(self.mapa[i >> 3] >> (i & 7) & 1)
+
+    def prazo(self, inicio, dias):
+        """Vencimento de um prazo de dias úteis contado a partir de inicio (excluído)
+
+        Um início que não é dia útil passa para o próximo dia útil.
+        """
+        if dias < 1:
+            raise ValueError("O prazo deve ter pelo menos 1 dia útil")
+        i = self._indice(inicio)
+        # Dias úteis até o início, inclusive (com o próximo dia útil, se o início não
+        # é útil); o prazo termina no dias-ésimo seguinte
+        k = self.acumulado[i + 1] + dias - 1
+        if not self.mapa[i >> 3] >> (i & 7) & 1:
+            k += 1
+        if k >= len(self.uteis):
+            raise ForaDoCalendario(f"Prazo de {dias} dias úteis ultrapassa o calendário ({self.ultimo:%Y})")
+        return date.fromordinal(self.base + self.uteis[k])
+
+    def dias_uteis(self, de, ate):
+        """Dias úteis depois de de até ate, inclusive"""
+        return self.acumulado[self._indice(ate) + 1] - self.acumulado[self._indice(de) + 1]
+
+
+def intervalo(inicio, dias):
+    """(primeiro, último) dia que um prazo de dias úteis a partir de inicio pode alcançar
+
+    Folga para os fins de semana, o recesso e os feriados do caminho.
+    """
+    return inicio, inicio + timedelta(days=dias * 2 + 45)
+
+
+def montar(tribunal, primeiro, ultimo, feriados):
+    """Calendario dos anos de primeiro a ultimo, com ANOS_MARGEM de folga
+
+    feriados: [(data AAAA-MM-DD, tribunal)] da tabela feriados; valem os do
+    tribunal e os de TODOS.
+    """
+    nao_uteis = [
+        date.fromisoformat(dia)
+        for dia, do_tribunal in feriados
+        if do_tribunal in (TODOS, tribunal)
+    ]
+    return Calendario(
+        date(max(1, primeiro.year - ANOS_MARGEM), 1, 1),
+        date(min(9999, ultimo.year + ANOS_MARGEM), 12, 31),
+        nao_uteis
+    )
+
+
+def novos_vencimentos(linhas, calendario):
+    """[(novo vencimento, id)] das tarefas cujo vencimento calculado mudou
+
+    linhas: [(id, prazo_inicio, prazo_dias, tribunal, data_vencimento)];
+    calendario(tribunal, primeiro, ultimo) devolve o Calendario de cada
+    tribunal, chamado uma vez por tribunal para o intervalo de todas as
+    linhas. A hora de cada vencimento é mantida.
+    """
+    if not linhas:
+        return []
+    inicios = [date.fromisoformat(linha[1]) for linha in linhas]
+    primeiro = min(inicios)
+    ultimo = intervalo(max(inicios), max(linha[2] for linha in linhas))[1]
+    calendarios = {
+        tribunal: calendario(tribunal, primeiro, ultimo)
+        for tribunal in {linha[3] or TODOS for linha in linhas}
+    }
+
+    alteracoes = []
+    for (tarefa_id, _, dias, tribunal, atual), inicio in zip(linhas, inicios):
+        hora = atual[11:] if len(atual) == 16 else HORA_VENCIMENTO
+        novo = vencimento(calendarios[tribunal or TODOS], inicio, dias, hora)
+        if novo != atual:
+            alteracoes.append((novo, tarefa_id))
+    return alteracoes
+
+
+def vencimento(calendario, inicio, dias, hora=HORA_VENCIMENTO):
+    """Vencimento no formato datas.DATA_HORA"""
+    # isoformat() é o formato datas.DATA, sem o custo do strftime
+    return f"{calendario.prazo(inicio, dias).isoformat()} {hora}"
+
+
+def main(argv=None):
+    """Calcula um prazo pela linha de comando"""
+    parser = argparse.ArgumentParser(prog="python -m sistema_juridico.prazos", description=__doc__.split("\n\n")[0])
+    parser.add_argument("inicio", help="data da intimação ou publicação (dia do começo, excluído)")
+    parser.add_argument("dias", type=int, help="dias úteis do prazo")
+    parser.add_argument("tribunal", nargs="?", default=TODOS, help="J.TR do número CNJ (ex.: 8.26)")
+    parser.add_argument("--banco", help="usa também os feriados cadastrados neste banco")
+    args = parser.parse_args(sys.argv[1:] if argv is None else argv)
+
+    inicio = data_inicio(args.inicio)
+    if inicio is None:
+        print(f"❌ Data inválida: {args.inicio}", file=sys.stderr)
+        return 2
+
+    try:
+        if args.banco:
+            from sistema_juridico.repositorio import BancoDados
+
+            db = BancoDados(args.banco)
+            try:
+                fim = db.prazos.vencimento(inicio, args.dias, args.tribunal)
+            finally:
+                db.fechar()
+        else:
+            calendario = montar(args.tribunal, *intervalo(inicio, args.dias), ())
+            fim = calendario.prazo(inicio, args.dias)
+    except ValueError as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return 1
+
+    print(f"{fim:%d/%m/%Y} ({args.dias} dias úteis a partir de {inicio:%d/%m/%Y})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
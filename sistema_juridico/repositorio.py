@@ -0,0 +1,842 @@
+"""
+Camada de acesso a dados
+
+BancoDados é dono da conexão SQLite, aplica o perfil de desempenho e
+executa apenas comandos registrados em CONSULTAS, pelo nome. Os
+repositórios de processos, clientes, tarefas e andamentos expõem essas
+consultas como funções, sem dependência do Tkinter.
+"""
+
+import sqlite3
+from contextlib import contextmanager
+
+from sistema_juridico import ARQUIVO_BANCO
+from sistema_juridico import busca, datas, estatisticas, manutencao, prazos
+from sistema_juridico.instrumentacao import INSTRUMENTACAO
+from sistema_juridico.migracoes import aplicar_migracoes
+
+
+# ========== PERFIS DE CONEXÃO ==========
+
+PERFIS = {
+    # WAL permite leitura concorrente com escrita; NORMAL só sincroniza nos checkpoints
+    "desempenho": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "mmap_size": 256 * 1024 * 1024,
+        "cache_size": -64000,  # valores negativos são em KiB (~64 MB)
+        "temp_store": "MEMORY",
+        "foreign_keys": "ON",
+        "busy_timeout": 5000,
+    },
+    # Configuração original do SQLite, para mídias removíveis ou compartilhamentos de rede
+    "seguro": {
+        "journal_mode": "DELETE",
+        "synchronous": "FULL",
+        "mmap_size": 0,
+        "cache_size": -2000,
+        "temp_store": "DEFAULT",
+        "foreign_keys": "ON",
+        "busy_timeout": 5000,
+    },
+}
+
+PERFIL_PADRAO = "desempenho"
+
+
+def aplicar_perfil(conn, perfil=PERFIL_PADRAO, **ajustes):
+    """Aplica os PRAGMAs de um perfil (nome ou dicionário), com ajustes opcionais"""
+    pragmas = dict(PERFIS[perfil] if isinstance(perfil, str) else perfil)
+    pragmas.update(ajustes)
+
+    for nome, valor in pragmas.items():
+        conn.execute(f"PRAGMA {nome} = {valor}")
+
+    return pragmas
+
+
+# ========== REGISTRO DE CONSULTAS ==========
+
+def consultas_keyset(prefixo, select, chave, filtro=None, descendente=False, agrupar=False):
+    """Gera as consultas de paginação por keyset de uma listagem
+
+    Cria três comandos: <prefixo>.inicio (primeira página), <prefixo>.apos
+    e <prefixo>.antes (página depois/antes de uma chave), e <prefixo>.linha,
+    que devolve uma única linha pelo id (ou nada, se ela não passa no filtro)
+    para atualizar a lista após uma gravação. A chave é a coluna de ordenação
+    seguida do id, e o SELECT deve começar por (id, coluna).
+    Com agrupar, as linhas são agrupadas pela própria chave (para agregações
+    num JOIN), o que mantém a ordem do índice.
+    Parâmetros: [parâmetros do filtro] + [chave] + [limite]
+    (em <prefixo>.linha: [parâmetros do filtro] + [id]).
+    """
+    colunas = ", ".join(chave)
+    marcadores = ", ".join("?" for _ in chave)
+    onde = f"({filtro}) AND " if filtro else ""
+    grupo = f"GROUP BY {colunas}" if agrupar else ""
+    direto, inverso = ("DESC", "ASC") if descendente else ("ASC", "DESC")
+    maior, menor = ("<", ">") if descendente else (">", "<")
+
+    def ordem(sentido):
+        return ", ".join(f"{coluna} {sentido}" for coluna in chave)
+
+    return {
+        f"{prefixo}.inicio": f"""
+            {select}
+            {"WHERE " + filtro if filtro else ""}
+            {grupo}
+            ORDER BY {ordem(direto)}
+            LIMIT ?
+        """,
+        f"{prefixo}.apos": f"""
+            {select}
+            WHERE {onde}({colunas}) {maior} ({marcadores})
+            {grupo}
+            ORDER BY {ordem(direto)}
+            LIMIT ?
+        """,
+        # Lida em ordem inversa; o repositório devolve as linhas na ordem de exibição
+        f"{prefixo}.antes": f"""
+            {select}
+            WHERE {onde}({colunas}) {menor} ({marcadores})
+            {grupo}
+            ORDER BY {ordem(inverso)}
+            LIMIT ?
+        """,
+        f"{prefixo}.linha": f"""
+            {select}
+            WHERE {onde}{chave[-1]} = ?
+            {grupo}
+        """,
+    }
+
+
+SELECT_PROCESSOS = f'''
+    SELECT id, data_cadastro, numero, cliente, tipo_acao, status,
+           {datas.sql_exibir("data_distribuicao", datas.DATA)}
+    FROM processos
+'''
+
+# Contagem por JOIN no índice de processos.cliente_id, agrupada na ordem de idx_clientes_nome
+SELECT_CLIENTES = '''
+    SELECT c.id, c.nome, c.nome, c.cpf_cnpj, c.telefone, c.email,
+           COUNT(p.id) as num_processos
+    FROM clientes c
+    LEFT JOIN processos p ON p.cliente_id = c.id
+'''
+
+# Situação e data de exibição calculadas no banco; o ? é o "agora" da carga
+SELECT_TAREFAS = f'''
+    SELECT t.id, t.data_vencimento,
+           CASE
+               WHEN t.concluida THEN '✓'
+               WHEN t.data_vencimento < ? THEN '⚠️'
+               ELSE '⏳'
+           END,
+           t.titulo, t.tipo,
+           {datas.sql_exibir("t.data_vencimento", datas.DATA_HORA)},
+           COALESCE(p.numero, '-'),
+           {datas.sql_valida("t.data_vencimento", datas.DATA_HORA)}
+    FROM tarefas t
+    LEFT JOIN processos p ON t.processo_id = p.id
+'''
+
+SELECT_ANDAMENTOS = f'''
+    SELECT id, data_andamento, {datas.sql_exibir("data_andamento", datas.DATA_HORA)}, descricao
+    FROM andamentos
+'''
+
+COLUNAS_BUSCA = f'''
+    SELECT p.id, p.numero, p.cliente, p.tipo_acao, p.status, p.vara,
+           {datas.sql_exibir("p.data_distribuicao", datas.DATA)},
+'''
+
+# Ocorrências mais recentes ordenadas por relevância na busca enquanto se digita
+CANDIDATOS_BUSCA = 2000
+
+
+def recentes_fts(tabela):
+    """Restringe uma busca FTS5 às N ocorrências de maior rowid
+
+    Ordenar por relevância (bm25) calcula o rank de todas as linhas que
+    casam, o que num prefixo curto ("se*") são centenas de milhares; com o
+    limite de rowid, o FTS5 só percorre as mais recentes, que não são
+    necessariamente as mais relevantes. Por isso só a busca enquanto se
+    digita usa o limite (CANDIDATOS_BUSCA); Enter, o botão e a linha de
+    comando ordenam todas.
+    Parâmetros: [expressão, quantidade de candidatas]; -1 desliga o limite,
+    necessário também quando outros filtros podem descartar as mais recentes.
+    """
+    return f'''{tabela}.rowid >= (
+            SELECT COALESCE(MIN(rowid), 0) FROM (
+                SELECT rowid FROM {tabela} WHERE {tabela} MATCH ? ORDER BY rowid DESC LIMIT ?
+            )
+          )'''
+
+
+CONSULTAS = {
+    # Processos
+    **consultas_keyset("processos.pagina", SELECT_PROCESSOS, ("data_cadastro", "id"), descendente=True),
+    "processos.por_numero": f'''
+        SELECT id, numero, cliente, tipo_acao, vara, status,
+               {datas.sql_exibir("data_distribuicao", datas.DATA)}, valor_causa, observacoes
+        FROM processos
+        WHERE numero = ?
+    ''',
+    # Autocompletar: início do número (faixa no índice único) ou palavras do cliente
+    "processos.autocompletar_numero": '''
+        SELECT id, numero, cliente FROM processos
+        WHERE numero >= ? AND numero < ?
+        ORDER BY numero
+        LIMIT ?
+    ''',
+    "processos.autocompletar_cliente": '''
+        SELECT id, numero, cliente FROM processos
+        WHERE id IN (SELECT rowid FROM processos_fts WHERE processos_fts MATCH ?)
+        ORDER BY numero
+        LIMIT ?
+    ''',
+    # cliente_id: o cliente com esse nome, se houver exatamente um
+    "processos.inserir": '''
+        INSERT INTO processos
+        (numero, cliente, tipo_acao, vara, status, data_distribuicao, valor_causa, observacoes, data_cadastro,
+         cliente_id)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?,
+                (SELECT CASE WHEN COUNT(*) = 1 THEN MIN(id) END FROM clientes WHERE nome = ?))
+    ''',
+    "processos.excluir": "DELETE FROM processos WHERE id = ?",
+
+    # Clientes
+    **consultas_keyset("clientes.pagina", SELECT_CLIENTES, ("c.nome", "c.id"), agrupar=True),
+    # Autocompletar: palavras do nome por prefixo, sem acentos
+    "clientes.autocompletar": '''
+        SELECT id, nome FROM clientes
+        WHERE id IN (SELECT rowid FROM clientes_fts WHERE clientes_fts MATCH ?)
+        ORDER BY nome, id
+        LIMIT ?
+    ''',
+    "clientes.inserir": '''
+        INSERT INTO clientes
+        (nome, cpf_cnpj, telefone, email, endereco, observacoes, data_cadastro)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+    ''',
+    "clientes.excluir": "DELETE FROM clientes WHERE id = ?",
+    # Processos do cliente: vinculados pelo id e, sem vínculo, com o mesmo nome (relatorio_vinculos)
+    "clientes.processos": '''
+        SELECT COUNT(cliente_id), COUNT(*) - COUNT(cliente_id)
+        FROM processos
+        WHERE cliente_id = ?
+           OR (cliente = (SELECT nome FROM clientes WHERE id = ?) AND cliente_id IS NULL)
+    ''',
+
+    # Tarefas (uma paginação por filtro da tela)
+    **consultas_keyset("tarefas.todas", SELECT_TAREFAS, ("t.data_vencimento", "t.id")),
+    **consultas_keyset("tarefas.pendentes", SELECT_TAREFAS, ("t.data_vencimento", "t.id"),
+                       filtro="t.concluida=0"),
+    **consultas_keyset("tarefas.concluidas", SELECT_TAREFAS, ("t.data_vencimento", "t.id"),
+                       filtro="t.concluida=1"),
+    **consultas_keyset("tarefas.atrasadas", SELECT_TAREFAS, ("t.data_vencimento", "t.id"),
+                       filtro="t.concluida=0 AND t.data_vencimento < ?"),
+    "tarefas.inserir": '''
+        INSERT INTO tarefas
+        (processo_id, titulo, descricao, tipo, data_vencimento, data_cadastro, prazo_inicio, prazo_dias, tribunal)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ''',
+    "tarefas.concluir": '''
+        UPDATE tarefas
+        SET concluida=1, data_conclusao=?
+        WHERE id=?
+    ''',
+    "tarefas.excluir": "DELETE FROM tarefas WHERE id=?",
+    "tarefas.excluir_do_processo": "DELETE FROM tarefas WHERE processo_id = ?",
+    # Faixa no índice (concluida, data_vencimento): vencimento anterior ao limite (exclusivo)
+    "tarefas.contar_urgentes": '''
+        SELECT COUNT(*) FROM tarefas
+        WHERE concluida=0 AND data_vencimento < ?
+    ''',
+    "tarefas.urgentes": '''
+        SELECT t.titulo, t.data_vencimento, t.tipo, p.numero
+        FROM tarefas t
+        LEFT JOIN processos p ON t.processo_id = p.id
+        WHERE t.concluida=0 AND t.data_vencimento < ?
+        ORDER BY t.data_vencimento ASC
+        LIMIT ?
+    ''',
+
+    # Lembretes: pendentes a vencer (faixa em idx_tarefas_concluida_vencimento) e o texto do aviso
+    "tarefas.vencimentos_futuros": '''
+        SELECT id, data_vencimento FROM tarefas
+        WHERE concluida = 0 AND data_vencimento >= ?
+    ''',
+    "tarefas.lembrete": '''
+        SELECT t.titulo, t.data_vencimento, t.tipo, p.numero
+        FROM tarefas t
+        LEFT JOIN processos p ON t.processo_id = p.id
+        WHERE t.id = ? AND t.concluida = 0
+    ''',
+
+    # Prazos em dias úteis: tarefas abertas com prazo (índice parcial de
+    # cobertura idx_tarefas_prazos), de um tribunal ou, com '', de todos
+    "tarefas.prazos_abertos": '''
+        SELECT id, prazo_inicio, prazo_dias, tribunal, data_vencimento
+        FROM tarefas
+        WHERE concluida = 0 AND prazo_dias IS NOT NULL AND (? = '' OR tribunal = ?)
+    ''',
+    "tarefas.atualizar_vencimento": "UPDATE tarefas SET data_vencimento = ? WHERE id = ?",
+
+    # Feriados e suspensões
+    "feriados.listar": '''
+        SELECT id, data, tribunal, descricao FROM feriados
+        ORDER BY data DESC
+    ''',
+    "feriados.do_tribunal": "SELECT data, tribunal FROM feriados WHERE tribunal IN ('', ?)",
+    # Muda a cada inclusão ou exclusão (os ids não são reaproveitados): invalida os calendários
+    "feriados.versao": "SELECT COUNT(*), TOTAL(id), TOTAL(julianday(data)) FROM feriados",
+    "feriados.por_id": "SELECT data, tribunal, descricao FROM feriados WHERE id = ?",
+    "feriados.inserir": "INSERT INTO feriados (data, tribunal, descricao) VALUES (?, ?, ?)",
+    "feriados.excluir": "DELETE FROM feriados WHERE id = ?",
+
+    # Contadores mantidos por triggers
+    "estatisticas.todas": "SELECT chave, valor FROM estatisticas",
+
+    # Andamentos
+    # Faixa em idx_andamentos_processo_data, já na ordem cronológica inversa
+    **consultas_keyset("andamentos.pagina", SELECT_ANDAMENTOS, ("data_andamento", "id"),
+                       filtro="processo_id = ?", descendente=True),
+    "andamentos.inserir": '''
+        INSERT INTO andamentos (processo_id, data_andamento, descricao, data_cadastro)
+        VALUES (?, ?, ?, ?)
+    ''',
+    "andamentos.excluir_do_processo": "DELETE FROM andamentos WHERE processo_id = ?",
+
+    # Busca avançada (FTS5); tipo e status são opcionais: (? IS NULL OR coluna = ?)
+    "busca.processos": COLUNAS_BUSCA + f'''
+               snippet(processos_fts, -1, '{busca.INICIO_DESTAQUE}', '{busca.FIM_DESTAQUE}', '…', 12),
+               processos_fts.rank
+        FROM processos_fts
+        JOIN processos p ON p.id = processos_fts.rowid
+        WHERE processos_fts MATCH ?
+          AND {recentes_fts("processos_fts")}
+          AND (? IS NULL OR p.tipo_acao = ?)
+          AND (? IS NULL OR p.status = ?)
+        ORDER BY processos_fts.rank
+        LIMIT ?
+    ''',
+    "busca.andamentos": COLUNAS_BUSCA + f'''
+               snippet(andamentos_fts, 0, '{busca.INICIO_DESTAQUE}', '{busca.FIM_DESTAQUE}', '…', 12),
+               andamentos_fts.rank
+        FROM andamentos_fts
+        JOIN andamentos a ON a.id = andamentos_fts.rowid
+        JOIN processos p ON p.id = a.processo_id
+        WHERE andamentos_fts MATCH ?
+          AND {recentes_fts("andamentos_fts")}
+          AND (? IS NULL OR p.tipo_acao = ?)
+          AND (? IS NULL OR p.status = ?)
+          AND (? IS NULL OR p.id IN (SELECT rowid FROM processos_fts WHERE processos_fts MATCH ?))
+        ORDER BY andamentos_fts.rank
+        LIMIT ?
+    ''',
+    "busca.filtros": COLUNAS_BUSCA + '''
+               '', 0
+        FROM processos p
+        WHERE (? IS NULL OR p.tipo_acao = ?)
+          AND (? IS NULL OR p.status = ?)
+        ORDER BY p.data_cadastro DESC
+        LIMIT ?
+    ''',
+
+    # Exportação: tabelas inteiras na ordem do id, com as colunas aceitas pela importação
+    "exportacao.clientes": '''
+        SELECT id, nome, cpf_cnpj, telefone, email, endereco, observacoes, data_cadastro
+        FROM clientes ORDER BY id
+    ''',
+    "exportacao.processos": '''
+        SELECT id, numero, cliente, tipo_acao, vara, data_distribuicao, status, valor_causa,
+               observacoes, data_cadastro
+        FROM processos ORDER BY id
+    ''',
+    "exportacao.tarefas": '''
+        SELECT t.id, t.titulo, t.tipo, t.data_vencimento, p.numero AS processo, t.descricao,
+               t.concluida, t.data_conclusao, t.data_cadastro, t.prazo_inicio, t.prazo_dias, t.tribunal
+        FROM tarefas t
+        LEFT JOIN processos p ON p.id = t.processo_id
+        ORDER BY t.id
+    ''',
+    "exportacao.andamentos": '''
+        SELECT a.id, p.numero AS processo, a.data_andamento, a.descricao, a.data_cadastro
+        FROM andamentos a
+        JOIN processos p ON p.id = a.processo_id
+        ORDER BY a.id
+    ''',
+    # Os mesmos critérios de busca.processos + busca.andamentos, sem limite nem ranking
+    "exportacao.busca": '''
+        SELECT p.id, p.numero, p.cliente, p.tipo_acao, p.vara, p.data_distribuicao, p.status,
+               p.valor_causa, p.observacoes, p.data_cadastro
+        FROM processos p
+        WHERE (? IS NULL OR p.id IN (SELECT rowid FROM processos_fts WHERE processos_fts MATCH ?))
+          AND (? IS NULL
+               OR p.id IN (SELECT rowid FROM processos_fts WHERE processos_fts MATCH ?)
+               OR p.id IN (SELECT a.processo_id FROM andamentos a
+                           WHERE a.id IN (SELECT rowid FROM andamentos_fts WHERE andamentos_fts MATCH ?)))
+          AND (? IS NULL OR p.tipo_acao = ?)
+          AND (? IS NULL OR p.status = ?)
+        ORDER BY p.id
+    ''',
+}
+
+# Comandos montados a partir de fragmentos fixos (busca) também passam pelo cache
+TAMANHO_CACHE_COMANDOS = max(128, 2 * len(CONSULTAS))
+
+
+# Varreduras intencionais: a tabela estatisticas tem uma linha por contador,
+# a exportação percorre tabelas inteiras e o autocompletar por palavras
+# ordena só as linhas cujo prefixo casou no índice textual
+VARREDURAS_ESPERADAS = {
+    "estatisticas.todas", "clientes.autocompletar", "processos.autocompletar_cliente",
+    *(nome for nome in CONSULTAS if nome.startswith("exportacao.")),
+}
+
+
+def consultas_para_verificacao():
+    """Retorna {nome: (sql, parâmetros)} para migracoes.verificar_planos"""
+    # Os valores não alteram o plano; basta um por marcador
+    return {
+        nome: (sql, (None,) * sql.count("?"))
+        for nome, sql in CONSULTAS.items()
+        if nome not in VARREDURAS_ESPERADAS
+    }
+
+
+# ========== BANCO DE DADOS ==========
+
+class BancoDados:
+    """Conexão com o banco, dona do perfil e do registro de consultas"""
+
+    def __init__(self, caminho=ARQUIVO_BANCO, perfil=PERFIL_PADRAO, migrar=True, **ajustes):
+        self.caminho = caminho
+        self.perfil = perfil
+        self.ajustes = ajustes
+        self.migrar = migrar
+        self.conn = None
+        self.rastreada = False
+
+        self.processos = RepositorioProcessos(self)
+        self.clientes = RepositorioClientes(self)
+        self.tarefas = RepositorioTarefas(self)
+        self.andamentos = RepositorioAndamentos(self)
+        self.busca = RepositorioBusca(self)
+        self.estatisticas = RepositorioEstatisticas(self)
+        self.prazos = RepositorioPrazos(self)
+
+        self.abrir()
+
+    def abrir(self):
+        """Abre a conexão, aplica o perfil e as migrações pendentes"""
+        # O módulo sqlite3 mantém os comandos compilados num cache indexado pelo texto SQL;
+        # como o texto de cada comando registrado é fixo, cada um é compilado uma única vez.
+        self.conn = sqlite3.connect(self.caminho, cached_statements=TAMANHO_CACHE_COMANDOS)
+        self.rastreada = False
+        self.pragmas = aplicar_perfil(self.conn, self.perfil, **self.ajustes)
+
+        if self.migrar:
+            aplicar_migracoes(self.conn)
+
+    def fechar(self):
+        """Fecha a conexão"""
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+
+    def reabrir(self):
+        """Fecha e abre novamente a conexão (após backup/restauração)"""
+        self.fechar()
+        self.abrir()
+
+    def _rodar(self, nome, sql, params, ler=None):
+        """Executa sql (e ler(cursor), se dado); medido quando a instrumentação está ligada"""
+        if INSTRUMENTACAO.ativa:
+            return INSTRUMENTACAO.medir(self, nome, sql, params, ler)
+        cursor = self.conn.execute(sql, params)
+        return ler(cursor) if ler else cursor
+
+    def executar(self, nome, params=()):
+        """Executa um comando registrado e retorna o cursor"""
+        return self._rodar(nome, CONSULTAS[nome], params)
+
+    def executar_sql(self, sql, params=()):
+        """Executa um comando montado dinamicamente a partir de fragmentos fixos"""
+        return self._rodar("sql", sql, params)
+
+    def executar_lote(self, nome, lista_params):
+        """Executa um comando registrado uma vez para cada item de lista_params (executemany)"""
+        if not INSTRUMENTACAO.ativa:
+            return self.conn.executemany(CONSULTAS[nome], lista_params)
+        with INSTRUMENTACAO.medir_lote("consulta", nome, CONSULTAS[nome]) as medida:
+            cursor = self.conn.executemany(CONSULTAS[nome], lista_params)
+            medida["linhas"] = cursor.rowcount
+        return cursor
+
+    def todos(self, nome, params=()):
+        """Executa uma consulta registrada e retorna todas as linhas"""
+        return self._rodar(nome, CONSULTAS[nome], params, sqlite3.Cursor.fetchall)
+
+    def um(self, nome, params=()):
+        """Executa uma consulta registrada e retorna a primeira linha"""
+        return self._rodar(nome, CONSULTAS[nome], params, sqlite3.Cursor.fetchone)
+
+    def escalar(self, nome, params=()):
+        """Executa uma consulta registrada e retorna o primeiro valor"""
+        linha = self.um(nome, params)
+        return linha[0] if linha else None
+
+    @contextmanager
+    def transacao(self):
+        """Agrupa comandos numa transação (commit ao final, rollback em erro)"""
+        with self.conn:
+            yield self
+
+
+class Repositorio:
+    """Base dos repositórios: acesso ao BancoDados"""
+
+    def __init__(self, db):
+        self.db = db
+
+    def paginar(self, prefixo, direcao, chave=None, limite=200, params_filtro=()):
+        """Busca uma página de consultas_keyset; direcao: inicio, apos ou antes"""
+        params = tuple(params_filtro)
+        if direcao != "inicio":
+            params += tuple(chave)
+        linhas = self.db.todos(f"{prefixo}.{direcao}", params + (limite,))
+
+        if direcao == "antes":
+            linhas.reverse()
+        return linhas
+
+    def linha(self, prefixo, item_id, params_filtro=()):
+        """Uma linha de consultas_keyset pelo id (None se não existe ou não passa no filtro)"""
+        return self.db.um(f"{prefixo}.linha", tuple(params_filtro) + (item_id,))
+
+
+class RepositorioProcessos(Repositorio):
+    """Consultas e comandos de processos"""
+
+    def pagina(self, direcao, chave=None, limite=200):
+        """Processos do mais recente ao mais antigo: (id, data_cadastro, colunas da lista...)"""
+        return self.paginar("processos.pagina", direcao, chave, limite)
+
+    def linha_lista(self, processo_id):
+        """O processo no formato de pagina(), para atualizar a lista após gravar"""
+        return self.linha("processos.pagina", processo_id)
+
+    def por_numero(self, numero):
+        return self.db.um("processos.por_numero", (numero,))
+
+    def autocompletar(self, texto, limite=10):
+        """Sugestões (id, numero, cliente) em ordem de número
+
+        Texto começando por dígito: números que começam por ele; senão,
+        processos cujo cliente tem palavras começando pelas do texto.
+        """
+        texto = texto.strip()
+        if not texto:
+            return []
+        if texto[0].isdigit():
+            # Tudo o que começa pelo texto fica entre ele e ele + o maior caractere
+            return self.db.todos("processos.autocompletar_numero", (texto, texto + "\U0010ffff", limite))
+        expressao = busca.expressao_palavras(texto, "cliente")
+        return self.db.todos("processos.autocompletar_cliente", (expressao, limite)) if expressao else []
+
+    def inserir(self, numero, cliente, tipo_acao, vara, status, data_distribuicao,
+                valor_causa, observacoes, data_cadastro):
+        with self.db.transacao():
+            cursor = self.db.executar("processos.inserir", (
+                numero, cliente, tipo_acao, vara, status, data_distribuicao,
+                valor_causa, observacoes, data_cadastro, cliente
+            ))
+        return cursor.lastrowid
+
+    def sem_cliente(self, limite=None):
+        """Processos sem cliente vinculado: (id, número, nome, clientes com esse nome)"""
+        return manutencao.relatorio_vinculos(self.db.conn, limite)
+
+    def excluir(self, processo_id):
+        """Exclui o processo com seus andamentos e tarefas"""
+        with self.db.transacao():
+            self.db.executar("andamentos.excluir_do_processo", (processo_id,))
+            self.db.executar("tarefas.excluir_do_processo", (processo_id,))
+            self.db.executar("processos.excluir", (processo_id,))
+
+class RepositorioClientes(Repositorio):
+    """Consultas e comandos de clientes"""
+
+    def pagina(self, direcao, chave=None, limite=200):
+        """Clientes por nome: (id, nome, colunas da lista...)"""
+        return self.paginar("clientes.pagina", direcao, chave, limite)
+
+    def linha_lista(self, cliente_id):
+        """O cliente no formato de pagina(), para atualizar a lista após gravar"""
+        return self.linha("clientes.pagina", cliente_id)
+
+    def autocompletar(self, texto, limite=10):
+        """Sugestões (id, nome) em ordem alfabética: nomes com palavras começando pelas do texto"""
+        expressao = busca.expressao_palavras(texto)
+        return self.db.todos("clientes.autocompletar", (expressao, limite)) if expressao else []
+
+    def inserir(self, nome, cpf_cnpj, telefone, email, endereco, observacoes, data_cadastro):
+        with self.db.transacao():
+            cursor = self.db.executar("clientes.inserir", (
+                nome, cpf_cnpj, telefone, email, endereco, observacoes, data_cadastro
+            ))
+        return cursor.lastrowid
+
+    def processos(self, cliente_id):
+        """(processos vinculados, processos sem vínculo com o nome do cliente)"""
+        return self.db.um("clientes.processos", (cliente_id, cliente_id))
+
+    def excluir(self, cliente_id):
+        """Exclui o cliente (a chave estrangeira impede excluir clientes com processos)"""
+        with self.db.transacao():
+            self.db.executar("clientes.excluir", (cliente_id,))
+
+
+class RepositorioTarefas(Repositorio):
+    """Consultas e comandos de tarefas"""
+
+    FILTROS = {
+        "Todas": "tarefas.todas",
+        "Pendentes": "tarefas.pendentes",
+        "Concluídas": "tarefas.concluidas",
+        "Atrasadas": "tarefas.atrasadas",
+    }
+
+    def pagina(self, filtro, agora, direcao, chave=None, limite=200):
+        """Tarefas pelo vencimento, prontas para exibição:
+        (id, data_vencimento, situação, titulo, tipo, vencimento DD/MM/AAAA HH:MM,
+        número do processo, data válida)
+
+        agora (AAAA-MM-DD HH:MM) define as atrasadas, na situação e no filtro 'Atrasadas'.
+        Tarefas com data fora do formato não são descartadas: vêm com data válida 0.
+        """
+        prefixo, params = self._filtro(filtro, agora)
+        return self.paginar(prefixo, direcao, chave, limite, params)
+
+    def linha_lista(self, filtro, agora, tarefa_id):
+        """A tarefa no formato de pagina() (None se não passa no filtro)"""
+        prefixo, params = self._filtro(filtro, agora)
+        return self.linha(prefixo, tarefa_id, params)
+
+    def _filtro(self, filtro, agora):
+        prefixo = self.FILTROS.get(filtro, "tarefas.todas")
+        # Situação no SELECT e, nas atrasadas, o filtro do WHERE
+        params = (agora, agora) if prefixo == "tarefas.atrasadas" else (agora,)
+        return prefixo, params
+
+    def contar_urgentes(self, vencimento_ate):
+        """Pendentes com vencimento antes de vencimento_ate (exclusivo)"""
+        return self.db.escalar("tarefas.contar_urgentes", (vencimento_ate,))
+
+    def urgentes(self, vencimento_ate, limite=10):
+        return self.db.todos("tarefas.urgentes", (vencimento_ate, limite))
+
+    def vencimentos_futuros(self, agora):
+        """(id, data_vencimento) das pendentes que vencem a partir de agora (AAAA-MM-DD HH:MM)"""
+        return self.db.todos("tarefas.vencimentos_futuros", (agora,))
+
+    def lembrete(self, tarefa_id):
+        """(titulo, data_vencimento, tipo, número do processo) da tarefa pendente, ou None"""
+        return self.db.um("tarefas.lembrete", (tarefa_id,))
+
+    def inserir(self, processo_id, titulo, descricao, tipo, data_vencimento, data_cadastro,
+                prazo_inicio=None, prazo_dias=None, tribunal=None):
+        """Grava a tarefa; com prazo_inicio e prazo_dias, o vencimento acompanha os feriados"""
+        with self.db.transacao():
+            cursor = self.db.executar("tarefas.inserir", (
+                processo_id, titulo, descricao, tipo, data_vencimento, data_cadastro,
+                prazo_inicio, prazo_dias, tribunal
+            ))
+        return cursor.lastrowid
+
+    def concluir(self, tarefa_id, data_conclusao):
+        with self.db.transacao():
+            self.db.executar("tarefas.concluir", (data_conclusao, tarefa_id))
+
+    def excluir(self, tarefa_id):
+        with self.db.transacao():
+            self.db.executar("tarefas.excluir", (tarefa_id,))
+
+
+class RepositorioAndamentos(Repositorio):
+    """Consultas e comandos de andamentos"""
+
+    def pagina(self, processo_id, direcao, chave=None, limite=100):
+        """Andamentos do processo, do mais recente ao mais antigo:
+        (id, data_andamento, data DD/MM/AAAA HH:MM, descricao)
+        """
+        return self.paginar("andamentos.pagina", direcao, chave, limite, (processo_id,))
+
+    def inserir(self, processo_id, data_andamento, descricao, data_cadastro):
+        with self.db.transacao():
+            cursor = self.db.executar("andamentos.inserir", (
+                processo_id, data_andamento, descricao, data_cadastro
+            ))
+        return cursor.lastrowid
+
+
+class RepositorioEstatisticas(Repositorio):
+    """Contadores do dashboard (tabela estatisticas)"""
+
+    def todas(self):
+        """Retorna {chave: valor}; custo constante, independente do tamanho das tabelas"""
+        return dict(self.db.todos("estatisticas.todas"))
+
+    def verificar(self, corrigir=False):
+        """Recalcula os contadores e retorna [(chave, armazenado, real)] divergentes"""
+        return estatisticas.verificar(self.db.conn, corrigir)
+
+
+class RepositorioPrazos(Repositorio):
+    """Prazos em dias úteis e a tabela de feriados (veja sistema_juridico.prazos)
+
+    Guarda um prazos.Calendario por tribunal; todos são descartados quando
+    a tabela feriados muda, nesta ou em outra conexão.
+    """
+
+    def __init__(self, db):
+        super().__init__(db)
+        self.calendarios = {}
+        self.versao = None
+
+    def calendario(self, tribunal, primeiro, ultimo):
+        """Calendario do tribunal cobrindo as datas de primeiro a ultimo"""
+        versao = self.db.um("feriados.versao")
+        if versao != self.versao:
+            self.calendarios.clear()
+            self.versao = versao
+
+        calendario = self.calendarios.get(tribunal)
+        if calendario is None or not calendario.cobre(primeiro, ultimo):
+            if calendario is not None:
+                primeiro = min(primeiro, calendario.primeiro)
+                ultimo = max(ultimo, calendario.ultimo)
+            feriados = self.db.todos("feriados.do_tribunal", (tribunal,))
+            calendario = self.calendarios[tribunal] = prazos.montar(tribunal, primeiro, ultimo, feriados)
+        return calendario
+
+    def vencimento(self, inicio, dias, tribunal=prazos.TODOS):
+        """date em que vence o prazo de dias úteis contado de inicio (date, excluído)"""
+        return self.calendario(tribunal, *prazos.intervalo(inicio, dias)).prazo(inicio, dias)
+
+    def recalcular(self, tribunal=prazos.TODOS):
+        """Recalcula, numa transação, o vencimento das tarefas abertas com prazo
+
+        Depois de incluir ou excluir um feriado: de um tribunal, só as tarefas
+        dele; de todos (''), todas. Mantém a hora de cada vencimento e
+        retorna quantas tarefas mudaram de data.
+        """
+        linhas = self.db.todos("tarefas.prazos_abertos", (tribunal, tribunal))
+        alteracoes = prazos.novos_vencimentos(linhas, self.calendario)
+        if not alteracoes:
+            return 0
+
+        with self.db.transacao():
+            self.db.executar_lote("tarefas.atualizar_vencimento", alteracoes)
+        return len(alteracoes)
+
+    # ========== FERIADOS ==========
+
+    def feriados(self):
+        """(id, data AAAA-MM-DD, tribunal, descrição), os mais recentes primeiro"""
+        return self.db.todos("feriados.listar")
+
+    def incluir_feriado(self, data, tribunal, descricao):
+        """Grava um feriado ou suspensão (data AAAA-MM-DD; tribunal '' para todos)"""
+        with self.db.transacao():
+            cursor = self.db.executar("feriados.inserir", (data, tribunal, descricao))
+        return cursor.lastrowid
+
+    def excluir_feriado(self, feriado_id):
+        """Exclui o feriado e retorna o tribunal dele (None se não existia)"""
+        with self.db.transacao():
+            linha = self.db.um("feriados.por_id", (feriado_id,))
+            self.db.executar("feriados.excluir", (feriado_id,))
+        return linha[1] if linha else None
+
+
+class RepositorioBusca(Repositorio):
+    """Busca avançada de processos pelo índice textual (FTS5)"""
+
+    def processos(self, numero="", cliente="", texto="", tipo=None, status=None, limite=200, candidatas=-1):
+        """Busca processos e retorna as linhas mais relevantes primeiro
+
+        numero e cliente restringem as respectivas colunas; texto procura em
+        todas as colunas do processo e na descrição dos andamentos. Cada linha:
+        (id, numero, cliente, tipo_acao, status, vara, data_distribuicao, trecho).
+        Com candidatas (por exemplo CANDIDATOS_BUSCA), a relevância é calculada
+        só entre as ocorrências mais recentes (recentes_fts), uma aproximação
+        para a busca enquanto se digita; o padrão, -1, ordena todas. O limite
+        não vale com tipo, status ou a restrição de número e cliente nos
+        andamentos, já que os filtros são aplicados depois e poderiam
+        descartar todas as recentes.
+
+        Os bm25 de processos_fts (com pesos por coluna) e de andamentos_fts
+        não estão na mesma escala, então as fontes não são misturadas: vêm
+        primeiro os processos encontrados nos próprios campos e depois os que
+        só aparecem nos andamentos, cada grupo na ordem da sua relevância.
+        """
+        campos = busca.combinar(busca.expressao_numero(numero), busca.expressao_palavras(cliente, "cliente"))
+        texto_livre = busca.expressao_palavras(texto)
+        filtros = (tipo, tipo, status, status)
+
+        if not campos and not texto_livre:
+            linhas = self.db.todos("busca.filtros", filtros + (limite,))
+            return [linha[:8] for linha in linhas]
+
+        # Dicionário na ordem de inserção: a ordem de cada consulta é mantida
+        encontrados = {}
+
+        expressao = busca.combinar(campos, texto_livre)
+        filtrada = tipo is not None or status is not None
+        if filtrada or candidatas < 0:
+            candidatas = -1
+        else:
+            candidatas = max(candidatas, limite)
+        for linha in self.db.todos("busca.processos", (expressao, expressao, candidatas) + filtros + (limite,)):
+            encontrados[linha[0]] = linha
+
+        if texto_livre and len(encontrados) < limite:
+            # Processos cujo texto só aparece nos andamentos (o trecho do andamento mais relevante).
+            # Vários andamentos são do mesmo processo: busca mais linhas até completar o limite
+            restricao = campos or None
+            if restricao:
+                candidatas = -1
+            processos_proprios = len(encontrados)
+            # Com candidatas, todas as que entram no rank cabem numa só consulta
+            linhas_andamentos = candidatas if candidatas >= 0 else limite * 4
+            while True:
+                params = (texto_livre, texto_livre, candidatas) + filtros + (restricao, restricao, linhas_andamentos)
+                linhas = self.db.todos("busca.andamentos", params)
+                for linha in linhas:
+                    encontrados.setdefault(linha[0], linha)
+                if len(encontrados) >= limite or len(linhas) < linhas_andamentos:
+                    break
+                encontrados = dict(list(encontrados.items())[:processos_proprios])
+                linhas_andamentos *= 4
+
+        return [linha[:8] for linha in list(encontrados.values())[:limite]]
+
+    def exportacao(self, numero="", cliente="", texto="", tipo=None, status=None):
+        """Cursor com todos os processos que processos() encontraria, na ordem do id
+
+        Sem limite e sem ordenar por relevância, para que as linhas possam ser
+        lidas aos poucos (fetchmany) em vez de carregadas de uma vez.
+        """
+        campos = busca.combinar(busca.expressao_numero(numero), busca.expressao_palavras(cliente, "cliente"))
+        texto_livre = busca.expressao_palavras(texto)
+        campos = campos or None
+        texto_livre = texto_livre or None
+        return self.db.executar("exportacao.busca", (
+            campos, campos,
+            texto_livre, texto_livre, texto_livre,
+            tipo, tipo, status, status
+        ))
@@ -0,0 +1,188 @@
+"""
+Restauração verificada e atômica do banco de dados
+
+O arquivo escolhido nunca é copiado às cegas sobre o banco em uso:
+
+1. o candidato é aberto somente leitura e passa por quick_check (ou
+   integrity_check) e por uma verificação de compatibilidade do esquema;
+2. ele é copiado pela API de backup para um arquivo temporário no mesmo
+   diretório do banco (mesmo sistema de arquivos), com fsync;
+3. com todas as conexões fechadas, os.replace troca os arquivos de uma
+   vez: ou o banco antigo continua inteiro, ou o novo está completo.
+
+As etapas 1 e 2 são demoradas e rodam em segundo plano; só a etapa 3 exige
+fechar as conexões, e ela é instantânea.
+"""
+
+import os
+import sqlite3
+from urllib.parse import quote
+
+from sistema_juridico.backup import PAGINAS_POR_PASSO
+from sistema_juridico.migracoes import VERSAO_ATUAL
+
+
+# Tabelas que um backup precisa ter para ser restaurado (esquema da versão 1)
+TABELAS_OBRIGATORIAS = ("processos", "andamentos", "tarefas", "clientes")
+
+# Instruções da VM do SQLite entre duas chamadas do progresso na verificação
+INSTRUCOES_POR_AVISO = 100000
+
+SUFIXO_TEMPORARIO = ".restauracao"
+
+
+class ErroRestauracao(Exception):
+    """O arquivo escolhido não pode ser restaurado"""
+
+
+def abrir_somente_leitura(caminho):
+    """Abre um banco sem gravar nada nele nem ao lado dele
+
+    immutable=1 dispensa travas e o arquivo -shm: o candidato não muda
+    durante a restauração.
+    """
+    uri = f"file:{quote(os.path.abspath(caminho))}?mode=ro&immutable=1"
+    return sqlite3.connect(uri, uri=True)
+
+
+def verificar_candidato(conn, completo=False, progresso=None):
+    """Confere integridade e esquema do banco candidato; retorna a versão do esquema
+
+    Levanta ErroRestauracao com a descrição do problema.
+    """
+    avisos = [0]
+
+    def _aviso():
+        avisos[0] += 1
+        progresso(avisos[0], 0, "Verificando integridade")
+        return 0
+
+    try:
+        if progresso:
+            conn.set_progress_handler(_aviso, INSTRUCOES_POR_AVISO)
+        verificacao = "integrity_check" if completo else "quick_check"
+        resultado = [linha[0] for linha in conn.execute(f"PRAGMA {verificacao}")]
+    except sqlite3.DatabaseError as e:
+        raise ErroRestauracao(f"O arquivo não é um banco de dados válido: {e}")
+    finally:
+        conn.set_progress_handler(None, 0)
+
+    if resultado != ["ok"]:
+        raise ErroRestauracao("O banco está corrompido:\n" + "\n".join(resultado[:10]))
+
+    if progresso:
+        progresso(0, 0, "Verificando o esquema")
+
+    versao = conn.execute("PRAGMA user_version").fetchone()[0]
+    if versao > VERSAO_ATUAL:
+        raise ErroRestauracao(
+            f"O backup está na versão {versao} do esquema, mais nova que a suportada ({VERSAO_ATUAL})."
+        )
+
+    tabelas = {nome for (nome,) in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    faltando = [tabela for tabela in TABELAS_OBRIGATORIAS if tabela not in tabelas]
+    if faltando:
+        raise ErroRestauracao(
+            "O arquivo não é um backup do sistema (tabelas ausentes: " + ", ".join(faltando) + ")."
+        )
+
+    return versao
+
+
+def preparar(origem, destino, completo=False, progresso=None):
+    """Verifica origem e a copia para um arquivo temporário ao lado de destino
+
+    progresso(feito, total, etapa) é chamado na thread que executa a
+    preparação (total 0 quando não há como estimar). Retorna o caminho do
+    arquivo temporário, pronto para substituir().
+    """
+    temporario = destino + SUFIXO_TEMPORARIO
+    descartar(temporario)
+
+    candidato = abrir_somente_leitura(origem)
+    try:
+        verificar_candidato(candidato, completo, progresso)
+
+        def _passo(status, restantes, total):
+            if progresso:
+                progresso(total - restantes, total, "Copiando")
+
+        alvo = sqlite3.connect(temporario)
+        try:
+            candidato.backup(alvo, pages=PAGINAS_POR_PASSO, progress=_passo)
+            alvo.execute("PRAGMA journal_mode=DELETE")
+        finally:
+            alvo.close()
+
+        _sincronizar(temporario)
+    except BaseException:
+        descartar(temporario)
+        raise
+    finally:
+        candidato.close()
+
+    return temporario
+
+
+def preparar_snapshot(repositorio, nome, destino, completo=False, progresso=None):
+    """Reconstrói um snapshot do repositório ao lado de destino e o verifica
+
+    Como preparar(), retorna o arquivo temporário pronto para substituir().
+    """
+    temporario = destino + SUFIXO_TEMPORARIO
+    descartar(temporario)
+
+    def _bloco(feito, total):
+        if progresso:
+            progresso(feito, total, "Lendo snapshot")
+
+    try:
+        repositorio.restaurar(nome, temporario, progresso=_bloco)
+
+        candidato = abrir_somente_leitura(temporario)
+        try:
+            verificar_candidato(candidato, completo, progresso)
+        finally:
+            candidato.close()
+    except BaseException:
+        descartar(temporario)
+        raise
+
+    return temporario
+
+
+def substituir(temporario, destino):
+    """Troca destino por temporario atomicamente (todas as conexões devem estar fechadas)"""
+    # Um -wal que sobrou seria aplicado sobre o banco novo e o corromperia
+    for sufixo in ("-wal", "-shm"):
+        resto = destino + sufixo
+        if os.path.exists(resto):
+            if sufixo == "-wal" and os.path.getsize(resto) > 0:
+                raise ErroRestauracao("O banco de dados ainda está em uso por outro programa.")
+            os.remove(resto)
+
+    os.replace(temporario, destino)
+    _sincronizar_diretorio(destino)
+
+
+def descartar(temporario):
+    """Remove um arquivo temporário de restauração, se existir"""
+    for sufixo in ("", "-journal"):
+        if os.path.exists(temporario + sufixo):
+            os.remove(temporario + sufixo)
+
+
+def _sincronizar(caminho):
+    with open(caminho, "rb+") as f:
+        os.fsync(f.fileno())
+
+
+def _sincronizar_diretorio(caminho):
+    # Torna a renomeação durável; não suportado em todos os sistemas
+    if not hasattr(os, "O_DIRECTORY"):
+        return
+    fd = os.open(os.path.dirname(os.path.abspath(caminho)), os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)